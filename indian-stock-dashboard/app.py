@@ -16,6 +16,12 @@ except ImportError:
     pass  # dotenv not available in Replit environment
 
 from stock_data import StockDataFetcher
+from async_stock_data import AsyncStockDataFetcher
+from history_cache import HistoryCache
+from shared_cache import SharedCache
+from intraday import IntradayFeed
+from screener import MarketScreener, ScreenerError
+from timeframes import MultiTimeframeAnalyzer
 from technical_analysis import TechnicalAnalyzer
 from indian_stocks import get_indian_stocks, get_nifty_50_stocks, get_nifty_next_50_stocks, get_sector_wise_stocks
 from chatbot import StockMarketChatbot, ChatInterface, create_quick_help_section, create_chatbot_sidebar
@@ -80,14 +86,46 @@ if 'stock_data_cache' not in st.session_state:
 # Initialize data fetcher and analyzer
 @st.cache_resource
 def get_data_fetcher():
-    return StockDataFetcher()
+    fetcher = StockDataFetcher()
+    # Re-check NSE/BSE listings off the request path
+    fetcher.start_background_refresh()
+    return fetcher
 
 @st.cache_resource
 def get_technical_analyzer():
-    return TechnicalAnalyzer()
+    # Analysis results live next to the histories they were computed from
+    return TechnicalAnalyzer(cache=get_shared_cache())
+
+@st.cache_resource
+def get_async_data_fetcher():
+    return AsyncStockDataFetcher(get_data_fetcher())
+
+@st.cache_resource
+def get_shared_cache():
+    # One copy of each stock's history and analysis for all sessions
+    max_mb = int(os.environ.get('STOCK_CACHE_MAX_MB', '512'))
+    return SharedCache(max_bytes=max_mb * 1024 * 1024, ttl=get_data_fetcher().refresh_interval)
+
+@st.cache_resource
+def get_timeframe_analyzer():
+    # Weekly/monthly bars are kept per stock and only extended as new days arrive
+    return MultiTimeframeAnalyzer(get_technical_analyzer())
+
+@st.cache_resource
+def get_market_screener():
+    # One screened universe shared by all sessions, rebuilt on request
+    return MarketScreener(get_data_fetcher(), get_technical_analyzer())
+
+@st.cache_resource
+def get_intraday_feed(interval):
+    # One feed per bar size; its ring buffers persist across reruns
+    return IntradayFeed(get_data_fetcher(), interval=interval)
 
 data_fetcher = get_data_fetcher()
+async_data_fetcher = get_async_data_fetcher()
 analyzer = get_technical_analyzer()
+shared_cache = get_shared_cache()
+timeframe_analyzer = get_timeframe_analyzer()
 
 # Initialize chatbot
 @st.cache_resource
@@ -139,16 +177,14 @@ else:
 # Search functionality
 search_term = st.sidebar.text_input(
     "🔍 Search for a company", 
-    placeholder="Type company name...",
-    help="Search by company name"
+    placeholder="Type company name or symbol...",
+    help="Search by company name or symbol - small typos are fine"
 )
 
 # Filter based on search
 if search_term:
-    filtered_stocks = {
-        symbol: name for symbol, name in available_stocks.items() 
-        if search_term.lower() in name.lower()
-    }
+    # Ranked, typo-tolerant lookup against the prebuilt index
+    filtered_stocks = dict(data_fetcher.search_stocks(search_term, available_stocks))
     if filtered_stocks:
         st.sidebar.success(f"Found {len(filtered_stocks)} companies")
         available_stocks = filtered_stocks
@@ -214,6 +250,14 @@ selected_period = st.sidebar.selectbox(
 )
 period = period_options[selected_period]
 
+# Live intraday view
+st.sidebar.subheader("⚡ Intraday View")
+show_intraday = st.sidebar.toggle("Show today's live chart", value=False)
+intraday_feed = None
+if show_intraday:
+    intraday_interval = st.sidebar.selectbox("Bar size:", ["1m", "5m", "15m"], index=1)
+    intraday_feed = get_intraday_feed(intraday_interval)
+
 # Main content
 if not st.session_state.selected_stocks:
     # Welcome screen
@@ -254,18 +298,21 @@ else:
     
     # Fetch data for selected stocks
     with st.spinner("📊 Getting latest market data and running AI analysis..."):
-        for stock in st.session_state.selected_stocks:
-            if stock not in st.session_state.stock_data_cache:
-                try:
-                    stock_data = data_fetcher.get_stock_data(stock, period)
-                    if stock_data is not None and not stock_data.empty:
-                        st.session_state.stock_data_cache[stock] = stock_data
-                except Exception as e:
-                    st.error(f"Could not get data for {stock}. Please try again.")
+        # Switching periods only re-slices cached history; new stocks come from store top-ups and
+        # one grouped download, with the async fetcher retrying any that errored
+        # Histories live in the shared cache; session state only keeps views into them
+        history_cache = HistoryCache(data_fetcher, storage=shared_cache)
+        fetch_result = history_cache.get_many(st.session_state.selected_stocks, period, async_data_fetcher)
+        st.session_state.stock_data_cache = fetch_result['data']
+        for stock in fetch_result['failures']:
+            st.error(f"Could not get data for {stock}. Please try again.")
+        if intraday_feed is not None:
+            # Only bars newer than the last buffered one are downloaded
+            intraday_feed.poll(st.session_state.selected_stocks)
     
-    # Get AI portfolio suggestions
+    # Get AI portfolio suggestions (large watchlists are split across CPU cores)
     if st.session_state.stock_data_cache:
-        suggestions = analyzer.get_portfolio_suggestions(st.session_state.stock_data_cache)
+        suggestions = analyzer.get_portfolio_suggestions(st.session_state.stock_data_cache, parallel=True)
         
         # Display AI suggestions prominently
         st.subheader("🎯 AI Investment Recommendations Right Now")
@@ -345,7 +392,8 @@ else:
             
             # AI Recommendation
             try:
-                recommendation = analyzer.get_recommendation(stock_data)
+                # Already computed for the portfolio suggestions above
+                recommendation = analyzer.get_recommendation(stock_data, stock)
                 explanation = analyzer.get_simple_explanation(recommendation)
                 
                 # Display recommendation with simple explanation
@@ -373,9 +421,39 @@ else:
             except Exception as e:
                 st.warning("Could not generate recommendation for this stock. Please try refreshing.")
             
-            # Simple price chart
+            # Do the daily, weekly and monthly pictures agree? (all built from the cached daily history)
+            try:
+                longest_history = history_cache.longest(stock)
+                timeframe_view = timeframe_analyzer.get_recommendations(
+                    stock, longest_history if longest_history is not None else stock_data
+                )
+                signal_icons = {'BUY': '🟢', 'SELL': '🔴', 'HOLD': '🟡'}
+                
+                st.markdown("**📅 Short vs Long Term View:**")
+                timeframe_cols = st.columns(len(timeframe_view['timeframes']) + 1)
+                for col, (name, result) in zip(timeframe_cols, timeframe_view['timeframes'].items()):
+                    timeframe_signal = result['recommendation']['signal']
+                    col.metric(
+                        f"{name.title()} ({result['bars']} bars)",
+                        f"{signal_icons.get(timeframe_signal, '')} {timeframe_signal}",
+                        delta=f"{result['recommendation']['confidence']:.0f}% confidence",
+                        delta_color="off"
+                    )
+                
+                agreement = timeframe_view['agreement']
+                with timeframe_cols[-1]:
+                    if agreement['signal'] == 'MIXED':
+                        st.info(f"Mixed: {agreement['aligned']} of {agreement['total']} views agree")
+                    else:
+                        st.success(f"All {agreement['total']} views say {agreement['signal']}")
+            
+            except Exception as e:
+                st.info("Weekly and monthly views are not available for this stock yet.")
+            
+            # Simple price chart with past AI signals
             try:
-                fig = go.Figure()
+                fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.75, 0.25],
+                                    vertical_spacing=0.05)
                 
                 # Add price line
                 fig.add_trace(go.Scatter(
@@ -384,32 +462,95 @@ else:
                     mode='lines',
                     name='Stock Price',
                     line=dict(color='blue', width=3)
-                ))
+                ), row=1, col=1)
                 
                 # Add moving average for trend
                 if len(stock_data) >= 20:
-                    ma_20 = stock_data['Close'].rolling(20).mean()
+                    ma_20 = analyzer.get_moving_average(stock_data, 20, stock)
                     fig.add_trace(go.Scatter(
                         x=stock_data.index,
                         y=ma_20,
                         mode='lines',
                         name='20-Day Average (Trend)',
                         line=dict(color='orange', width=2, dash='dash')
-                    ))
+                    ), row=1, col=1)
+                
+                # Mark the days the AI signal switched to BUY or SELL
+                signals = analyzer.get_signal_series(stock_data, stock)
+                switched = signals['signal'] != signals['signal'].shift()
+                for label, color, marker in [('BUY', 'green', 'triangle-up'), ('SELL', 'red', 'triangle-down')]:
+                    points = switched & (signals['signal'] == label)
+                    fig.add_trace(go.Scatter(
+                        x=stock_data.index[points],
+                        y=stock_data['Close'][points],
+                        mode='markers',
+                        name=f'{label} Signal',
+                        marker=dict(color=color, size=11, symbol=marker)
+                    ), row=1, col=1)
+                
+                # Confidence of the signal on each day
+                signal_colors = signals['signal'].map({'BUY': 'green', 'SELL': 'red', 'HOLD': 'gold'})
+                fig.add_trace(go.Bar(
+                    x=stock_data.index,
+                    y=signals['confidence'],
+                    marker_color=signal_colors,
+                    name='Signal Confidence',
+                    showlegend=False
+                ), row=2, col=1)
                 
                 fig.update_layout(
                     title=f"{stock} Price Movement - {selected_period}",
-                    xaxis_title="Date",
-                    yaxis_title="Price (₹)",
-                    height=400,
+                    height=500,
                     template="plotly_white"
                 )
+                fig.update_yaxes(title_text="Price (₹)", row=1, col=1)
+                fig.update_yaxes(title_text="Confidence %", range=[0, 100], row=2, col=1)
+                fig.update_xaxes(title_text="Date", row=2, col=1)
                 
                 st.plotly_chart(fig, use_container_width=True)
                 
             except Exception as e:
                 st.error("Could not create chart for this stock.")
             
+            # Intraday chart from the live feed
+            if intraday_feed is not None:
+                intraday_data = intraday_feed.get_bars(stock)
+                if intraday_data is not None and not intraday_data.empty:
+                    try:
+                        intraday_fig = go.Figure()
+                        intraday_fig.add_trace(go.Scatter(
+                            x=intraday_data.index,
+                            y=intraday_data['Close'],
+                            mode='lines',
+                            name='Price',
+                            line=dict(color='green', width=2)
+                        ))
+                        if len(intraday_data) >= 20:
+                            intraday_fig.add_trace(go.Scatter(
+                                x=intraday_data.index,
+                                y=intraday_data['Close'].rolling(20).mean(),
+                                mode='lines',
+                                name='20-Bar Average',
+                                line=dict(color='orange', width=2, dash='dash')
+                            ))
+                        intraday_fig.update_layout(
+                            title=f"{stock} Intraday - {intraday_feed.interval} bars",
+                            xaxis_title="Time (IST)",
+                            yaxis_title="Price (₹)",
+                            height=350,
+                            template="plotly_white"
+                        )
+                        st.plotly_chart(intraday_fig, use_container_width=True)
+                        
+                        # Kept up to date bar by bar, no rescan of the session
+                        intraday_indicators = intraday_feed.get_indicators(stock)
+                        if intraday_indicators is not None:
+                            st.metric("⚡ Intraday RSI", f"{intraday_indicators['rsi']:.1f}")
+                    except Exception as e:
+                        st.warning("Could not create intraday chart for this stock.")
+                else:
+                    st.info("No intraday bars yet for this stock. The market may be closed.")
+            
             # Profit/Loss if you had invested
             st.markdown("#### 💡 What if you had invested ₹10,000?")
             
@@ -456,6 +597,64 @@ else:
             
             st.divider()
 
+# Market-wide screener
+st.markdown("---")
+st.markdown("## 🔎 Market Screener")
+st.markdown("Find stocks across the whole market with a simple rule, for example "
+            "`RSI < 30 and close > SMA_200 and volume > 1.5× avg`")
+
+market_screener = get_market_screener()
+if market_screener.refreshed_at is None:
+    st.info("Load the market once to start screening. Stocks already saved on this computer load fastest.")
+    load_market = st.button("📥 Load All Indian Stocks", key="screen_load")
+else:
+    loaded_at = datetime.fromtimestamp(market_screener.refreshed_at).strftime("%d %b %H:%M")
+    load_market = st.button(f"🔄 Refresh Market Data (loaded {loaded_at})", key="screen_load")
+
+if load_market:
+    with st.spinner("📊 Loading every stock and running the technical analysis..."):
+        refresh_result = market_screener.refresh()
+    if refresh_result['failures']:
+        st.warning(f"Could not get data for {len(refresh_result['failures'])} stocks; they are left out.")
+
+if market_screener.refreshed_at is not None:
+    col1, col2, col3 = st.columns([4, 1.5, 1])
+    with col1:
+        screen_filter = st.text_input(
+            "Filter:", value="RSI < 30 and close > SMA_200 and volume > 1.5× avg", key="screen_filter",
+            help="Use close, change, rsi, macd, sma_20, sma_50, sma_200, volume, avg (average volume), "
+                 "signal ('BUY'/'SELL'/'HOLD'), confidence with < > = and, or"
+        )
+    with col2:
+        screen_sort = st.selectbox("Sort by:", ["confidence", "rsi", "change_pct", "volume", "close"], key="screen_sort")
+    with col3:
+        screen_ascending = st.checkbox("Lowest first", value=False, key="screen_ascending")
+    
+    try:
+        screen_page = st.session_state.get('screen_page', 1)
+        scan = market_screener.scan(screen_filter, sort_by=screen_sort, ascending=screen_ascending, page=screen_page)
+        st.caption(f"{scan['total']} of {scan['scanned']} stocks match · scanned in {scan['elapsed'] * 1000:.0f} ms")
+        
+        if scan['total']:
+            results = scan['results'][['company', 'close', 'change_pct', 'rsi', 'sma_200', 'volume', 'avg_volume', 'signal', 'confidence']]
+            st.dataframe(
+                results.rename(columns={
+                    'company': 'Company', 'close': 'Price (₹)', 'change_pct': 'Change %', 'rsi': 'RSI',
+                    'sma_200': '200-Day Avg', 'volume': 'Volume', 'avg_volume': 'Avg Volume',
+                    'signal': 'AI Signal', 'confidence': 'Confidence %'
+                }).round(2),
+                use_container_width=True
+            )
+            if scan['pages'] > 1:
+                # Keep the page in range when a new filter returns fewer pages
+                st.session_state.screen_page = scan['page']
+                st.number_input(f"Page (of {scan['pages']}):", min_value=1, max_value=scan['pages'], key="screen_page")
+        else:
+            st.info("No stocks match this filter right now. Try loosening it.")
+    
+    except ScreenerError as e:
+        st.error(str(e))
+
 # Add comprehensive chatbot interface
 st.markdown("---")
 st.markdown("## 🤖 Stock Market Investment Assistant")
@@ -515,6 +714,8 @@ if st.session_state.selected_stocks:
     with col1:
         if st.button("🔄 Refresh Analysis", use_container_width=True):
             st.session_state.stock_data_cache = {}
+            for stock in st.session_state.selected_stocks:
+                shared_cache.pop(stock)
             st.rerun()
     
     with col2:
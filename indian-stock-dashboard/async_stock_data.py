@@ -0,0 +1,231 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from stock_data import StockDataFetcher, NO_DATA
+
+
+def is_transient(error):
+    """
+    Whether an upstream error is worth retrying
+
+    Timeouts and network errors (requests' exceptions are OSErrors too) and
+    rate limiting may pass; anything else, e.g. a ValueError from bad data,
+    would fail the same way again.
+    """
+    return isinstance(error, OSError) or 'RateLimit' in type(error).__name__
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter for upstream requests
+
+    Tokens refill continuously at `rate` per second up to `capacity`, so
+    short bursts are allowed while the long-run request rate stays capped.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """
+        Wait until a token is available and take it
+        """
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests after repeated upstream failures
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    requests fail fast for `cooldown` seconds. After the cooldown a single
+    probe request is let through (half-open); its success closes the
+    circuit and its failure opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probing = False
+        # Shared by the event loops of concurrent sessions
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+                return False
+            self.probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.probing = False
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release(self):
+        """
+        End a probe without judging the upstream, e.g. after a non-transient error
+        """
+        with self._lock:
+            self.probing = False
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when the circuit breaker is refusing upstream requests"""
+
+
+class AsyncStockDataFetcher:
+    """
+    Concurrent, rate-limited front end to StockDataFetcher
+
+    Each symbol is fetched on a worker thread through the wrapped
+    StockDataFetcher (so the local store and exchange cache still apply),
+    with a global concurrency limit, a token-bucket rate limit, per-request
+    timeouts and jittered exponential backoff on transient errors.
+
+    Worker threads come from an executor owned by each batch, which is shut
+    down without waiting, so a request stuck past its timeout never holds
+    up the caller.
+    """
+
+    def __init__(self, fetcher=None, max_concurrency=8, rate=5.0, burst=10,
+                 timeout=20.0, max_retries=3, base_delay=0.5, max_delay=8.0,
+                 failure_threshold=5, cooldown=30.0):
+        self.fetcher = fetcher or StockDataFetcher()
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        # The breaker outlives event loops so repeated reruns stay backed off
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+
+    def _backoff_delay(self, attempt):
+        # Full jitter: spread retries uniformly so callers do not retry in lockstep
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    async def _fetch_one(self, symbol, period, semaphore, bucket, executor):
+        """
+        Fetch one symbol, retrying transient errors
+
+        Returns:
+            pandas.DataFrame: Stock data, or None if no exchange has any
+
+        Raises:
+            Exception: A non-transient error, or the last error once retries are exhausted
+        """
+        loop = asyncio.get_running_loop()
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            async with semaphore:
+                await bucket.acquire()
+                # Checked once a slot is free, so requests queued behind a failing one fail fast
+                if not self.breaker.allow():
+                    raise UpstreamUnavailable("Upstream is failing, requests paused")
+                try:
+                    # The worker thread cannot be cancelled, a timed out call
+                    # finishes in the background and its result is dropped
+                    stock_data = await asyncio.wait_for(
+                        loop.run_in_executor(executor, self.fetcher._get_history, symbol, period),
+                        timeout=self.timeout
+                    )
+                    self.breaker.record_success()
+                    return stock_data
+                except asyncio.TimeoutError:
+                    last_error = TimeoutError(f"Timed out after {self.timeout:g}s")
+                    self.breaker.record_failure()
+                except Exception as e:
+                    if not is_transient(e):
+                        self.breaker.release()
+                        raise
+                    last_error = e
+                    self.breaker.record_failure()
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(self._backoff_delay(attempt))
+
+        raise last_error
+
+    async def get_multiple_stocks_data(self, symbols, period="1y"):
+        """
+        Fetch many stocks concurrently
+
+        Args:
+            symbols (list): List of stock symbols
+            period (str): Time period
+
+        Returns:
+            dict: {'data': {symbol: DataFrame}, 'failures': {symbol: reason}}
+        """
+        symbols = list(dict.fromkeys(symbols))
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        bucket = TokenBucket(self.rate, self.burst)
+
+        # Timed out calls keep their thread until they return, so leave room
+        # for retries to start without queueing behind them
+        executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency * (self.max_retries + 1),
+            thread_name_prefix="async-stock-data"
+        )
+        try:
+            outcomes = await asyncio.gather(
+                *(self._fetch_one(symbol, period, semaphore, bucket, executor) for symbol in symbols),
+                return_exceptions=True
+            )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        result = {'data': {}, 'failures': {}}
+        for symbol, outcome in zip(symbols, outcomes):
+            if isinstance(outcome, Exception):
+                result['failures'][symbol] = str(outcome) or type(outcome).__name__
+            elif outcome is None or outcome.empty:
+                result['failures'][symbol] = NO_DATA
+            else:
+                result['data'][symbol] = outcome
+
+        return result
+
+    def fetch_stocks(self, symbols, period="1y"):
+        """
+        Blocking wrapper for scripts and the Streamlit thread
+
+        Args:
+            symbols (list): List of stock symbols
+            period (str): Time period
+
+        Returns:
+            dict: {'data': {symbol: DataFrame}, 'failures': {symbol: reason}}
+        """
+        return asyncio.run(self.get_multiple_stocks_data(symbols, period))
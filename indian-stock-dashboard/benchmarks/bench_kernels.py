@@ -0,0 +1,134 @@
+"""
+Microbenchmarks: indicator kernels against the previous pandas rolling path
+
+WindowSums hands histories longer than LONG_HISTORY_ROWS to pandas, so the
+single-series rows at 2500 and 25000 bars time pandas against itself for
+the means. The running-sum kernels are measured on the screener-sized
+universe (2000 symbols x 250 bars), where they are the default.
+
+Run from the dashboard directory:
+
+    python benchmarks/bench_kernels.py [bars]
+"""
+import os
+import sys
+import timeit
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import indicator_kernels as kernels
+
+
+def synthetic_history(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 1000 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, bars)))
+    spread = np.abs(rng.normal(0, 0.01, bars))
+    return pd.DataFrame({
+        'High': close * (1 + spread),
+        'Low': close * (1 - spread),
+        'Close': close,
+        'Volume': rng.integers(100_000, 5_000_000, bars).astype(np.float64)
+    }, index=pd.bdate_range(end="2024-12-31", periods=bars))
+
+
+# The pandas implementations the kernels replace
+def pandas_rsi(close, period=14):
+    delta = close.diff()
+    gain = delta.where(delta > 0, 0).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return (100 - (100 / (1 + gain / loss))).values
+
+
+def pandas_bollinger(close, period=20, std_dev=2):
+    middle = close.rolling(window=period).mean()
+    std = close.rolling(window=period).std()
+    return (middle + std * std_dev).values, middle.values, (middle - std * std_dev).values
+
+
+def pandas_smas(close, periods=(20, 50, 200)):
+    return {period: close.rolling(window=period).mean().values for period in periods}
+
+
+def pandas_stochastic(high, low, close, k_period=14, d_period=3):
+    lowest_low = low.rolling(window=k_period).min()
+    highest_high = high.rolling(window=k_period).max()
+    k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+    return k_percent.values, k_percent.rolling(window=d_period).mean().values
+
+
+def kernel_bollinger(close, period=20, std_dev=2):
+    sums = kernels.WindowSums(close)
+    middle, std = sums.mean(period), sums.std(period)
+    return middle + std * std_dev, middle, middle - std * std_dev
+
+
+def kernel_stochastic(high, low, close, k_period=14, d_period=3):
+    lowest_low = kernels.rolling_min(low, k_period)
+    highest_high = kernels.rolling_max(high, k_period)
+    k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
+    return k_percent, kernels.rolling_mean(k_percent, d_period)
+
+
+def max_difference(expected, actual):
+    expected, actual = np.atleast_1d(expected), np.atleast_1d(actual)
+    mask = ~np.isnan(expected)
+    return float(np.max(np.abs(expected[mask] - actual[mask]) / np.maximum(np.abs(expected[mask]), 1)))
+
+
+def bench(name, baseline, candidate, compare, repeat=5, number=20):
+    pandas_time = min(timeit.repeat(baseline, repeat=repeat, number=number)) / number
+    kernel_time = min(timeit.repeat(candidate, repeat=repeat, number=number)) / number
+    print(f"{name:<22}{pandas_time * 1e3:>10.3f}{kernel_time * 1e3:>10.3f}"
+          f"{pandas_time / kernel_time:>9.1f}x{compare():>12.1e}")
+
+
+def main(bars):
+    data = synthetic_history(bars)
+    close_series, high_series, low_series = data['Close'], data['High'], data['Low']
+    close, high, low = close_series.to_numpy(), high_series.to_numpy(), low_series.to_numpy()
+
+    print(f"{bars} bars")
+    print(f"{'indicator':<22}{'pandas ms':>10}{'kernel ms':>10}{'speedup':>10}{'max rel diff':>12}")
+
+    bench("RSI (sma)", lambda: pandas_rsi(close_series), lambda: kernels.rsi(close),
+          lambda: max_difference(pandas_rsi(close_series), kernels.rsi(close)))
+    bench("Bollinger bands", lambda: pandas_bollinger(close_series), lambda: kernel_bollinger(close),
+          lambda: max(max_difference(a, b) for a, b in zip(pandas_bollinger(close_series), kernel_bollinger(close))))
+    bench("SMA 20/50/200", lambda: pandas_smas(close_series),
+          lambda: kernels.rolling_means(close, (20, 50, 200)),
+          lambda: max(max_difference(pandas_smas(close_series)[p], kernels.rolling_means(close, (20, 50, 200))[p])
+                      for p in (20, 50, 200)))
+    bench("Stochastic", lambda: pandas_stochastic(high_series, low_series, close_series),
+          lambda: kernel_stochastic(high, low, close),
+          lambda: max(max_difference(a, b) for a, b in zip(pandas_stochastic(high_series, low_series, close_series),
+                                                             kernel_stochastic(high, low, close))))
+    bench("Rolling min (w=200)", lambda: low_series.rolling(200).min().values,
+          lambda: kernels.rolling_min(low, 200),
+          lambda: max_difference(low_series.rolling(200).min().values, kernels.rolling_min(low, 200)))
+
+
+def main_universe(bars, symbols=100):
+    # One (bars, symbols) matrix, as IndicatorEngine sees the whole market
+    frame = pd.DataFrame({f"S{i}": synthetic_history(bars, seed=i)['Close'] for i in range(symbols)})
+    matrix = frame.to_numpy()
+
+    print(f"{symbols} symbols x {bars} bars")
+    print(f"{'indicator':<22}{'pandas ms':>10}{'kernel ms':>10}{'speedup':>10}{'max rel diff':>12}")
+    bench("SMA 20/50/200 + BB", lambda: ([frame.rolling(p).mean() for p in (20, 50, 200)], frame.rolling(20).std()),
+          lambda: (kernels.rolling_means(matrix, (20, 50, 200)), kernels.rolling_std(matrix, 20)),
+          lambda: max_difference(frame.rolling(20).std().to_numpy().ravel(), kernels.rolling_std(matrix, 20).ravel()),
+          repeat=3, number=5)
+    bench("Rolling max (w=14)", lambda: frame.rolling(14).max(), lambda: kernels.rolling_max(matrix, 14),
+          lambda: max_difference(frame.rolling(14).max().to_numpy().ravel(), kernels.rolling_max(matrix, 14).ravel()),
+          repeat=3, number=5)
+
+
+if __name__ == "__main__":
+    for bars in ([int(sys.argv[1])] if len(sys.argv) > 1 else [250, 2500, 25000]):
+        main(bars)
+        print()
+    main_universe(250, symbols=2000)
+    print()
+    main_universe(2500)
@@ -0,0 +1,60 @@
+"""
+Scaling of portfolio analysis with worker processes
+
+Compares the per-stock get_recommendation loop, the single-process
+vectorized pass and the shared-memory process pool for growing watchlists.
+Run from the dashboard directory:
+
+    python benchmarks/bench_parallel.py [symbols ...]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_kernels import synthetic_history
+from technical_analysis import TechnicalAnalyzer
+import parallel_analysis
+
+
+def timed(function, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    counts, workers = [], 1
+    while workers < cores:
+        counts.append(workers)
+        workers *= 2
+    return counts + [cores]
+
+
+def main(symbol_counts):
+    print(f"{os.cpu_count()} CPU cores, 2500-bar histories")
+    print(f"{'symbols':>8}{'mode':>16}{'workers':>9}{'seconds':>10}{'vs loop':>9}")
+    for symbols in symbol_counts:
+        data = {f"S{i:04d}": synthetic_history(2500, seed=i) for i in range(symbols)}
+
+        # A fresh analyzer per run so the recommendation cache never answers
+        loop = timed(lambda: [TechnicalAnalyzer().get_recommendation(frame, symbol) for symbol, frame in data.items()], 1)
+        vectorized = timed(lambda: TechnicalAnalyzer().get_recommendations(data))
+        print(f"{symbols:>8}{'per-stock loop':>16}{1:>9}{loop:>10.3f}{1:>8.1f}x")
+        print(f"{symbols:>8}{'vectorized':>16}{1:>9}{vectorized:>10.3f}{loop / vectorized:>8.1f}x")
+
+        for workers in worker_counts():
+            # Start the pool outside the timing, as a long-running server would
+            parallel_analysis.parallel_recommendations(data, TechnicalAnalyzer().latest_window(), workers)
+            parallel = timed(lambda: parallel_analysis.parallel_recommendations(
+                data, TechnicalAnalyzer().latest_window(), workers))
+            print(f"{symbols:>8}{'process pool':>16}{workers:>9}{parallel:>10.3f}{loop / parallel:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 500, 2000])
@@ -5,6 +5,7 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 import json
+from indicator_graph import DEFAULT_GRAPH
 
 class StockMarketChatbot:
     def __init__(self):
@@ -48,6 +49,17 @@ class StockMarketChatbot:
                     "low_52w": round(data['Low'].min(), 2),
                     "volume": int(data['Volume'].iloc[-1])
                 }
+                
+                # Only the indicators the assistant talks about
+                try:
+                    indicators = DEFAULT_GRAPH.latest(data, ['rsi', 'sma_50', 'sma_200'])
+                    context["market_data"][stock].update({
+                        "rsi": round(float(indicators['rsi']), 1),
+                        "sma_50": round(float(indicators['sma_50']), 2),
+                        "sma_200": round(float(indicators['sma_200']), 2)
+                    })
+                except Exception:
+                    pass
         
         return context
     
@@ -0,0 +1,335 @@
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+import numpy as np
+import pandas as pd
+from indian_stocks import get_indian_stocks
+from market_calendar import IST, MARKET_OPEN, MARKET_CLOSE, now_ist, slice_period
+
+try:
+    import yfinance as yf
+except ImportError:
+    yf = None  # Only the offline replay provider is usable without yfinance
+
+
+class MarketDataProvider(ABC):
+    """
+    Source of raw OHLCV history and company info for StockDataFetcher
+
+    Providers work on exact tickers (with exchange suffix) and return raw
+    yfinance-shaped frames: a date index and Open/High/Low/Close/Volume
+    plus Dividends/Stock Splits columns. An empty frame means no data.
+    Subclasses must implement history and info; download defaults to one
+    history call per ticker.
+    """
+
+    name = "base"
+
+    def as_of(self):
+        """
+        Date that periods are measured back from
+
+        Returns:
+            pandas.Timestamp: Fixed end date, or None for "today"
+        """
+        return None
+
+    @abstractmethod
+    def history(self, ticker, period=None, start=None, interval="1d"):
+        """
+        Fetch history for one ticker
+
+        Args:
+            ticker (str): Ticker symbol with exchange suffix
+            period (str): Time period, used when start is not given
+            start (pandas.Timestamp): First date to fetch
+            interval (str): Bar size (1d, 5m, 1m, ...)
+
+        Returns:
+            pandas.DataFrame: Raw OHLCV history (may be empty)
+        """
+
+    def download(self, tickers, period=None, interval="1d"):
+        """
+        Fetch history for several tickers, in one request where supported
+
+        Args:
+            tickers (list): Ticker symbols with exchange suffix
+            period (str): Time period
+            interval (str): Bar size
+
+        Returns:
+            dict: Raw history for every ticker that returned data
+        """
+        frames = {}
+        for ticker in tickers:
+            stock_data = self.history(ticker, period=period, interval=interval)
+            if stock_data is not None and not stock_data.empty:
+                frames[ticker] = stock_data
+        return frames
+
+    @abstractmethod
+    def info(self, ticker):
+        """
+        Fetch company information for one ticker
+
+        Args:
+            ticker (str): Ticker symbol with exchange suffix
+
+        Returns:
+            dict: yfinance style info dict (empty if unknown)
+        """
+
+
+class YFinanceProvider(MarketDataProvider):
+    """
+    Live market data from Yahoo Finance through yfinance
+    """
+
+    name = "yfinance"
+
+    def __init__(self):
+        if yf is None:
+            raise ImportError("yfinance is not installed, use STOCK_DATA_PROVIDER=replay for offline data")
+
+    def history(self, ticker, period=None, start=None, interval="1d"):
+        yf_ticker = yf.Ticker(ticker)
+        if start is not None:
+            start = pd.Timestamp(start)
+            # Intraday polls pass a bar timestamp so only newer bars come back
+            if interval == "1d":
+                start = start.strftime('%Y-%m-%d')
+            return yf_ticker.history(start=start, interval=interval)
+        return yf_ticker.history(period=period, interval=interval)
+
+    def download(self, tickers, period=None, interval="1d"):
+        raw = yf.download(
+            tickers=list(tickers),
+            period=period,
+            interval=interval,
+            group_by='ticker',
+            auto_adjust=True,
+            actions=True,
+            threads=True,
+            progress=False
+        )
+
+        frames = {}
+        if raw is None or raw.empty:
+            return frames
+
+        for ticker in tickers:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if ticker not in raw.columns.get_level_values(0):
+                    continue
+                stock_data = raw[ticker].copy()
+            elif len(tickers) == 1:
+                stock_data = raw.copy()
+            else:
+                continue
+
+            stock_data.columns.name = None
+            # Tickers absent from a grouped download come back as all-NaN rows
+            stock_data = stock_data.dropna(how='all', subset=[
+                col for col in ['Open', 'High', 'Low', 'Close'] if col in stock_data.columns
+            ])
+            if not stock_data.empty:
+                frames[ticker] = stock_data
+
+        return frames
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info
+
+
+class ReplayProvider(MarketDataProvider):
+    """
+    Deterministic offline market data for benchmarks and load tests
+
+    Tickers with a CSV file in `data_dir` (named like RELIANCE.NS.csv, with a
+    Date column and OHLCV columns) are replayed from disk. Other NSE tickers
+    get a synthetic random-walk series seeded from the symbol, so the same
+    symbol always yields the same bars. BSE tickers have no synthetic data,
+    which keeps the NSE-first fallback path realistic. When `symbols` is
+    given, only those symbols are synthesized and all others are unlisted.
+    """
+
+    name = "replay"
+    SYNTHETIC_BARS = 2520  # About 10 years of trading days
+    INTRADAY_MINUTES = {"1m": 1, "2m": 2, "5m": 5, "15m": 15, "30m": 30, "60m": 60, "1h": 60}
+
+    def __init__(self, data_dir=None, seed=0, end=None, latency=0.0, synthetic=True, symbols=None):
+        self.data_dir = data_dir
+        self.symbols = set(symbols) if symbols is not None else None
+        self.seed = seed
+        self.end = pd.Timestamp(end).normalize() if end is not None else None
+        self.latency = latency
+        self.synthetic = synthetic
+        self._cache = {}
+
+    def _end_date(self):
+        return self.end if self.end is not None else pd.Timestamp(now_ist().date())
+
+    def as_of(self):
+        return self.end
+
+    def _symbol_seed(self, ticker):
+        return zlib.crc32(ticker.split('.')[0].encode()) + self.seed
+
+    def _load(self, ticker):
+        key = (ticker, self._end_date())
+        if key in self._cache:
+            return self._cache[key]
+
+        stock_data = None
+        if self.data_dir:
+            path = os.path.join(self.data_dir, f"{ticker}.csv")
+            if os.path.exists(path):
+                stock_data = pd.read_csv(path, index_col=0, parse_dates=True)
+                stock_data.index.name = 'Date'
+                stock_data = stock_data[stock_data.index <= self._end_date()]
+
+        if stock_data is None and self._is_synthetic(ticker):
+            stock_data = self._generate(ticker)
+
+        if stock_data is None:
+            stock_data = pd.DataFrame()
+
+        self._cache[key] = stock_data
+        return stock_data
+
+    def _is_synthetic(self, ticker):
+        if not self.synthetic or not ticker.endswith(".NS"):
+            return False
+        return self.symbols is None or ticker[:-len(".NS")] in self.symbols
+
+    def _generate(self, ticker):
+        rng = np.random.default_rng(self._symbol_seed(ticker))
+        dates = pd.bdate_range(end=self._end_date(), periods=self.SYNTHETIC_BARS, name='Date')
+
+        start_price = rng.uniform(50, 5000)
+        drift = rng.normal(0.0003, 0.0004)
+        volatility = rng.uniform(0.01, 0.03)
+        close = start_price * np.exp(np.cumsum(rng.normal(drift, volatility, len(dates))))
+
+        open_ = close * np.exp(rng.normal(0, volatility / 3, len(dates)))
+        spread = np.abs(rng.normal(0, volatility / 2, len(dates)))
+        high = np.maximum(open_, close) * (1 + spread)
+        low = np.minimum(open_, close) * (1 - spread)
+        base_volume = rng.uniform(2e5, 2e7)
+        volume = (base_volume * rng.lognormal(0, 0.4, len(dates))).astype(np.int64)
+
+        return pd.DataFrame({
+            'Open': open_,
+            'High': high,
+            'Low': low,
+            'Close': close,
+            'Volume': volume,
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=dates)
+
+    def history(self, ticker, period=None, start=None, interval="1d"):
+        if self.latency:
+            time.sleep(self.latency)
+        if interval in self.INTRADAY_MINUTES:
+            return self._intraday(ticker, self.INTRADAY_MINUTES[interval], start)
+        if interval != "1d":
+            return pd.DataFrame()
+
+        stock_data = self._load(ticker)
+        if stock_data.empty:
+            return stock_data.copy()
+        if start is not None:
+            return stock_data[stock_data.index >= pd.Timestamp(start)].copy()
+        return slice_period(stock_data, period or "1mo", self._end_date()).copy()
+
+    def _intraday(self, ticker, minutes, start=None):
+        """
+        Synthetic bars for the last session, ending at its daily close
+
+        Today's session only has bars up to the current time, so repeated
+        polls see new bars appear like a live feed.
+        """
+        daily = self._load(ticker)
+        if daily.empty:
+            return pd.DataFrame()
+
+        session = daily.index[-1]
+        session_open = pd.Timestamp.combine(session.date(), MARKET_OPEN).tz_localize(IST)
+        session_close = pd.Timestamp.combine(session.date(), MARKET_CLOSE).tz_localize(IST)
+        times = pd.date_range(session_open, session_close, freq=f"{minutes}min", inclusive='left', name='Datetime')
+
+        rng = np.random.default_rng(self._symbol_seed(ticker) + int(session.strftime('%Y%m%d')) + minutes)
+        day = daily.iloc[-1]
+        # A bridge from the day's open to its close keeps intraday and daily bars consistent
+        steps = rng.normal(0, 1, len(times)).cumsum()
+        bridge = steps - np.linspace(0, steps[-1], len(times))
+        close = np.linspace(day['Open'], day['Close'], len(times)) * np.exp(bridge * 0.002)
+        open_ = np.concatenate([[day['Open']], close[:-1]])
+        spread = np.abs(rng.normal(0, 0.001, len(times)))
+        bars = pd.DataFrame({
+            'Open': open_,
+            'High': np.maximum(open_, close) * (1 + spread),
+            'Low': np.minimum(open_, close) * (1 - spread),
+            'Close': close,
+            'Volume': (day['Volume'] / len(times) * rng.lognormal(0, 0.5, len(times))).astype(np.int64),
+            'Dividends': 0.0,
+            'Stock Splits': 0.0
+        }, index=times)
+
+        if self.end is None:
+            bars = bars[bars.index <= now_ist()]
+        if start is not None:
+            start = pd.Timestamp(start)
+            bars = bars[bars.index >= (start if start.tzinfo else start.tz_localize(IST))]
+        return bars
+
+    def info(self, ticker):
+        if self.latency:
+            time.sleep(self.latency)
+
+        stock_data = self._load(ticker)
+        if stock_data.empty:
+            return {}
+
+        rng = np.random.default_rng(self._symbol_seed(ticker) + 1)
+        price = float(stock_data['Close'].iloc[-1])
+        shares = int(rng.uniform(1e8, 5e9))
+        return {
+            'symbol': ticker,
+            'shortName': ticker.split('.')[0],
+            'sector': rng.choice(['Financial Services', 'Technology', 'Energy', 'Healthcare', 'Consumer Defensive']),
+            'currency': 'INR',
+            'currentPrice': price,
+            'sharesOutstanding': shares,
+            'marketCap': price * shares,
+            'trailingPE': float(rng.uniform(8, 60)),
+            'priceToBook': float(rng.uniform(1, 12)),
+            'dividendYield': float(rng.uniform(0, 0.04)),
+            'fiftyTwoWeekHigh': float(stock_data['High'].iloc[-252:].max()),
+            'fiftyTwoWeekLow': float(stock_data['Low'].iloc[-252:].min())
+        }
+
+
+def get_default_provider():
+    """
+    Build the provider selected by the STOCK_DATA_PROVIDER environment variable
+
+    "yfinance" (the default) uses live data. "replay" serves offline data
+    from STOCK_REPLAY_DIR, falling back to synthetic series for the symbols
+    in get_indian_stocks(); setting
+    STOCK_REPLAY_END pins the last bar date for fully reproducible runs.
+
+    Returns:
+        MarketDataProvider: Configured provider
+    """
+    provider_name = os.environ.get('STOCK_DATA_PROVIDER', 'yfinance').lower()
+    if provider_name == 'replay':
+        return ReplayProvider(
+            data_dir=os.environ.get('STOCK_REPLAY_DIR'),
+            end=os.environ.get('STOCK_REPLAY_END'),
+            symbols=get_indian_stocks().keys()
+        )
+    return YFinanceProvider()
@@ -0,0 +1,195 @@
+import os
+import sqlite3
+import time
+import pandas as pd
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+DEFAULT_STORE_PATH = os.path.join(CACHE_DIR, "market_data.sqlite")
+
+STORE_COLUMNS = {
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume',
+    'Dividends': 'dividends',
+    'Stock Splits': 'splits'
+}
+
+
+def default_store_path(name=None):
+    """
+    Store location for a data source, under STOCK_DATA_STORE when it is set
+
+    Args:
+        name (str): Non-default data source name, e.g. "replay", or None
+            for the live store
+
+    Returns:
+        str: Path of that source's SQLite file, e.g. market_data_replay.sqlite
+            next to market_data.sqlite
+    """
+    path = os.environ.get('STOCK_DATA_STORE', DEFAULT_STORE_PATH)
+    if name is None:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}_{name}{extension}"
+
+
+class OHLCVStore:
+    """
+    Local SQLite store of daily OHLCV history keyed by yfinance ticker
+
+    Each ticker keeps its bars plus a metadata row recording the earliest
+    date the stored history is complete from, the last stored bar and when
+    it was last topped up, so callers only need to download newer bars.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_store_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._create_tables()
+
+    def _connect(self):
+        # A short-lived connection per call keeps the store safe to share
+        # between Streamlit sessions and worker threads
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _create_tables(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ohlcv (
+                    ticker TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    open REAL, high REAL, low REAL, close REAL,
+                    volume INTEGER, dividends REAL, splits REAL,
+                    PRIMARY KEY (ticker, date)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS ohlcv_meta (
+                    ticker TEXT PRIMARY KEY,
+                    covered_from TEXT,
+                    last_date TEXT,
+                    updated_at REAL
+                )
+            """)
+
+    def get_meta(self, ticker):
+        """
+        Get coverage information for a stored ticker
+
+        Args:
+            ticker (str): yfinance ticker symbol (with exchange suffix)
+
+        Returns:
+            dict: covered_from (Timestamp or None for full history), last_date
+                (Timestamp) and updated_at (epoch seconds), or None if unknown
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT covered_from, last_date, updated_at FROM ohlcv_meta WHERE ticker = ?",
+                (ticker,)
+            ).fetchone()
+
+        if row is None or row[1] is None:
+            return None
+
+        return {
+            'covered_from': pd.Timestamp(row[0]) if row[0] else None,
+            'last_date': pd.Timestamp(row[1]),
+            'updated_at': row[2]
+        }
+
+    def read(self, ticker, start=None):
+        """
+        Read stored bars for a ticker
+
+        Args:
+            ticker (str): yfinance ticker symbol
+            start (pandas.Timestamp): Only return bars on or after this date
+
+        Returns:
+            pandas.DataFrame: OHLCV data in yfinance column layout (may be empty)
+        """
+        query = "SELECT date, open, high, low, close, volume, dividends, splits FROM ohlcv WHERE ticker = ?"
+        params = [ticker]
+        if start is not None:
+            query += " AND date >= ?"
+            params.append(pd.Timestamp(start).isoformat())
+        query += " ORDER BY date"
+
+        with self._connect() as conn:
+            stock_data = pd.read_sql_query(query, conn, params=params)
+
+        stock_data['date'] = pd.to_datetime(stock_data['date'])
+        stock_data = stock_data.set_index('date')
+        stock_data.index.name = 'Date'
+        return stock_data.rename(columns={v: k for k, v in STORE_COLUMNS.items()})
+
+    def write(self, ticker, stock_data, covered_from=None, replace=False):
+        """
+        Insert or update bars for a ticker and refresh its metadata
+
+        Args:
+            ticker (str): yfinance ticker symbol
+            stock_data (pandas.DataFrame): Cleaned OHLCV data indexed by date
+            covered_from (pandas.Timestamp): Earliest date the stored history is
+                complete from after this write (None means the full history)
+            replace (bool): Drop all previously stored bars first
+        """
+        if stock_data is None or stock_data.empty:
+            return
+
+        frame = stock_data.reindex(columns=list(STORE_COLUMNS)).rename(columns=STORE_COLUMNS)
+        frame['dividends'] = frame['dividends'].fillna(0.0)
+        frame['splits'] = frame['splits'].fillna(0.0)
+        rows = [
+            (ticker, date.isoformat(), *(None if pd.isna(v) else float(v) for v in values))
+            for date, values in zip(pd.DatetimeIndex(stock_data.index), frame.itertuples(index=False))
+        ]
+
+        with self._connect() as conn:
+            if replace:
+                conn.execute("DELETE FROM ohlcv WHERE ticker = ?", (ticker,))
+            conn.executemany(
+                "INSERT OR REPLACE INTO ohlcv VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            last_date = conn.execute(
+                "SELECT MAX(date) FROM ohlcv WHERE ticker = ?", (ticker,)
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT OR REPLACE INTO ohlcv_meta VALUES (?, ?, ?, ?)",
+                (
+                    ticker,
+                    pd.Timestamp(covered_from).isoformat() if covered_from is not None else None,
+                    last_date,
+                    time.time()
+                )
+            )
+
+    def touch(self, ticker):
+        """
+        Mark a ticker as checked without changing its bars
+
+        Args:
+            ticker (str): yfinance ticker symbol
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ohlcv_meta SET updated_at = ? WHERE ticker = ?",
+                (time.time(), ticker)
+            )
+
+    def tickers(self):
+        """
+        List every ticker that has stored history
+
+        Returns:
+            list: yfinance ticker symbols
+        """
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT ticker FROM ohlcv_meta ORDER BY ticker")]
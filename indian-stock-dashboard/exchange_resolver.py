@@ -0,0 +1,212 @@
+import os
+import sqlite3
+import threading
+import time
+from data_store import default_store_path
+
+# Stored in place of a suffix for symbols found on neither exchange
+NOT_LISTED = ""
+
+
+class ExchangeResolver:
+    """
+    Persistent symbol to exchange suffix map for the NSE/BSE fallback
+
+    Known symbols go straight to the exchange that served them last time.
+    Entries past their TTL are still served and re-probed by a background
+    thread instead of on the request path.
+
+    An empty response is not proof that a symbol is unlisted (it is also
+    what an upstream outage looks like), so the request path only reports
+    misses. Negative entries are written by the background probe alone,
+    after the symbol came back empty on several consecutive passes, and
+    while they are fresh requests for the symbol skip the upstream.
+    """
+
+    def __init__(self, path=None, ttl=7 * 24 * 3600, negative_ttl=24 * 3600, confirmations=3):
+        self.path = path or default_store_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.confirmations = confirmations
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._misses = {}
+        self._refresh_thread = None
+        self._stop_event = threading.Event()
+        self._load()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _load(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS exchange_map (
+                    symbol TEXT PRIMARY KEY,
+                    suffix TEXT NOT NULL,
+                    checked_at REAL NOT NULL
+                )
+            """)
+            rows = conn.execute("SELECT symbol, suffix, checked_at FROM exchange_map").fetchall()
+
+        with self._lock:
+            self._entries = {symbol: (suffix, checked_at) for symbol, suffix, checked_at in rows}
+
+    def lookup(self, symbol):
+        """
+        Get the resolved exchange suffix for a symbol
+
+        Args:
+            symbol (str): Stock symbol without suffix
+
+        Returns:
+            str: Exchange suffix (".NS" or ".BO"), NOT_LISTED for symbols found
+                on neither exchange, or None if the symbol was never resolved
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+        return entry[0] if entry is not None else None
+
+    def is_unlisted(self, symbol):
+        """
+        Check whether a symbol was recently confirmed to be on neither exchange
+
+        Args:
+            symbol (str): Stock symbol without suffix
+
+        Returns:
+            bool: True while the symbol's negative entry is within negative_ttl
+        """
+        with self._lock:
+            entry = self._entries.get(symbol)
+        return entry is not None and entry[0] == NOT_LISTED and time.time() - entry[1] <= self.negative_ttl
+
+    def record(self, symbol, suffix):
+        """
+        Remember where a symbol was found
+
+        Args:
+            symbol (str): Stock symbol without suffix
+            suffix (str): Exchange suffix that returned data, or None if neither did
+                (only the background probe records None, see refresh_stale)
+        """
+        suffix = suffix or NOT_LISTED
+        checked_at = time.time()
+        with self._lock:
+            self._entries[symbol] = (suffix, checked_at)
+            if suffix != NOT_LISTED:
+                self._misses.pop(symbol, None)
+
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO exchange_map VALUES (?, ?, ?)",
+                    (symbol, suffix, checked_at)
+                )
+        except sqlite3.Error:
+            pass
+
+    def report_missing(self, symbol):
+        """
+        Note that a request found no data for a symbol on either exchange
+
+        Nothing is persisted; the symbol is queued for the background probe,
+        which decides whether it is really unlisted.
+
+        Args:
+            symbol (str): Stock symbol without suffix
+        """
+        with self._lock:
+            self._misses.setdefault(symbol, 0)
+
+    def stale_symbols(self):
+        """
+        List symbols whose resolution is due for a re-check
+
+        Returns:
+            list: Symbols reported missing, then symbols past their positive
+                or negative TTL
+        """
+        now = time.time()
+        with self._lock:
+            stale = [
+                symbol for symbol, (suffix, checked_at) in self._entries.items()
+                if now - checked_at > (self.negative_ttl if suffix == NOT_LISTED else self.ttl)
+                and symbol not in self._misses
+            ]
+            return list(self._misses) + stale
+
+    def refresh_stale(self, probe, limit=None):
+        """
+        Re-probe stale symbols and persist the results
+
+        A symbol is recorded as unlisted only after `confirmations` passes in
+        a row found it on neither exchange (one pass renews an existing
+        negative entry). Until then its old entry is kept and it is probed
+        again on the next pass.
+
+        Args:
+            probe (callable): Function mapping a symbol to its exchange suffix or None
+            limit (int): Maximum number of symbols to re-probe in this call
+
+        Returns:
+            int: Number of symbols re-probed
+        """
+        symbols = self.stale_symbols()
+        if limit is not None:
+            symbols = symbols[:limit]
+
+        refreshed = 0
+        for symbol in symbols:
+            if self._stop_event.is_set():
+                break
+            try:
+                suffix = probe(symbol)
+            except Exception:
+                # Leave the old entry in place when the upstream is unavailable
+                continue
+            refreshed += 1
+            if suffix:
+                self.record(symbol, suffix)
+                continue
+
+            with self._lock:
+                misses = self._misses.get(symbol, 0) + 1
+                confirmed = misses >= self.confirmations or self._entries.get(symbol, (None,))[0] == NOT_LISTED
+                if confirmed:
+                    self._misses.pop(symbol, None)
+                else:
+                    self._misses[symbol] = misses
+            if confirmed:
+                self.record(symbol, None)
+
+        return refreshed
+
+    def start_background_refresh(self, probe, interval=3600, batch_size=50):
+        """
+        Start a daemon thread that periodically re-probes stale entries
+
+        Args:
+            probe (callable): Function mapping a symbol to its exchange suffix or None
+            interval (int): Seconds between refresh passes
+            batch_size (int): Maximum symbols re-probed per pass
+        """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+
+        def run():
+            while not self._stop_event.wait(interval):
+                self.refresh_stale(probe, limit=batch_size)
+
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(target=run, name="exchange-resolver-refresh", daemon=True)
+        self._refresh_thread.start()
+
+    def stop_background_refresh(self):
+        """
+        Stop the background refresh thread if it is running
+        """
+        self._stop_event.set()
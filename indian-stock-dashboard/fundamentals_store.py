@@ -0,0 +1,285 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from data_store import default_store_path
+
+MINUTE = 60
+DAY = 24 * 3600
+
+# Fields that move with the share price go stale within minutes
+VALUATION_FIELDS = {
+    'currentPrice', 'regularMarketPrice', 'previousClose', 'open', 'dayHigh', 'dayLow',
+    'marketCap', 'enterpriseValue', 'trailingPE', 'forwardPE', 'priceToBook',
+    'priceToSalesTrailing12Months', 'pegRatio', 'dividendYield', 'trailingAnnualDividendYield',
+    'volume', 'regularMarketVolume', 'bid', 'ask', 'fiftyTwoWeekHigh', 'fiftyTwoWeekLow',
+    'fiftyDayAverage', 'twoHundredDayAverage', 'enterpriseToRevenue', 'enterpriseToEbitda'
+}
+
+# Descriptive and share-count fields rarely change
+SLOW_FIELDS = {
+    'symbol', 'shortName', 'longName', 'sector', 'industry', 'country', 'city', 'website',
+    'currency', 'exchange', 'quoteType', 'longBusinessSummary', 'fullTimeEmployees',
+    'sharesOutstanding', 'floatShares', 'impliedSharesOutstanding', 'heldPercentInsiders',
+    'heldPercentInstitutions'
+}
+
+# What get_stock_info keeps fresh unless a caller asks for valuation fields
+INFO_FIELDS = sorted(SLOW_FIELDS)
+
+
+class FundamentalsStore:
+    """
+    On-disk snapshot store for company info with per-field TTLs
+
+    Each info field is stored with the time it was fetched. Valuation
+    fields expire after `valuation_ttl`, descriptive fields after
+    `slow_ttl` and everything else (quarterly financials and ratios)
+    after `default_ttl`. A snapshot is only refetched when a field the
+    caller asked for has expired; fields past their TTL that were not
+    asked for are left out of the result rather than served stale.
+    """
+
+    def __init__(self, path=None, valuation_ttl=15 * MINUTE, slow_ttl=7 * DAY, default_ttl=DAY):
+        self.path = path or default_store_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.valuation_ttl = valuation_ttl
+        self.slow_ttl = slow_ttl
+        self.default_ttl = default_ttl
+        self._lock = threading.Lock()
+        self._snapshots = {}
+        self._load()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _load(self):
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS fundamentals (
+                    symbol TEXT NOT NULL,
+                    field TEXT NOT NULL,
+                    value TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (symbol, field)
+                )
+            """)
+            rows = conn.execute("SELECT symbol, field, value, fetched_at FROM fundamentals").fetchall()
+
+        snapshots = {}
+        for symbol, field, value, fetched_at in rows:
+            snapshots.setdefault(symbol, {})[field] = (json.loads(value), fetched_at)
+
+        with self._lock:
+            self._snapshots = snapshots
+
+    def field_ttl(self, field):
+        """
+        Time to live for one info field
+
+        Args:
+            field (str): yfinance info key
+
+        Returns:
+            float: TTL in seconds
+        """
+        if field in VALUATION_FIELDS:
+            return self.valuation_ttl
+        if field in SLOW_FIELDS:
+            return self.slow_ttl
+        return self.default_ttl
+
+    def is_fresh(self, symbol, fields=None):
+        """
+        Check whether a stored snapshot can be served as is
+
+        Args:
+            symbol (str): Stock symbol
+            fields (list): Fields the caller needs (all stored fields if None)
+
+        Returns:
+            bool: True if every needed field is within its TTL
+        """
+        now = time.time()
+        with self._lock:
+            snapshot = self._snapshots.get(symbol)
+            if not snapshot:
+                return False
+            fetched_at = max(entry[1] for entry in snapshot.values())
+            for field in (fields if fields is not None else snapshot):
+                # A field the last fetch did not return is known to be missing as of that fetch
+                entry = snapshot.get(field)
+                if now - (entry[1] if entry is not None else fetched_at) > self.field_ttl(field):
+                    return False
+        return True
+
+    def read(self, symbol, fresh_only=False):
+        """
+        Read the stored snapshot for a symbol
+
+        Args:
+            symbol (str): Stock symbol
+            fresh_only (bool): Leave out fields past their TTL
+
+        Returns:
+            dict: Stored info fields (empty if never fetched)
+        """
+        now = time.time()
+        with self._lock:
+            snapshot = self._snapshots.get(symbol, {})
+            return {
+                field: value for field, (value, fetched_at) in snapshot.items()
+                if not fresh_only or now - fetched_at <= self.field_ttl(field)
+            }
+
+    def write(self, symbol, info):
+        """
+        Store a freshly fetched info dict
+
+        Args:
+            symbol (str): Stock symbol
+            info (dict): yfinance style info dict
+        """
+        fetched_at = time.time()
+        rows = []
+        snapshot = {}
+        for field, value in info.items():
+            try:
+                encoded = json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            rows.append((symbol, field, encoded, fetched_at))
+            snapshot[field] = (json.loads(encoded), fetched_at)
+
+        with self._lock:
+            self._snapshots[symbol] = snapshot
+
+        with self._connect() as conn:
+            conn.execute("DELETE FROM fundamentals WHERE symbol = ?", (symbol,))
+            conn.executemany("INSERT INTO fundamentals VALUES (?, ?, ?, ?)", rows)
+
+    def get(self, symbol, fetch, fields=None):
+        """
+        Get company info, refetching only when needed fields have expired
+
+        Args:
+            symbol (str): Stock symbol
+            fetch (callable): Function returning a fresh info dict for a symbol
+            fields (list): Fields the caller needs (all fields if None)
+
+        Returns:
+            dict: Info fields (stale data is returned if the refetch fails)
+        """
+        if self.is_fresh(symbol, fields):
+            return self.read(symbol, fresh_only=True)
+
+        try:
+            info = fetch(symbol)
+        except Exception:
+            info = None
+
+        if info:
+            try:
+                self.write(symbol, info)
+            except Exception:
+                # A full or locked disk should not lose a successful fetch
+                pass
+            return dict(info)
+        return self.read(symbol)
+
+    def warm_up(self, symbols, fetch, max_workers=8, fields=None):
+        """
+        Refresh every expired snapshot in a list of symbols
+
+        Args:
+            symbols (list): Stock symbols, e.g. all of get_indian_stocks()
+            fetch (callable): Function returning a fresh info dict for a symbol
+            max_workers (int): Maximum parallel info requests
+            fields (list): Fields that must be fresh (all fields if None)
+
+        Returns:
+            dict: {'refreshed': count, 'failures': {symbol: reason}}
+        """
+        stale = [symbol for symbol in symbols if not self.is_fresh(symbol, fields)]
+        result = {'refreshed': 0, 'failures': {}}
+        if not stale:
+            return result
+
+        def refresh(symbol):
+            info = fetch(symbol)
+            if not info:
+                raise ValueError("No company info available")
+            self.write(symbol, info)
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(stale)))) as executor:
+            futures = {symbol: executor.submit(refresh, symbol) for symbol in stale}
+            for symbol, future in futures.items():
+                try:
+                    future.result()
+                    result['refreshed'] += 1
+                except Exception as e:
+                    result['failures'][symbol] = str(e)
+
+        return result
+
+    def snapshot_frame(self, fields, symbols=None):
+        """
+        Build a table of stored fields for screening, without any network calls
+
+        Args:
+            fields (list): Info fields to include as columns
+            symbols (list): Symbols to include (all stored symbols if None)
+
+        Returns:
+            pandas.DataFrame: One row per symbol, NaN where a field is missing
+        """
+        with self._lock:
+            symbols = list(symbols) if symbols is not None else sorted(self._snapshots)
+            rows = {
+                symbol: {
+                    field: self._snapshots.get(symbol, {}).get(field, (None, 0))[0]
+                    for field in fields
+                }
+                for symbol in symbols
+            }
+
+        return pd.DataFrame.from_dict(rows, orient='index', columns=list(fields))
+
+    def screen(self, filters, symbols=None):
+        """
+        Filter stored snapshots by numeric ranges
+
+        Args:
+            filters (dict): Field to (minimum, maximum) bounds, either may be None,
+                e.g. {'trailingPE': (None, 20), 'marketCap': (1e11, None)}
+            symbols (list): Symbols to consider (all stored symbols if None)
+
+        Returns:
+            pandas.DataFrame: Matching rows with one column per filtered field
+        """
+        frame = self.snapshot_frame(list(filters), symbols)
+        mask = pd.Series(True, index=frame.index)
+        for field, (minimum, maximum) in filters.items():
+            values = pd.to_numeric(frame[field], errors='coerce')
+            if minimum is not None:
+                mask &= values >= minimum
+            if maximum is not None:
+                mask &= values <= maximum
+        return frame[mask]
+
+
+if __name__ == "__main__":
+    # Warm the fundamentals store for the whole stock universe
+    from indian_stocks import get_indian_stocks
+    from stock_data import StockDataFetcher
+
+    fetcher = StockDataFetcher()
+    started = time.time()
+    outcome = fetcher.warm_up_fundamentals(list(get_indian_stocks()))
+    print(f"Refreshed {outcome['refreshed']} symbols in {time.time() - started:.1f}s, "
+          f"{len(outcome['failures'])} failed")
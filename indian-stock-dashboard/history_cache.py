@@ -0,0 +1,162 @@
+from market_calendar import period_start, slice_period
+from stock_data import NO_DATA, UNLISTED
+
+# Periods ordered from shortest to longest
+PERIOD_ORDER = ["1d", "5d", "1mo", "3mo", "6mo", "ytd", "1y", "2y", "5y", "10y", "max"]
+
+
+class HistoryCache:
+    """
+    Per-symbol history cache that answers any shorter period by slicing
+
+    Each entry remembers the period it was fetched with. A request for a
+    period that entry covers is sliced locally; only a longer period
+    triggers a fetch, and that fetch always pulls at least
+    `longest_period` so later period switches stay local.
+    """
+
+    def __init__(self, fetcher, storage=None, longest_period="2y"):
+        self.fetcher = fetcher
+        # Any dict-like mapping works, e.g. a dict or a process-wide SharedCache
+        self.storage = storage if storage is not None else {}
+        self.longest_period = longest_period
+
+    def _as_of(self):
+        return self.fetcher.provider.as_of()
+
+    def _fetch_period(self, period):
+        # Always fetch the longer of the requested and the default window
+        if PERIOD_ORDER.index(period) > PERIOD_ORDER.index(self.longest_period):
+            return period
+        return self.longest_period
+
+    def covers(self, symbol, period):
+        """
+        Check whether a cached entry can answer a period without fetching
+
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period
+
+        Returns:
+            bool: True if the cached history reaches back far enough
+        """
+        entry = self.storage.get(symbol)
+        if entry is None:
+            return False
+        if entry['period'] == "max":
+            return True
+        if period == "max":
+            return False
+        return entry['start'] <= period_start(period, self._as_of())
+
+    def get(self, symbol, period):
+        """
+        Get history for one symbol and period
+
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period
+
+        Returns:
+            pandas.DataFrame: Stock data for the period, or None if unavailable
+        """
+        if self.covers(symbol, period):
+            entry = self.storage.get(symbol)
+            if entry is not None:
+                return slice_period(entry['data'], period, self._as_of())
+
+        fetch_period = self._fetch_period(period)
+        stock_data = self.fetcher.get_stock_data(symbol, fetch_period)
+        if stock_data is None or stock_data.empty:
+            return None
+        self.put(symbol, stock_data, fetch_period)
+        return slice_period(stock_data, period, self._as_of())
+
+    def longest(self, symbol):
+        """
+        Longest cached history for a symbol, without fetching
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            pandas.DataFrame: Everything cached for the symbol, or None if nothing is
+        """
+        entry = self.storage.get(symbol)
+        return entry['data'] if entry is not None else None
+
+    def get_many(self, symbols, period, async_fetcher=None):
+        """
+        Get history for many symbols, fetching only uncovered ones
+
+        Uncovered symbols are loaded with fetch_stocks_batch: store top-ups
+        and one grouped download. Symbols that fail with an error rather
+        than a lack of data are retried through the async fetcher.
+
+        Args:
+            symbols (list): List of stock symbols
+            period (str): Time period
+            async_fetcher (AsyncStockDataFetcher): Retries failed symbols with backoff
+
+        Returns:
+            dict: {'data': {symbol: DataFrame}, 'failures': {symbol: reason}}
+        """
+        missing = [symbol for symbol in symbols if not self.covers(symbol, period)]
+        failures = {}
+        fetched = {'data': {}}
+
+        if missing:
+            fetch_period = self._fetch_period(period)
+            try:
+                fetched = self.fetcher.fetch_stocks_batch(missing, fetch_period)
+            except Exception as e:
+                fetched = {'data': {}, 'failures': {symbol: str(e) for symbol in missing}}
+
+            retry = [symbol for symbol, reason in fetched['failures'].items() if reason not in (NO_DATA, UNLISTED)]
+            if async_fetcher is not None and retry:
+                retried = async_fetcher.fetch_stocks(retry, fetch_period)
+                fetched['data'].update(retried['data'])
+                for symbol in retried['data']:
+                    fetched['failures'].pop(symbol, None)
+                fetched['failures'].update(retried['failures'])
+
+            for symbol, stock_data in fetched['data'].items():
+                self.put(symbol, stock_data, fetch_period)
+            failures = fetched['failures']
+
+        data = {}
+        for symbol in symbols:
+            # Storage may be shared and evict entries, so fall back to what was just fetched
+            entry = self.storage.get(symbol)
+            stock_data = entry['data'] if entry is not None else fetched['data'].get(symbol)
+            if stock_data is not None:
+                data[symbol] = slice_period(stock_data, period, self._as_of())
+            elif symbol not in failures:
+                failures[symbol] = NO_DATA
+
+        return {'data': data, 'failures': failures}
+
+    def put(self, symbol, stock_data, period):
+        """
+        Store fetched history together with the range it covers
+
+        Args:
+            symbol (str): Stock symbol
+            stock_data (pandas.DataFrame): Stock data
+            period (str): Period the data was fetched with
+        """
+        self.storage[symbol] = {
+            'period': period,
+            'start': period_start(period, self._as_of()) if period != "max" else None,
+            'data': stock_data
+        }
+
+    def drop(self, symbol):
+        """
+        Forget one symbol's history
+
+        Args:
+            symbol (str): Stock symbol
+        """
+        self.storage.pop(symbol, None)
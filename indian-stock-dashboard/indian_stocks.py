@@ -1,3 +1,5 @@
+from stock_search import StockSearchIndex
+
 def get_indian_stocks():
     """
     Return a comprehensive dictionary of Indian stocks with their company names
@@ -321,25 +323,30 @@ def get_nifty_next_50_stocks():
     ]
     return nifty_next_50
 
-def search_indian_stocks(query):
+def get_search_index():
+    """
+    Get the search index over all Indian stocks, built once at import
+    
+    Returns:
+        StockSearchIndex: Ranked, typo-tolerant symbol and name index
+    """
+    return _SEARCH_INDEX
+
+def search_indian_stocks(query, limit=None):
     """
     Search for Indian stocks based on symbol or company name
     
+    Results are ranked: exact symbol, symbol prefix, name prefix,
+    substring, then close misspellings (e.g. "relaince").
+    
     Args:
         query (str): Search query
+        limit (int): Maximum number of results (None for all)
         
     Returns:
         list: List of tuples (symbol, company_name) matching the query
     """
-    indian_stocks = get_indian_stocks()
-    query = query.lower()
-    
-    matches = []
-    for symbol, company_name in indian_stocks.items():
-        if query in symbol.lower() or query in company_name.lower():
-            matches.append((symbol, company_name))
-    
-    return matches
+    return _SEARCH_INDEX.search(query, limit=limit)
 
 def get_sector_wise_stocks():
     """
@@ -390,3 +397,5 @@ def get_sector_wise_stocks():
     }
     
     return sectors
+
+_SEARCH_INDEX = StockSearchIndex(get_indian_stocks())
@@ -0,0 +1,297 @@
+import numpy as np
+import indicator_kernels as kernels
+from indicator_kernels import ewm_mean
+
+
+def right_align(columns):
+    """
+    Stack 1-D arrays of different lengths into one matrix, aligned on their last row
+
+    Every symbol's history ends at its latest bar, so row -1 is always the
+    most recent value and shorter histories are padded with leading NaN.
+
+    Args:
+        columns (list): 1-D arrays, one per symbol
+
+    Returns:
+        tuple: ((rows, symbols) float64 matrix, index of each column's first real row)
+    """
+    lengths = np.array([len(column) for column in columns], dtype=np.int64)
+    rows = int(lengths.max()) if len(columns) else 0
+    matrix = np.full((rows, len(columns)), np.nan)
+    for i, column in enumerate(columns):
+        if lengths[i]:
+            matrix[rows - lengths[i]:, i] = column
+    return matrix, rows - lengths
+
+
+def _window_mask(starts, rows, window):
+    # True where a rolling window lies entirely inside the column's own history
+    return np.arange(rows)[:, None] - starts[None, :] >= window - 1
+
+
+def _within_history(result, window, starts):
+    result[~_window_mask(starts, result.shape[0], window)] = np.nan
+    return result
+
+
+def rolling_mean(x, window, starts, sums=None):
+    """
+    Rolling mean down each column, NaN until a full window of the column's own values
+
+    Args:
+        x (numpy.ndarray): (rows, symbols) matrix
+        window (int): Window length
+        starts (numpy.ndarray): First real row of each column
+        sums (WindowSums): Precomputed running sums of x, to share between windows
+
+    Returns:
+        numpy.ndarray: (rows, symbols) rolling means
+    """
+    sums = sums if sums is not None else kernels.WindowSums(x)
+    return _within_history(sums.mean(window), window, starts)
+
+
+def rolling_std(x, window, starts, sums=None):
+    """
+    Rolling sample standard deviation (ddof=1) down each column
+    """
+    sums = sums if sums is not None else kernels.WindowSums(x)
+    return _within_history(sums.std(window), window, starts)
+
+
+def rolling_min(x, window, starts):
+    """
+    Rolling minimum down each column
+    """
+    return _within_history(kernels.rolling_min(x, window), window, starts)
+
+
+def rolling_max(x, window, starts):
+    """
+    Rolling maximum down each column
+    """
+    return _within_history(kernels.rolling_max(x, window), window, starts)
+
+
+class IndicatorEngine:
+    """
+    Computes the TechnicalAnalyzer indicators for many symbols in one pass
+
+    Histories are right-aligned into (rows, symbols) matrices so every
+    indicator is a handful of NumPy operations over the whole universe
+    instead of a pandas loop per symbol. Results match the per-symbol
+    TechnicalAnalyzer methods to floating point rounding.
+    """
+
+    def __init__(self, stocks_data):
+        """
+        Args:
+            stocks_data (dict): Symbol to OHLCV DataFrame
+        """
+        stocks_data = {
+            symbol: data for symbol, data in stocks_data.items()
+            if data is not None and not data.empty
+        }
+        self.symbols = list(stocks_data)
+        frames = list(stocks_data.values())
+
+        close, starts = right_align([data['Close'].to_numpy(dtype=np.float64) for data in frames])
+        high, _ = right_align([data['High'].to_numpy(dtype=np.float64) for data in frames])
+        low, _ = right_align([data['Low'].to_numpy(dtype=np.float64) for data in frames])
+        volume, _ = right_align([data['Volume'].to_numpy(dtype=np.float64) for data in frames])
+        self._set_matrices(close, high, low, volume, starts)
+
+    @classmethod
+    def from_matrices(cls, symbols, close, high, low, volume, starts):
+        """
+        Build an engine over already right-aligned matrices, without copying them
+
+        Args:
+            symbols (list): Column names
+            close, high, low, volume (numpy.ndarray): (rows, symbols) matrices as
+                produced by right_align
+            starts (numpy.ndarray): First real row of each column
+
+        Returns:
+            IndicatorEngine: Engine over the given columns
+        """
+        engine = cls.__new__(cls)
+        engine.symbols = list(symbols)
+        engine._set_matrices(close, high, low, volume, np.asarray(starts))
+        return engine
+
+    def _set_matrices(self, close, high, low, volume, starts):
+        self.close, self.high, self.low, self.volume = close, high, low, volume
+        self.starts = starts
+        self.lengths = self.close.shape[0] - self.starts
+        self._close_sums = None
+
+    @property
+    def close_sums(self):
+        """
+        Running sums of the close, shared by every SMA and the Bollinger bands
+        """
+        if self._close_sums is None:
+            self._close_sums = kernels.WindowSums(self.close)
+        return self._close_sums
+
+    def rsi(self, period=14):
+        """
+        RSI matrix, same definition as TechnicalAnalyzer.calculate_rsi
+        """
+        return _within_history(kernels.rsi(self.close, period), period, self.starts)
+
+    def macd(self, fast=12, slow=26, signal=9):
+        """
+        MACD line, signal line and histogram matrices
+        """
+        macd = ewm_mean(self.close, fast) - ewm_mean(self.close, slow)
+        macd_signal = ewm_mean(macd, signal)
+        return macd, macd_signal, macd - macd_signal
+
+    def bollinger_bands(self, period=20, std_dev=2):
+        """
+        Upper, middle and lower Bollinger band matrices
+        """
+        middle = rolling_mean(self.close, period, self.starts, self.close_sums)
+        std = rolling_std(self.close, period, self.starts, self.close_sums)
+        return middle + std * std_dev, middle, middle - std * std_dev
+
+    def moving_averages(self, periods=(20, 50, 200)):
+        """
+        Simple moving average matrices keyed like calculate_moving_averages
+        """
+        return {f'SMA_{period}': rolling_mean(self.close, period, self.starts, self.close_sums) for period in periods}
+
+    def stochastic(self, k_period=14, d_period=3):
+        """
+        Stochastic %K and %D matrices
+        """
+        lowest_low = rolling_min(self.low, k_period, self.starts)
+        highest_high = rolling_max(self.high, k_period, self.starts)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            k_percent = 100 * ((self.close - lowest_low) / (highest_high - lowest_low))
+        d_percent = rolling_mean(k_percent, d_period, self.starts)
+        return k_percent, d_percent
+
+    def recent_trend(self, bars=5):
+        """
+        Mean daily return over the last `bars` closes, as used by get_recommendation
+
+        Returns:
+            numpy.ndarray: One value per symbol, NaN for histories shorter than `bars`
+        """
+        tail = self.close[-bars:]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            trend = (tail[1:] / tail[:-1] - 1).mean(axis=0)
+        return np.where(self.lengths >= bars, trend, np.nan)
+
+    def latest_indicators(self):
+        """
+        Latest indicator values per symbol, with calculate_indicators' fallbacks
+
+        Returns:
+            dict: Symbol to the same indicators dict calculate_indicators returns
+        """
+        if not self.symbols:
+            return {}
+
+        columns = self.latest_columns()
+        return {
+            symbol: {name: float(values[i]) for name, values in columns.items()}
+            for i, symbol in enumerate(self.symbols)
+        }
+
+    def latest_columns(self):
+        """
+        Latest indicator values as one array per indicator, in symbol order
+
+        Returns:
+            dict: calculate_indicators key to a (symbols,) array
+        """
+        def last(matrix, fallback):
+            values = matrix[-1]
+            return np.where(np.isnan(values), fallback, values)
+
+        current_price = self.close[-1]
+        rsi = last(self.rsi(), 50)
+        macd, macd_signal, macd_histogram = (last(matrix, 0) for matrix in self.macd())
+        mas = self.moving_averages((20, 50, 200))
+        bb_upper, bb_middle, bb_lower = (last(matrix, current_price) for matrix in self.bollinger_bands())
+        stoch_k, stoch_d = (last(matrix, 50) for matrix in self.stochastic())
+        volume_sma = rolling_mean(self.volume, 20, self.starts)[-1]
+
+        return {
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_histogram': macd_histogram,
+            'sma_20': last(mas['SMA_20'], current_price),
+            'sma_50': last(mas['SMA_50'], current_price),
+            'sma_200': last(mas['SMA_200'], current_price),
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower,
+            'stoch_k': stoch_k,
+            'stoch_d': stoch_d,
+            'current_price': current_price,
+            'volume_sma': volume_sma,
+            'current_volume': self.volume[-1]
+        }
+
+    def signal_scores(self):
+        """
+        get_recommendation's buy/sell scoring evaluated at every bar
+
+        Applies the same rules and indicator fallbacks as get_recommendation
+        to each row, as if the history had ended there. Indicators use the
+        full history up to the bar, so MACD can differ from the tail-only
+        latest value by the tolerance documented in
+        TechnicalAnalyzer.calculate_latest_indicators.
+
+        Returns:
+            dict: (rows, symbols) matrices 'buy' and 'sell' (scores), 'signal'
+                (1 BUY, -1 SELL, 0 HOLD, NaN before a symbol's first bar) and
+                'confidence'
+        """
+        price = self.close
+        exists = ~np.isnan(price)
+
+        def fallback(matrix, default):
+            return np.where(np.isnan(matrix), default, matrix)
+
+        rsi = fallback(self.rsi(), 50)
+        macd, macd_signal, _ = self.macd()
+        macd, macd_signal = fallback(macd, 0), fallback(macd_signal, 0)
+        mas = self.moving_averages((20, 50))
+        sma_20, sma_50 = fallback(mas['SMA_20'], price), fallback(mas['SMA_50'], price)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            buy = 2.0 * (rsi < 30) + ((price > sma_20) & (sma_20 > sma_50)) + ((macd > macd_signal) & (macd > 0))
+            sell = 2.0 * (rsi > 70) + ((price < sma_20) & (sma_20 < sma_50)) + ((macd < macd_signal) & (macd < 0))
+
+            # Volume surge backs whichever side is already ahead
+            surge = self.volume > rolling_mean(self.volume, 20, self.starts) * 1.5
+            buy_ahead, sell_ahead = buy > sell, sell > buy
+            buy = buy + 0.5 * (surge & buy_ahead)
+            sell = sell + 0.5 * (surge & sell_ahead)
+
+            # Mean of the last four daily returns, once five closes exist
+            returns = np.full(price.shape, np.nan)
+            returns[1:] = price[1:] / price[:-1] - 1
+            trend = rolling_mean(returns, 4, self.starts)
+            buy = buy + 0.5 * (trend > 0.01)
+            sell = sell + 0.5 * (trend < -0.01)
+
+        strength = np.abs(buy - sell)
+        decided = strength >= 1
+        signal = np.where(decided & (buy > sell), 1.0, np.where(decided & (sell > buy), -1.0, 0.0))
+        confidence = np.where(signal != 0, np.minimum(60 + strength * 10, 90), 50.0)
+
+        return {
+            'buy': np.where(exists, buy, np.nan),
+            'sell': np.where(exists, sell, np.nan),
+            'signal': np.where(exists, signal, np.nan),
+            'confidence': np.where(exists, confidence, np.nan)
+        }
@@ -0,0 +1,209 @@
+import re
+import numpy as np
+import indicator_kernels as kernels
+
+# Price columns every graph can read straight from an OHLCV frame
+SOURCES = {'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'}
+
+# The outputs calculate_indicators has always returned
+INDICATOR_OUTPUTS = [
+    'rsi', 'macd', 'macd_signal', 'macd_histogram', 'sma_20', 'sma_50', 'sma_200',
+    'bb_upper', 'bb_middle', 'bb_lower', 'stoch_k', 'stoch_d',
+    'current_price', 'volume_sma', 'current_volume'
+]
+
+
+class Node:
+    """
+    One step of an indicator graph
+
+    Args:
+        name (str): Output name
+        inputs (list): Names of the nodes whose values are passed to compute
+        compute (callable): Function of the input values returning a NumPy array
+            (or a shared intermediate such as kernels.WindowSums)
+        fallback: Latest value used when the last computed value is NaN,
+            either a number or the name of another node; None keeps NaN
+    """
+
+    def __init__(self, name, inputs, compute, fallback=None):
+        self.name = name
+        self.inputs = list(inputs)
+        self.compute = compute
+        self.fallback = fallback
+
+
+class IndicatorGraph:
+    """
+    Declarative registry of indicators and the intermediates they share
+
+    Each indicator names its inputs (the close diff, EMAs, running window
+    sums...) instead of computing them itself. Asking for a set of outputs
+    evaluates only the nodes those outputs depend on, and each shared
+    intermediate once, so the chart, the chat context and the screener can
+    each request just what they show. Plugging in a new indicator is one
+    add() call reusing whichever intermediates already exist.
+
+    Families such as 'sma_<n>' or 'ema_<n>' create parameterized nodes on
+    first use, so 'sma_100' needs no registration.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.families = {}
+
+    def add(self, name, inputs, compute, fallback=None):
+        """
+        Register (or replace) a node
+
+        Args:
+            name (str): Output name
+            inputs (list): Input node names
+            compute (callable): Function of the input values
+            fallback: Latest-value fallback, see Node
+
+        Returns:
+            Node: The registered node
+        """
+        self.nodes[name] = Node(name, inputs, compute, fallback)
+        return self.nodes[name]
+
+    def add_family(self, prefix, factory):
+        """
+        Register parameterized nodes named '<prefix>_<n>'
+
+        Args:
+            prefix (str): Name prefix, e.g. 'sma'
+            factory (callable): factory(n) -> (inputs, compute, fallback)
+        """
+        self.families[prefix] = factory
+
+    def node(self, name):
+        """
+        Look up a node, creating it from a family if needed
+
+        Raises:
+            KeyError: If no node or family provides `name`
+        """
+        if name in self.nodes:
+            return self.nodes[name]
+        match = re.fullmatch(r'([a-z_]+?)_(\d+)', name)
+        if match and match.group(1) in self.families:
+            return self.add(name, *self.families[match.group(1)](int(match.group(2))))
+        raise KeyError(f"Unknown indicator: {name}")
+
+    def evaluate(self, stock_data, outputs=None):
+        """
+        Start a lazy evaluation over one price history
+
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data
+            outputs (list): Nodes to compute now (default: none until accessed)
+
+        Returns:
+            GraphEvaluation: Node values computed on access and kept for reuse
+        """
+        evaluation = GraphEvaluation(self, stock_data)
+        for name in outputs or []:
+            evaluation[name]
+        return evaluation
+
+    def latest(self, stock_data, outputs=INDICATOR_OUTPUTS):
+        """
+        Last value of each requested output with its fallback applied
+
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data
+            outputs (list): Output names
+
+        Returns:
+            dict: Output name to latest value
+        """
+        return self.evaluate(stock_data).latest(outputs)
+
+
+class GraphEvaluation:
+    """
+    Node values for one price history, computed on first access
+    """
+
+    def __init__(self, graph, stock_data):
+        self.graph = graph
+        self.stock_data = stock_data
+        self.values = {}
+
+    def __getitem__(self, name):
+        if name not in self.values:
+            if name in SOURCES:
+                self.values[name] = self.stock_data[SOURCES[name]].to_numpy(dtype=np.float64)
+            else:
+                node = self.graph.node(name)
+                self.values[name] = node.compute(*(self[input_name] for input_name in node.inputs))
+        return self.values[name]
+
+    def computed(self):
+        """
+        Names of the nodes evaluated so far
+        """
+        return list(self.values)
+
+    def latest(self, outputs):
+        """
+        Last value of each output, replacing NaN with the node's fallback
+
+        Returns:
+            dict: Output name to latest value
+
+        Raises:
+            IndexError: If the history is empty
+        """
+        result = {}
+        for name in outputs:
+            value = self[name][-1]
+            fallback = self.graph.nodes[name].fallback if name in self.graph.nodes else None
+            if np.isnan(value) and fallback is not None:
+                value = self.latest([fallback])[fallback] if isinstance(fallback, str) else fallback
+            result[name] = value
+        return result
+
+
+def _default_graph():
+    graph = IndicatorGraph()
+
+    # Shared intermediates
+    graph.add('close_diff', ['close'], kernels.diff)
+    graph.add('close_sums', ['close'], kernels.WindowSums)
+    graph.add('volume_sums', ['volume'], kernels.WindowSums)
+
+    # Parameterized families
+    graph.add_family('sma', lambda n: (['close_sums'], lambda sums: sums.mean(n), 'close'))
+    graph.add_family('std', lambda n: (['close_sums'], lambda sums: sums.std(n), None))
+    graph.add_family('ema', lambda n: (['close'], lambda close: kernels.ewm_mean(close, n), 'close'))
+    graph.add_family('rsi', lambda n: (['close', 'close_diff'], lambda close, delta: kernels.rsi(close, n, delta=delta), 50))
+    graph.add_family('lowest_low', lambda n: (['low'], lambda low: kernels.rolling_min(low, n), None))
+    graph.add_family('highest_high', lambda n: (['high'], lambda high: kernels.rolling_max(high, n), None))
+    graph.add_family('volume_sma', lambda n: (['volume_sums'], lambda sums: sums.mean(n), None))
+
+    # The dashboard's indicators
+    graph.add('rsi', ['rsi_14'], lambda rsi: rsi, 50)
+    graph.add('macd', ['ema_12', 'ema_26'], np.subtract, 0)
+    graph.add('macd_signal', ['macd'], lambda macd: kernels.ewm_mean(macd, 9), 0)
+    graph.add('macd_histogram', ['macd', 'macd_signal'], np.subtract, 0)
+    graph.add('bb_middle', ['sma_20'], lambda middle: middle, 'close')
+    graph.add('bb_upper', ['sma_20', 'std_20'], lambda middle, std: middle + std * 2, 'close')
+    graph.add('bb_lower', ['sma_20', 'std_20'], lambda middle, std: middle - std * 2, 'close')
+
+    def stochastic_k(close, lowest_low, highest_high):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return 100 * ((close - lowest_low) / (highest_high - lowest_low))
+
+    graph.add('stoch_k', ['close', 'lowest_low_14', 'highest_high_14'], stochastic_k, 50)
+    graph.add('stoch_d', ['stoch_k'], lambda k: kernels.rolling_mean(k, 3), 50)
+    graph.add('current_price', ['close'], lambda close: close)
+    graph.add('volume_sma', ['volume_sma_20'], lambda sma: sma)
+    graph.add('current_volume', ['volume'], lambda volume: volume)
+    return graph
+
+
+# Graph used by TechnicalAnalyzer, the chat context and the screener
+DEFAULT_GRAPH = _default_graph()
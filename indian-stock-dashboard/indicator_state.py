@@ -0,0 +1,354 @@
+import math
+from collections import deque
+
+
+class RollingWindow:
+    """
+    Fixed-length window with running sum and sum of squares
+
+    Values are kept relative to a reference point, and the sums are rebuilt
+    from the window once per `length` updates, so rounding error never
+    builds up while each update stays O(1) amortized.
+    """
+
+    def __init__(self, length):
+        self.length = length
+        self.values = deque()
+        self.reference = None
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.updates = 0
+
+    def push(self, value):
+        if self.reference is None:
+            self.reference = value
+        self.values.append(value)
+        shifted = value - self.reference
+        self.total += shifted
+        self.total_squares += shifted * shifted
+        if len(self.values) > self.length:
+            removed = self.values.popleft() - self.reference
+            self.total -= removed
+            self.total_squares -= removed * removed
+
+        self.updates += 1
+        if self.updates >= self.length:
+            self._rebuild()
+
+    def _rebuild(self):
+        self.reference = sum(self.values) / len(self.values)
+        shifted = [value - self.reference for value in self.values]
+        self.total = sum(shifted)
+        self.total_squares = sum(value * value for value in shifted)
+        self.updates = 0
+
+    @property
+    def full(self):
+        return len(self.values) == self.length
+
+    def mean(self):
+        """
+        Window mean, or NaN until the window is full
+        """
+        if not self.full:
+            return math.nan
+        return self.total / self.length + self.reference
+
+    def std(self):
+        """
+        Window sample standard deviation (ddof=1), or NaN until the window is full
+        """
+        if not self.full or self.length < 2:
+            return math.nan
+        variance = (self.total_squares - self.total * self.total / self.length) / (self.length - 1)
+        return math.sqrt(max(variance, 0.0))
+
+    def snapshot(self):
+        return {
+            'values': list(self.values), 'reference': self.reference, 'total': self.total,
+            'total_squares': self.total_squares, 'updates': self.updates
+        }
+
+    def restore(self, snapshot):
+        self.values = deque(snapshot['values'])
+        self.reference = snapshot['reference']
+        self.total = snapshot['total']
+        self.total_squares = snapshot['total_squares']
+        self.updates = snapshot['updates']
+
+
+class ExponentialMean:
+    """
+    Running pandas ewm(span).mean() with adjust=True weights
+
+    Values are accumulated relative to the first one pushed, so a flat
+    series gives exactly that value back.
+    """
+
+    def __init__(self, span):
+        self.decay = 1 - 2.0 / (span + 1)
+        self.reference = None
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def push(self, value):
+        if self.reference is None:
+            self.reference = value
+        self.numerator = self.numerator * self.decay + (value - self.reference)
+        self.denominator = self.denominator * self.decay + 1
+        return self.value()
+
+    def value(self):
+        return self.reference + self.numerator / self.denominator if self.denominator else math.nan
+
+    def snapshot(self):
+        return {'reference': self.reference, 'numerator': self.numerator, 'denominator': self.denominator}
+
+    def restore(self, snapshot):
+        self.reference = snapshot['reference']
+        self.numerator = snapshot['numerator']
+        self.denominator = snapshot['denominator']
+
+
+class RollingExtreme:
+    """
+    Rolling minimum or maximum over the last `length` values
+
+    A monotonic deque of (position, value) pairs keeps the current extreme
+    at the front; each value is added and removed at most once.
+    """
+
+    def __init__(self, length, maximum=False):
+        self.length = length
+        self.maximum = maximum
+        self.candidates = deque()
+        self.position = 0
+
+    def push(self, value):
+        if self.maximum:
+            while self.candidates and self.candidates[-1][1] <= value:
+                self.candidates.pop()
+        else:
+            while self.candidates and self.candidates[-1][1] >= value:
+                self.candidates.pop()
+        self.candidates.append((self.position, value))
+        if self.candidates[0][0] <= self.position - self.length:
+            self.candidates.popleft()
+        self.position += 1
+
+    def value(self):
+        """
+        Window extreme, or NaN until `length` values have been seen
+        """
+        if self.position < self.length:
+            return math.nan
+        return self.candidates[0][1]
+
+    def snapshot(self):
+        return {'candidates': [list(candidate) for candidate in self.candidates], 'position': self.position}
+
+    def restore(self, snapshot):
+        self.candidates = deque(tuple(candidate) for candidate in snapshot['candidates'])
+        self.position = snapshot['position']
+
+
+class IndicatorState:
+    """
+    Per-symbol indicator state that absorbs one bar at a time in O(1)
+
+    Tracks the same indicators as TechnicalAnalyzer.calculate_indicators
+    (RSI, MACD, SMA 20/50/200, Bollinger bands, stochastic and volume SMA)
+    so a new bar never requires rescanning the history. The state can be
+    snapshotted to plain lists and dicts and restored later, e.g. to try
+    a still-forming intraday bar without committing it.
+    """
+
+    def __init__(self, rsi_period=14, fast=12, slow=26, signal=9, sma_periods=(20, 50, 200),
+                 bb_period=20, bb_std=2, k_period=14, d_period=3, volume_period=20, trend_bars=5):
+        self.bb_period = bb_period
+        self.bb_std = bb_std
+        self.gains = RollingWindow(rsi_period)
+        self.losses = RollingWindow(rsi_period)
+        self.ema_fast = ExponentialMean(fast)
+        self.ema_slow = ExponentialMean(slow)
+        self.macd_signal = ExponentialMean(signal)
+        self.smas = {period: RollingWindow(period) for period in sma_periods}
+        if bb_period not in self.smas:
+            self.smas[bb_period] = RollingWindow(bb_period)
+        self.lowest_low = RollingExtreme(k_period)
+        self.highest_high = RollingExtreme(k_period, maximum=True)
+        self.stoch_k = math.nan
+        self.stoch_d = RollingWindow(d_period)
+        self.stoch_d_value = math.nan
+        self.volume = RollingWindow(volume_period)
+        self.recent_closes = deque(maxlen=trend_bars)
+        self.macd = math.nan
+        self.last_close = None
+        self.last_volume = None
+        self.bars = 0
+
+    @classmethod
+    def from_history(cls, stock_data, **kwargs):
+        """
+        Build a state by replaying a history once
+
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data, oldest first
+
+        Returns:
+            IndicatorState: State positioned after the last bar
+        """
+        state = cls(**kwargs)
+        columns = [stock_data[field].to_numpy(dtype=float) for field in ['High', 'Low', 'Close', 'Volume']]
+        for high, low, close, volume in zip(*columns):
+            state.update(high, low, close, volume)
+        return state
+
+    def update(self, high, low, close, volume):
+        """
+        Absorb one completed bar
+
+        Args:
+            high (float): Bar high
+            low (float): Bar low
+            close (float): Bar close
+            volume (float): Bar volume
+        """
+        # Like calculate_rsi, the first bar counts as a zero gain and loss
+        delta = 0.0 if self.last_close is None else close - self.last_close
+        self.gains.push(delta if delta > 0 else 0.0)
+        self.losses.push(-delta if delta < 0 else 0.0)
+
+        self.macd = self.ema_fast.push(close) - self.ema_slow.push(close)
+        self.macd_signal.push(self.macd)
+
+        for window in self.smas.values():
+            window.push(close)
+
+        self.lowest_low.push(low)
+        self.highest_high.push(high)
+        lowest, highest = self.lowest_low.value(), self.highest_high.value()
+        if math.isnan(lowest):
+            self.stoch_k = math.nan
+        elif highest == lowest:
+            self.stoch_k = math.nan if close == lowest else math.copysign(math.inf, close - lowest)
+        else:
+            self.stoch_k = 100 * (close - lowest) / (highest - lowest)
+        # %D needs three consecutive valid %K values, like a pandas rolling mean
+        if math.isnan(self.stoch_k):
+            self.stoch_d = RollingWindow(self.stoch_d.length)
+        else:
+            self.stoch_d.push(self.stoch_k)
+        self.stoch_d_value = self.stoch_d.mean()
+
+        self.volume.push(volume)
+        self.recent_closes.append(close)
+        self.last_close = close
+        self.last_volume = volume
+        self.bars += 1
+
+    def rsi(self):
+        average_gain, average_loss = self.gains.mean(), self.losses.mean()
+        if math.isnan(average_gain):
+            return math.nan
+        if average_loss == 0:
+            return math.nan if average_gain == 0 else 100.0
+        return 100 - 100 / (1 + average_gain / average_loss)
+
+    def recent_trend(self):
+        """
+        Mean return over the last closes, as used by get_recommendation (None if too few bars)
+        """
+        if len(self.recent_closes) < self.recent_closes.maxlen:
+            return None
+        closes = list(self.recent_closes)
+        returns = [current / previous - 1 for previous, current in zip(closes, closes[1:])]
+        return sum(returns) / len(returns)
+
+    def indicators(self):
+        """
+        Current indicator values with calculate_indicators' fallbacks
+
+        Returns:
+            dict: Same keys as TechnicalAnalyzer.calculate_indicators
+        """
+        price = self.last_close
+
+        def value_or(value, fallback):
+            return fallback if math.isnan(value) else value
+
+        middle = self.smas[self.bb_period].mean()
+        spread = self.smas[self.bb_period].std() * self.bb_std
+        indicators = {
+            'rsi': value_or(self.rsi(), 50),
+            'macd': value_or(self.macd, 0),
+            'macd_signal': value_or(self.macd_signal.value(), 0),
+            'macd_histogram': value_or(self.macd - self.macd_signal.value(), 0)
+        }
+        for period in (20, 50, 200):
+            window = self.smas.get(period)
+            indicators[f'sma_{period}'] = value_or(window.mean(), price) if window else price
+        indicators.update({
+            'bb_upper': value_or(middle + spread, price),
+            'bb_middle': value_or(middle, price),
+            'bb_lower': value_or(middle - spread, price),
+            'stoch_k': value_or(self.stoch_k, 50),
+            'stoch_d': value_or(self.stoch_d_value, 50),
+            'current_price': price,
+            'volume_sma': self.volume.mean(),
+            'current_volume': self.last_volume
+        })
+        return indicators
+
+    def snapshot(self):
+        """
+        Capture the full state as plain data
+
+        Returns:
+            dict: Restorable with restore(); safe to pickle or JSON-encode
+        """
+        return {
+            'gains': self.gains.snapshot(),
+            'losses': self.losses.snapshot(),
+            'ema_fast': self.ema_fast.snapshot(),
+            'ema_slow': self.ema_slow.snapshot(),
+            'macd_signal': self.macd_signal.snapshot(),
+            'smas': {str(period): window.snapshot() for period, window in self.smas.items()},
+            'lowest_low': self.lowest_low.snapshot(),
+            'highest_high': self.highest_high.snapshot(),
+            'stoch_k': self.stoch_k,
+            'stoch_d': self.stoch_d.snapshot(),
+            'stoch_d_value': self.stoch_d_value,
+            'volume': self.volume.snapshot(),
+            'recent_closes': list(self.recent_closes),
+            'macd': self.macd,
+            'last_close': self.last_close,
+            'last_volume': self.last_volume,
+            'bars': self.bars
+        }
+
+    def restore(self, snapshot):
+        """
+        Return to a state captured by snapshot()
+
+        Args:
+            snapshot (dict): Output of snapshot() on a state with the same settings
+        """
+        self.gains.restore(snapshot['gains'])
+        self.losses.restore(snapshot['losses'])
+        self.ema_fast.restore(snapshot['ema_fast'])
+        self.ema_slow.restore(snapshot['ema_slow'])
+        self.macd_signal.restore(snapshot['macd_signal'])
+        for period, window in self.smas.items():
+            window.restore(snapshot['smas'][str(period)])
+        self.lowest_low.restore(snapshot['lowest_low'])
+        self.highest_high.restore(snapshot['highest_high'])
+        self.stoch_k = snapshot['stoch_k']
+        self.stoch_d.restore(snapshot['stoch_d'])
+        self.stoch_d_value = snapshot['stoch_d_value']
+        self.volume.restore(snapshot['volume'])
+        self.recent_closes = deque(snapshot['recent_closes'], maxlen=self.recent_closes.maxlen)
+        self.macd = snapshot['macd']
+        self.last_close = snapshot['last_close']
+        self.last_volume = snapshot['last_volume']
+        self.bars = snapshot['bars']
@@ -0,0 +1,248 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from market_calendar import IST
+from indicator_state import IndicatorState
+
+# Regular-session bars per interval (09:15-15:30 is 375 minutes)
+SESSION_BARS = {"1m": 375, "2m": 188, "5m": 75, "15m": 25, "30m": 13, "60m": 7}
+
+
+class BarRingBuffer:
+    """
+    Fixed-size circular store of the most recent intraday bars
+
+    Bars live in preallocated NumPy arrays, so memory never grows however
+    long the session runs; once full, each new bar overwrites the oldest.
+    A bar with the same timestamp as the newest one replaces it, which is
+    how the still-forming current bar gets updated between polls.
+    """
+
+    FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(self.FIELDS)), dtype=np.float64)
+        self.start = 0
+        self.size = 0
+
+    @property
+    def last_timestamp(self):
+        """
+        Time of the newest bar, or None while empty
+        """
+        if self.size == 0:
+            return None
+        return pd.Timestamp(self.timestamps[(self.start + self.size - 1) % self.capacity])
+
+    def append(self, bars):
+        """
+        Add bars newer than (or equal to) the newest stored bar
+
+        Bars older than the newest stored one arrived late and are dropped.
+
+        Args:
+            bars (pandas.DataFrame): OHLCV bars with a tz-naive datetime index
+
+        Returns:
+            int: Number of bars added (an updated newest bar does not count)
+        """
+        if bars is None or bars.empty:
+            return 0
+
+        timestamps = pd.DatetimeIndex(bars.index).as_unit('ns').asi8
+        values = bars.reindex(columns=self.FIELDS).to_numpy(dtype=np.float64)
+
+        # A response may repeat a bar; keep the last copy of each timestamp, in time order
+        if len(timestamps) > 1 and not np.all(timestamps[1:] > timestamps[:-1]):
+            order = np.argsort(timestamps, kind='stable')
+            timestamps, values = timestamps[order], values[order]
+            last = np.r_[timestamps[1:] != timestamps[:-1], True]
+            timestamps, values = timestamps[last], values[last]
+
+        if self.size:
+            newest = (self.start + self.size - 1) % self.capacity
+            keep = timestamps >= self.timestamps[newest]
+            timestamps, values = timestamps[keep], values[keep]
+            if len(timestamps) and timestamps[0] == self.timestamps[newest]:
+                self.values[newest] = values[0]
+                timestamps, values = timestamps[1:], values[1:]
+
+        added = len(timestamps)
+        if added == 0:
+            return 0
+        if added > self.capacity:
+            timestamps, values = timestamps[-self.capacity:], values[-self.capacity:]
+
+        positions = (self.start + self.size + np.arange(len(timestamps))) % self.capacity
+        self.timestamps[positions] = timestamps
+        self.values[positions] = values
+        self.size += len(timestamps)
+        if self.size > self.capacity:
+            self.start = (self.start + self.size - self.capacity) % self.capacity
+            self.size = self.capacity
+        return added
+
+    def to_frame(self, after=None):
+        """
+        Stored bars, oldest first
+
+        Args:
+            after (pandas.Timestamp): Only return bars later than this
+
+        Returns:
+            pandas.DataFrame: OHLCV bars indexed by IST time
+        """
+        order = (self.start + np.arange(self.size)) % self.capacity
+        if after is not None:
+            order = order[np.searchsorted(self.timestamps[order], pd.Timestamp(after).value, side='right'):]
+        bars = pd.DataFrame(self.values[order], columns=self.FIELDS, index=pd.DatetimeIndex(self.timestamps[order]))
+        bars['Volume'] = bars['Volume'].astype(np.int64)
+        bars.index.name = 'Datetime'
+        return bars
+
+    def __len__(self):
+        return self.size
+
+
+class IntradayFeed:
+    """
+    Polls intraday bars for many symbols into per-symbol ring buffers
+
+    The first poll of a symbol loads the current session; later polls ask
+    the provider only for bars from the newest stored bar onwards. Polls
+    closer together than `min_poll_interval` are skipped per symbol.
+    """
+
+    def __init__(self, fetcher, interval="5m", sessions=2, min_poll_interval=30, max_workers=8):
+        self.fetcher = fetcher
+        self.interval = interval
+        self.capacity = SESSION_BARS.get(interval, 375) * sessions
+        self.min_poll_interval = min_poll_interval
+        self.max_workers = max_workers
+        self._buffers = {}
+        self._states = {}
+        self._absorbed = {}
+        self._polled_at = {}
+        self._lock = threading.Lock()
+
+    def _ticker(self, symbol):
+        suffixes = self.fetcher._candidate_suffixes(symbol)
+        return f"{symbol}{suffixes[0]}" if suffixes else None
+
+    def _fetch_new_bars(self, symbol, last_timestamp):
+        ticker = self._ticker(symbol)
+        if ticker is None:
+            return None
+
+        if last_timestamp is None:
+            bars = self.fetcher.provider.history(ticker, period="1d", interval=self.interval)
+        else:
+            bars = self.fetcher.provider.history(
+                ticker, start=last_timestamp.tz_localize(IST), interval=self.interval
+            )
+
+        if bars is None or bars.empty:
+            return None
+        # Keep bar times in IST wall-clock time, like the exchange shows them
+        if bars.index.tz is not None:
+            bars.index = bars.index.tz_convert(IST).tz_localize(None)
+        return bars.dropna(how='all', subset=['Close'])
+
+    def poll(self, symbols):
+        """
+        Pull new bars for the given symbols
+
+        Args:
+            symbols (list): List of stock symbols
+
+        Returns:
+            dict: Symbol to number of new bars added
+        """
+        now = time.time()
+        with self._lock:
+            due = [
+                symbol for symbol in dict.fromkeys(symbols)
+                if now - self._polled_at.get(symbol, 0) >= self.min_poll_interval
+            ]
+            for symbol in due:
+                self._polled_at[symbol] = now
+                self._buffers.setdefault(symbol, BarRingBuffer(self.capacity))
+            last_timestamps = {symbol: self._buffers[symbol].last_timestamp for symbol in due}
+
+        added = {}
+        if not due:
+            return added
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(due)))) as executor:
+            futures = {
+                symbol: executor.submit(self._fetch_new_bars, symbol, last_timestamps[symbol])
+                for symbol in due
+            }
+            for symbol, future in futures.items():
+                try:
+                    bars = future.result()
+                except Exception:
+                    bars = None
+                with self._lock:
+                    added[symbol] = self._buffers[symbol].append(bars)
+                    self._absorb_completed(symbol)
+
+        return added
+
+    def _absorb_completed(self, symbol):
+        # Every bar but the newest is final, feed those into the indicator state once
+        buffer = self._buffers[symbol]
+        if len(buffer) < 2:
+            return
+        state = self._states.setdefault(symbol, IndicatorState())
+        completed = buffer.to_frame(after=self._absorbed.get(symbol)).iloc[:-1]
+        for high, low, close, volume in zip(completed['High'], completed['Low'],
+                                            completed['Close'], completed['Volume']):
+            state.update(high, low, close, volume)
+        if not completed.empty:
+            self._absorbed[symbol] = completed.index[-1]
+
+    def get_indicators(self, symbol):
+        """
+        Latest intraday indicators, including the still-forming bar
+
+        The forming bar is applied to a snapshot of the state and rolled back,
+        so it is never counted twice when it completes.
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            dict: Same keys as TechnicalAnalyzer.calculate_indicators, or None if no bars
+        """
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            if buffer is None or len(buffer) == 0:
+                return None
+            state = self._states.setdefault(symbol, IndicatorState())
+            forming = buffer.to_frame(after=self._absorbed.get(symbol)).iloc[-1]
+            snapshot = state.snapshot()
+            state.update(forming['High'], forming['Low'], forming['Close'], forming['Volume'])
+            indicators = state.indicators()
+            state.restore(snapshot)
+            return indicators
+
+    def get_bars(self, symbol):
+        """
+        Buffered intraday bars for a symbol
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            pandas.DataFrame: OHLCV bars oldest first, or None if none are buffered
+        """
+        with self._lock:
+            buffer = self._buffers.get(symbol)
+            if buffer is None or len(buffer) == 0:
+                return None
+            return buffer.to_frame()
@@ -0,0 +1,134 @@
+import pandas as pd
+from datetime import datetime, time, timedelta, timezone
+
+# Indian markets trade on IST, which has no daylight saving
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_OPEN = time(9, 15)
+MARKET_CLOSE = time(15, 30)
+
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def now_ist():
+    """
+    Current time in India Standard Time
+
+    Returns:
+        datetime: Timezone-aware current time in IST
+    """
+    return datetime.now(IST)
+
+
+def is_market_open(now=None):
+    """
+    Check whether NSE/BSE regular trading is in session
+
+    Exchange holidays are not known here, so a holiday weekday counts as open.
+
+    Args:
+        now (datetime): Time to check (defaults to the current IST time)
+
+    Returns:
+        bool: True during 09:15-15:30 IST on weekdays
+    """
+    now = (now or now_ist()).astimezone(IST)
+    if now.weekday() >= 5:
+        return False
+    return MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def last_session_close(now=None):
+    """
+    Most recent regular-session close at or before the given time
+
+    Args:
+        now (datetime): Reference time (defaults to the current IST time)
+
+    Returns:
+        datetime: Timezone-aware IST datetime of the last close
+    """
+    now = (now or now_ist()).astimezone(IST)
+    close = datetime.combine(now.date(), MARKET_CLOSE, tzinfo=IST)
+    if now < close:
+        close -= timedelta(days=1)
+    while close.weekday() >= 5:
+        close -= timedelta(days=1)
+    return close
+
+
+def next_session_open(now=None):
+    """
+    Next regular-session open strictly after the given time
+
+    Args:
+        now (datetime): Reference time (defaults to the current IST time)
+
+    Returns:
+        datetime: Timezone-aware IST datetime of the next open
+    """
+    now = (now or now_ist()).astimezone(IST)
+    opening = datetime.combine(now.date(), MARKET_OPEN, tzinfo=IST)
+    if now >= opening:
+        opening += timedelta(days=1)
+    while opening.weekday() >= 5:
+        opening += timedelta(days=1)
+    return opening
+
+
+def period_start(period, end=None):
+    """
+    First calendar date covered by a yfinance style period
+
+    Day periods ("1d", "5d") count trading days, so the returned date is a
+    conservative calendar bound that always contains that many sessions.
+
+    Args:
+        period (str): Time period (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
+        end (pandas.Timestamp): Last date of the window (defaults to today)
+
+    Returns:
+        pandas.Timestamp: Start date, or None for "max"
+    """
+    end = pd.Timestamp(end if end is not None else now_ist().date()).normalize()
+
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=end.year, month=1, day=1)
+    if period in PERIOD_OFFSETS:
+        return end - PERIOD_OFFSETS[period]
+    if period.endswith("d") and period[:-1].isdigit():
+        sessions = int(period[:-1])
+        return end - pd.Timedelta(days=sessions * 7 // 5 + 7)
+
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def slice_period(stock_data, period, end=None):
+    """
+    Cut a longer daily history down to a yfinance style period
+
+    Args:
+        stock_data (pandas.DataFrame): Daily OHLCV data indexed by date
+        period (str): Time period
+        end (pandas.Timestamp): Last date of the window (defaults to today)
+
+    Returns:
+        pandas.DataFrame: Rows of stock_data that fall inside the period
+    """
+    if stock_data is None or stock_data.empty or period == "max":
+        return stock_data
+
+    if period.endswith("d") and period[:-1].isdigit():
+        return stock_data.iloc[-int(period[:-1]):]
+
+    # A positional slice of the sorted index is a view, so cached histories are not copied
+    return stock_data.iloc[stock_data.index.searchsorted(period_start(period, end)):]
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+PRICE_FIELDS = ['Open', 'High', 'Low', 'Close']
+
+
+class OHLCVPanel:
+    """
+    Compact aligned OHLCV data for many symbols
+
+    All symbols share one sorted date index. Prices are stored as a single
+    float32 block of shape (fields, dates, symbols), volume as an int64
+    block of shape (dates, symbols), and a boolean mask marks which dates
+    each symbol actually traded on. Missing prices are NaN and missing
+    volume is 0. Dividends and splits are not kept.
+    """
+
+    def __init__(self, dates, symbols, prices, volume, valid):
+        self.dates = pd.DatetimeIndex(dates)
+        self.symbols = list(symbols)
+        self.prices = prices
+        self.volume = volume
+        self.valid = valid
+        self._positions = {symbol: i for i, symbol in enumerate(self.symbols)}
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Build a panel from per-symbol DataFrames
+
+        Args:
+            frames (dict): Symbol to OHLCV DataFrame indexed by date
+
+        Returns:
+            OHLCVPanel: Panel over the union of all dates
+        """
+        frames = {symbol: data for symbol, data in frames.items() if data is not None and not data.empty}
+        symbols = list(frames)
+
+        dates = pd.DatetimeIndex([])
+        for stock_data in frames.values():
+            dates = dates.union(pd.DatetimeIndex(stock_data.index))
+
+        prices = np.full((len(PRICE_FIELDS), len(dates), len(symbols)), np.nan, dtype=np.float32)
+        volume = np.zeros((len(dates), len(symbols)), dtype=np.int64)
+        valid = np.zeros((len(dates), len(symbols)), dtype=bool)
+
+        for column, symbol in enumerate(symbols):
+            stock_data = frames[symbol]
+            rows = dates.get_indexer(stock_data.index)
+            for field_index, field in enumerate(PRICE_FIELDS):
+                if field in stock_data.columns:
+                    prices[field_index, rows, column] = stock_data[field].to_numpy(dtype=np.float32)
+            if 'Volume' in stock_data.columns:
+                volume[rows, column] = np.nan_to_num(stock_data['Volume'].to_numpy(dtype=np.float64)).astype(np.int64)
+            valid[rows, column] = True
+
+        return cls(dates, symbols, prices, volume, valid)
+
+    def field(self, name):
+        """
+        Get one field for all symbols
+
+        Args:
+            name (str): Open, High, Low, Close or Volume
+
+        Returns:
+            numpy.ndarray: (dates, symbols) view of the field
+        """
+        if name == 'Volume':
+            return self.volume
+        return self.prices[PRICE_FIELDS.index(name)]
+
+    @property
+    def close(self):
+        return self.prices[PRICE_FIELDS.index('Close')]
+
+    def frame(self, symbol):
+        """
+        Rebuild the per-symbol DataFrame the dashboard works with
+
+        Args:
+            symbol (str): Stock symbol
+
+        Returns:
+            pandas.DataFrame: OHLCV data for the dates the symbol traded on
+        """
+        column = self._positions[symbol]
+        rows = self.valid[:, column]
+        data = {field: self.prices[i, rows, column].astype(np.float64) for i, field in enumerate(PRICE_FIELDS)}
+        data['Volume'] = self.volume[rows, column]
+        stock_data = pd.DataFrame(data, index=self.dates[rows])
+        stock_data.index.name = 'Date'
+        return stock_data
+
+    def to_frames(self):
+        """
+        Rebuild every per-symbol DataFrame
+
+        Returns:
+            dict: Symbol to OHLCV DataFrame
+        """
+        return {symbol: self.frame(symbol) for symbol in self.symbols}
+
+    def select(self, symbols):
+        """
+        Panel restricted to some symbols, dropping dates none of them traded on
+
+        Args:
+            symbols (list): Symbols to keep (unknown symbols are ignored)
+
+        Returns:
+            OHLCVPanel: New panel sharing no memory with this one
+        """
+        columns = [self._positions[symbol] for symbol in symbols if symbol in self._positions]
+        rows = self.valid[:, columns].any(axis=1)
+        return OHLCVPanel(
+            self.dates[rows],
+            [self.symbols[column] for column in columns],
+            self.prices[:, rows][:, :, columns],
+            self.volume[rows][:, columns],
+            self.valid[rows][:, columns]
+        )
+
+    def tail(self, n):
+        """
+        Panel of the last n dates
+
+        Args:
+            n (int): Number of dates to keep (0 or less gives an empty panel)
+
+        Returns:
+            OHLCVPanel: Panel whose arrays are views into this one
+        """
+        # A plain [-n:] slice would keep everything for n == 0
+        first = max(len(self.dates) - max(n, 0), 0)
+        return OHLCVPanel(
+            self.dates[first:], self.symbols, self.prices[:, first:], self.volume[first:], self.valid[first:]
+        )
+
+    @property
+    def nbytes(self):
+        """
+        Memory held by the panel's arrays and date index
+        """
+        return self.prices.nbytes + self.volume.nbytes + self.valid.nbytes + self.dates.nbytes
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __contains__(self, symbol):
+        return symbol in self._positions
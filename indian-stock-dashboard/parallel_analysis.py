@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from indicator_engine import IndicatorEngine, right_align
+
+PRICE_FIELDS = ['Close', 'High', 'Low', 'Volume']
+
+# Below this many symbols per worker, shipping work to processes costs more than it saves
+MIN_SYMBOLS_PER_WORKER = 64
+
+# Worker count to pool, shared by every session; pools live until the process exits,
+# so a session asking for a different size never shuts down one another is using
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # Forking a threaded Streamlit server is unsafe; start workers from a clean process
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(method))
+            _pools[workers] = pool
+        return pool
+
+
+class SharedPricePanel:
+    """
+    Right-aligned price matrices for many symbols in one shared memory block
+
+    The block holds a (fields, rows, symbols) float64 array. Workers attach
+    to it by name and read their columns in place, so only the block name,
+    the shape and a column range cross the process boundary instead of
+    pickled DataFrames.
+    """
+
+    def __init__(self, stocks_data, window=None):
+        """
+        Args:
+            stocks_data (dict): Symbol to OHLCV DataFrame
+            window (int): Keep only the last `window` bars of each history
+        """
+        frames = {
+            symbol: (data if window is None else data.iloc[-window:])
+            for symbol, data in stocks_data.items()
+            if data is not None and not data.empty
+        }
+        self.symbols = list(frames)
+        matrices = []
+        for field in PRICE_FIELDS:
+            matrix, self.starts = right_align([data[field].to_numpy(dtype=np.float64) for data in frames.values()])
+            matrices.append(matrix)
+
+        self.shape = (len(PRICE_FIELDS),) + matrices[0].shape
+        self.memory = shared_memory.SharedMemory(create=True, size=max(int(np.prod(self.shape)) * 8, 1))
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=self.memory.buf)
+        for i, matrix in enumerate(matrices):
+            self.array[i] = matrix
+
+    def shards(self, count):
+        """
+        Split the symbols into `count` contiguous column ranges
+
+        Returns:
+            list: (first column, end column) pairs
+        """
+        bounds = np.linspace(0, len(self.symbols), count + 1).astype(int)
+        return [(int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+    def close(self):
+        """
+        Release and delete the shared block
+        """
+        self.array = None
+        self.memory.close()
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _analyze_shard(memory_name, shape, first, end, symbols, starts):
+    """
+    Worker: recommendations for columns first..end of a shared panel
+
+    Returns:
+        dict: Symbol to recommendation
+    """
+    from technical_analysis import TechnicalAnalyzer
+
+    # Workers share the parent's resource tracker, which unlinks the block once the parent is done
+    memory = shared_memory.SharedMemory(name=memory_name)
+    try:
+        panel = np.ndarray(shape, dtype=np.float64, buffer=memory.buf)
+        close, high, low, volume = (panel[i, :, first:end] for i in range(len(PRICE_FIELDS)))
+        engine = IndicatorEngine.from_matrices(symbols, close, high, low, volume, starts)
+        all_indicators = engine.latest_indicators()
+        trends = dict(zip(engine.symbols, engine.recent_trend()))
+        analyzer = TechnicalAnalyzer()
+        recommendations = {
+            symbol: analyzer._recommend_from_indicators(
+                all_indicators[symbol], None if np.isnan(trends[symbol]) else float(trends[symbol])
+            )
+            for symbol in symbols
+        }
+        del panel, close, high, low, volume, engine
+        return recommendations
+    finally:
+        memory.close()
+
+
+def parallel_recommendations(stocks_data, window, workers=None):
+    """
+    Recommendations for many stocks, sharded across worker processes
+
+    Args:
+        stocks_data (dict): Symbol to OHLCV DataFrame
+        window (int): Trailing bars used per stock (TechnicalAnalyzer.latest_window())
+        workers (int): Worker processes (default: CPU count)
+
+    Returns:
+        dict: Symbol to recommendation, as returned by get_recommendation
+    """
+    workers = workers or os.cpu_count() or 1
+    with SharedPricePanel(stocks_data, window) as panel:
+        if not panel.symbols:
+            return {}
+        shards = panel.shards(max(1, min(workers, len(panel.symbols) // MIN_SYMBOLS_PER_WORKER)))
+        pool = _get_pool(workers)
+        futures = [
+            pool.submit(
+                _analyze_shard, panel.memory.name, panel.shape, first, end,
+                panel.symbols[first:end], panel.starts[first:end]
+            )
+            for first, end in shards
+        ]
+        recommendations = {}
+        for future in futures:
+            recommendations.update(future.result())
+    return recommendations
+
+
+def should_parallelize(symbol_count, workers=None):
+    """
+    Whether a watchlist is large enough for the process pool to pay off
+    """
+    workers = workers or os.cpu_count() or 1
+    return workers > 1 and symbol_count >= MIN_SYMBOLS_PER_WORKER * 2
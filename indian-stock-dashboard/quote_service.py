@@ -0,0 +1,114 @@
+import threading
+import time
+from market_calendar import now_ist, is_market_open, next_session_open
+
+
+class QuoteService:
+    """
+    Shared last-price cache with bulk lookups
+
+    Prices for all requested symbols that are not cached are fetched with a
+    single grouped download. Cached prices live for `open_ttl` seconds
+    while the market is open; outside market hours they stay valid until
+    the next session opens (capped at `closed_ttl_cap`), since they cannot
+    change before then.
+    """
+
+    def __init__(self, fetcher, open_ttl=60, closed_ttl_cap=6 * 3600):
+        self.fetcher = fetcher
+        self.open_ttl = open_ttl
+        self.closed_ttl_cap = closed_ttl_cap
+        self._lock = threading.Lock()
+        self._quotes = {}
+
+    def _expiry(self):
+        now = now_ist()
+        if is_market_open(now):
+            ttl = self.open_ttl
+        else:
+            ttl = min(self.closed_ttl_cap, (next_session_open(now) - now).total_seconds())
+        return time.time() + ttl
+
+    def get_quotes(self, symbols):
+        """
+        Get last traded prices for many symbols
+
+        Args:
+            symbols (list): List of stock symbols
+
+        Returns:
+            dict: Symbol to last price for every symbol with data
+        """
+        symbols = list(dict.fromkeys(symbols))
+        now = time.time()
+        quotes = {}
+
+        with self._lock:
+            for symbol in symbols:
+                cached = self._quotes.get(symbol)
+                if cached is not None and cached[1] > now:
+                    quotes[symbol] = cached[0]
+
+        missing = [symbol for symbol in symbols if symbol not in quotes]
+        if missing:
+            fetched = self._fetch(missing)
+            expires_at = self._expiry()
+            with self._lock:
+                for symbol, price in fetched.items():
+                    self._quotes[symbol] = (price, expires_at)
+            quotes.update(fetched)
+
+        return {symbol: quotes[symbol] for symbol in symbols if symbol in quotes}
+
+    def _fetch(self, symbols):
+        """
+        Download last prices, trying each symbol's most likely exchange first
+
+        Args:
+            symbols (list): Stock symbols without cached quotes
+
+        Returns:
+            dict: Symbol to last price for symbols that returned data
+        """
+        fetcher = self.fetcher
+        pending = {symbol: fetcher._candidate_suffixes(symbol) for symbol in symbols}
+        # Symbols confirmed unlisted have no exchange left to ask
+        pending = {symbol: suffixes for symbol, suffixes in pending.items() if suffixes}
+        prices = {}
+
+        # At most two grouped requests: the likely exchange, then the other one
+        while pending:
+            tickers = {f"{symbol}{suffixes[0]}": symbol for symbol, suffixes in pending.items()}
+            try:
+                frames = fetcher.provider.download(list(tickers), period="5d")
+            except Exception:
+                break
+
+            for ticker, symbol in tickers.items():
+                stock_data = frames.get(ticker)
+                closes = stock_data['Close'].dropna() if stock_data is not None and 'Close' in stock_data else None
+                if closes is not None and not closes.empty:
+                    prices[symbol] = float(closes.iloc[-1])
+                    fetcher._record_exchange(symbol, pending[symbol][0])
+                    del pending[symbol]
+                else:
+                    # A miss on both exchanges may be an outage, so no negative entry is written
+                    pending[symbol] = pending[symbol][1:]
+                    if not pending[symbol]:
+                        del pending[symbol]
+
+        return prices
+
+    def invalidate(self, symbols=None):
+        """
+        Drop cached quotes
+
+        Args:
+            symbols (list): Symbols to drop (all symbols if None)
+        """
+        with self._lock:
+            if symbols is None:
+                self._quotes.clear()
+            else:
+                for symbol in symbols:
+                    self._quotes.pop(symbol, None)
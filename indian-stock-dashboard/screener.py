@@ -0,0 +1,313 @@
+import ast
+import math
+import re
+import time
+import numpy as np
+import pandas as pd
+from indicator_engine import IndicatorEngine
+from indian_stocks import get_indian_stocks
+from ohlcv_panel import OHLCVPanel
+
+# Names usable in filter expressions, mapped to result table columns
+FIELDS = {
+    'close': 'close', 'price': 'close',
+    'change': 'change_pct', 'change_pct': 'change_pct',
+    'rsi': 'rsi',
+    'macd': 'macd', 'macd_signal': 'macd_signal', 'macd_histogram': 'macd_histogram',
+    'sma_20': 'sma_20', 'sma_50': 'sma_50', 'sma_200': 'sma_200',
+    'bb_upper': 'bb_upper', 'bb_middle': 'bb_middle', 'bb_lower': 'bb_lower',
+    'stoch_k': 'stoch_k', 'stoch_d': 'stoch_d',
+    'volume': 'volume', 'avg': 'avg_volume', 'avg_volume': 'avg_volume', 'volume_sma': 'avg_volume',
+    'high_52w': 'high_52w', 'low_52w': 'low_52w',
+    'signal': 'signal', 'confidence': 'confidence'
+}
+
+_COMPARISONS = {
+    ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater,
+    ast.GtE: np.greater_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal
+}
+_ARITHMETIC = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+# Trading days in 52 weeks
+YEAR_BARS = 252
+
+
+class ScreenerError(ValueError):
+    """
+    Raised for filter expressions the screener cannot run
+    """
+
+
+def _normalize(expression):
+    # Accept the way people write filters: "1.5× avg", "1.5x avg", AND/OR, "="
+    expression = expression.replace('×', '*')
+    expression = re.sub(r'(\d)\s*[xX](?=\s|\()', r'\1*', expression)
+    expression = re.sub(r'\b(and|or|not)\b', lambda match: match.group(1).lower(), expression, flags=re.IGNORECASE)
+    return re.sub(r'(?<![<>=!])=(?!=)', '==', expression)
+
+
+def compile_filter(expression):
+    """
+    Parse a filter expression into a checked syntax tree
+
+    Only comparisons, and/or/not, + - * /, numbers, quoted strings and
+    the names in FIELDS (case-insensitive) are allowed, so user input can
+    never run arbitrary code. The whole expression and every and/or/not
+    operand must be a comparison.
+
+    Args:
+        expression (str): e.g. "RSI < 30 and close > SMA_200 and volume > 1.5× avg"
+
+    Returns:
+        ast.Expression: Tree for apply_filter
+
+    Raises:
+        ScreenerError: If the expression is malformed or uses anything else
+    """
+    try:
+        tree = ast.parse(_normalize(expression.strip()), mode='eval')
+    except SyntaxError as e:
+        raise ScreenerError(f"Could not understand the filter: {e.msg}")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id.lower() not in FIELDS:
+                raise ScreenerError(f"Unknown field '{node.id}'. Try: {', '.join(sorted(set(FIELDS)))}")
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, str)) or isinstance(node.value, bool):
+                raise ScreenerError("Only numbers and quoted text are allowed as values")
+        elif not isinstance(node, (
+            ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+            ast.BinOp, ast.Compare, ast.Load, *_COMPARISONS, *_ARITHMETIC
+        )):
+            raise ScreenerError(f"'{type(node).__name__}' is not allowed in a filter")
+
+    if not _is_condition(tree.body):
+        raise ScreenerError("A filter must be a comparison, e.g. RSI < 30 or signal = 'BUY'")
+    return tree
+
+
+def _is_condition(node):
+    # Comparisons joined by and/or/not; a bare value would be cast to True or False
+    if isinstance(node, ast.Compare):
+        return True
+    if isinstance(node, ast.BoolOp):
+        return all(_is_condition(value) for value in node.values)
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+        return _is_condition(node.operand)
+    return False
+
+
+def apply_filter(tree, table):
+    """
+    Evaluate a compiled filter over every row of a result table at once
+
+    Args:
+        tree (ast.Expression): Output of compile_filter
+        table (pandas.DataFrame): Screener table with the FIELDS columns
+
+    Returns:
+        numpy.ndarray: Boolean mask of matching rows
+    """
+    def evaluate(node):
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body)
+        if isinstance(node, ast.Name):
+            return table[FIELDS[node.id.lower()]].to_numpy()
+        if isinstance(node, ast.Constant):
+            return node.value.upper() if isinstance(node.value, str) else node.value
+        if isinstance(node, ast.BoolOp):
+            combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            return combine.reduce([np.asarray(evaluate(value), dtype=bool) for value in node.values])
+        if isinstance(node, ast.UnaryOp):
+            operand = evaluate(node.operand)
+            if isinstance(node.op, ast.Not):
+                return ~np.asarray(operand, dtype=bool)
+            return -operand if isinstance(node.op, ast.USub) else operand
+        if isinstance(node, ast.BinOp):
+            return _ARITHMETIC[type(node.op)](evaluate(node.left), evaluate(node.right))
+        if isinstance(node, ast.Compare):
+            # a < b < c means a < b and b < c
+            result, left = True, evaluate(node.left)
+            for operator, comparator in zip(node.ops, node.comparators):
+                right = evaluate(comparator)
+                result = result & _COMPARISONS[type(operator)](left, right)
+                left = right
+            return result
+        raise ScreenerError(f"'{type(node).__name__}' is not allowed in a filter")
+
+    try:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mask = np.asarray(evaluate(tree), dtype=bool)
+    except TypeError:
+        raise ScreenerError("Text values can only be compared with = or !=, e.g. signal = 'BUY'")
+    return np.broadcast_to(mask, (len(table),))
+
+
+def _right_aligned(panel, field, window):
+    # Each symbol's last `window` traded bars, aligned on its latest bar
+    valid = panel.valid
+    from_end = np.cumsum(valid[::-1], axis=0)[::-1]
+    keep = valid & (from_end <= window)
+    rows, columns = np.nonzero(keep)
+    matrix = np.full((window, len(panel.symbols)), np.nan)
+    matrix[window - from_end[rows, columns], columns] = panel.field(field)[rows, columns]
+    return matrix
+
+
+class MarketScreener:
+    """
+    Technical screener over the whole Indian stock universe
+
+    refresh() loads every symbol's history once, mostly from the local
+    store, into a compact OHLCVPanel and scores all of them with the
+    TechnicalAnalyzer rules in one IndicatorEngine pass. scan() then only
+    filters, sorts and pages that table, so each query takes milliseconds.
+    """
+
+    def __init__(self, fetcher, analyzer, period="1y"):
+        """
+        Args:
+            fetcher (StockDataFetcher): Source of daily history
+            analyzer (TechnicalAnalyzer): Supplies the trailing window size
+            period (str): History loaded per symbol (at least a year for SMA 200)
+        """
+        self.fetcher = fetcher
+        self.analyzer = analyzer
+        self.period = period
+        self.panel = None
+        self.table = pd.DataFrame()
+        self.refreshed_at = None
+
+    def _stored_symbols(self, symbols):
+        store = getattr(self.fetcher, 'store', None)
+        if store is None:
+            return set()
+        try:
+            stored = set(store.tickers())
+        except Exception:
+            return set()
+        return {
+            symbol for symbol in symbols
+            if any(f"{symbol}{suffix}" in stored for suffix in self.fetcher._candidate_suffixes(symbol))
+        }
+
+    def refresh(self, symbols=None, download_missing=True):
+        """
+        Rebuild the panel and the indicator table
+
+        Stocks already in the local store are read from it and topped up
+        with one grouped download of their newest bars; the rest are fetched
+        with one grouped download of the whole period.
+
+        Args:
+            symbols (list): Universe to screen (default: get_indian_stocks())
+            download_missing (bool): Fetch stocks that are not stored yet
+
+        Returns:
+            dict: {'symbols': stocks screened, 'failures': {symbol: reason}}
+        """
+        symbols = list(symbols if symbols is not None else get_indian_stocks())
+        if not download_missing:
+            stored = self._stored_symbols(symbols)
+            symbols = [symbol for symbol in symbols if symbol in stored]
+
+        result = self.fetcher.fetch_stocks_batch(symbols, self.period)
+        frames, failures = result['data'], result['failures']
+
+        self.panel = OHLCVPanel.from_frames(frames)
+        self.table = self._build_table(self.panel)
+        self.refreshed_at = time.time()
+        return {'symbols': len(self.table), 'failures': failures}
+
+    def _build_table(self, panel):
+        """
+        Latest indicators, signal and confidence for every panel symbol
+
+        Prices come from the panel's float32 block, so values can differ
+        from TechnicalAnalyzer's float64 results in the last digits.
+        """
+        if panel is None or not panel.symbols or len(panel) == 0:
+            return pd.DataFrame(columns=['company'] + sorted(set(FIELDS.values())))
+
+        window = min(self.analyzer.latest_window(), len(panel))
+        close, high, low, volume = (_right_aligned(panel, field, window) for field in ['Close', 'High', 'Low', 'Volume'])
+        starts = window - np.minimum(panel.valid.sum(axis=0), window)
+        engine = IndicatorEngine.from_matrices(panel.symbols, close, high, low, volume, starts)
+
+        latest = engine.latest_columns()
+        scores = engine.signal_scores()
+        signal = scores['signal'][-1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            change_pct = (close[-1] / close[-2] - 1) * 100 if window > 1 else np.full(len(panel.symbols), np.nan)
+
+        # 52-week range over the panel's last year of dates, not just the indicator window
+        year = panel.tail(YEAR_BARS)
+        high_52w = np.fmax.reduce(np.where(year.valid, year.field('High'), np.nan), axis=0)
+        low_52w = np.fmin.reduce(np.where(year.valid, year.field('Low'), np.nan), axis=0)
+
+        names = get_indian_stocks()
+        return pd.DataFrame({
+            'company': [names.get(symbol, symbol) for symbol in panel.symbols],
+            'close': latest['current_price'],
+            'change_pct': change_pct,
+            'rsi': latest['rsi'],
+            'macd': latest['macd'],
+            'macd_signal': latest['macd_signal'],
+            'macd_histogram': latest['macd_histogram'],
+            'sma_20': latest['sma_20'],
+            'sma_50': latest['sma_50'],
+            'sma_200': latest['sma_200'],
+            'bb_upper': latest['bb_upper'],
+            'bb_middle': latest['bb_middle'],
+            'bb_lower': latest['bb_lower'],
+            'stoch_k': latest['stoch_k'],
+            'stoch_d': latest['stoch_d'],
+            'volume': latest['current_volume'],
+            'avg_volume': latest['volume_sma'],
+            'high_52w': high_52w,
+            'low_52w': low_52w,
+            'signal': np.where(signal > 0, 'BUY', np.where(signal < 0, 'SELL', 'HOLD')),
+            'confidence': scores['confidence'][-1]
+        }, index=pd.Index(panel.symbols, name='symbol'))
+
+    def scan(self, expression="", sort_by="confidence", ascending=False, page=1, page_size=25):
+        """
+        Filter, sort and page the screened universe
+
+        Args:
+            expression (str): Filter such as "RSI < 30 and close > SMA_200"; empty keeps all
+            sort_by (str): Table column or FIELDS name to sort on
+            ascending (bool): Sort direction
+            page (int): 1-based page number (clamped to the available pages)
+            page_size (int): Rows per page
+
+        Returns:
+            dict: {'results': DataFrame of this page, 'total': matching stocks,
+                   'page': page shown, 'pages': page count,
+                   'scanned': stocks screened, 'elapsed': seconds}
+
+        Raises:
+            ScreenerError: If the expression or sort column is invalid
+        """
+        started = time.perf_counter()
+        table = self.table
+        if expression and expression.strip():
+            table = table[apply_filter(compile_filter(expression), table)]
+
+        column = FIELDS.get(sort_by.lower(), sort_by) if sort_by else None
+        if column:
+            if column not in table.columns:
+                raise ScreenerError(f"Cannot sort by '{sort_by}'")
+            table = table.sort_values(column, ascending=ascending, na_position='last', kind='stable')
+
+        pages = max(1, math.ceil(len(table) / page_size))
+        page = min(max(1, int(page)), pages)
+        return {
+            'results': table.iloc[(page - 1) * page_size:page * page_size],
+            'total': len(table),
+            'page': page,
+            'pages': pages,
+            'scanned': len(self.table),
+            'elapsed': time.perf_counter() - started
+        }
@@ -0,0 +1,177 @@
+import sys
+import threading
+import time
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def estimate_size(value):
+    """
+    Approximate memory held by a cached value
+
+    Args:
+        value: DataFrame, Series, NumPy array, object with `nbytes`, or a
+            dict/list/tuple of those
+
+    Returns:
+        int: Size in bytes
+    """
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if hasattr(value, 'nbytes'):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+    """
+    Process-wide LRU cache with a memory ceiling and optional TTL
+
+    Meant to be shared by every Streamlit session, so one copy of each
+    history frame or indicator result serves all users. Values are handed
+    out by reference and must be treated as read-only. Once the total
+    size passes `max_bytes` the least recently used entries are evicted;
+    entries older than `ttl` seconds are dropped on access.
+    """
+
+    def __init__(self, max_bytes=512 * 1024 * 1024, ttl=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key, default=None):
+        """
+        Look up a value and mark it as recently used
+
+        Args:
+            key (hashable): Cache key
+            default: Returned when the key is missing or expired
+
+        Returns:
+            Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self._expired(entry[2]):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                # Never let one oversized value flush everything else
+                return
+            self._entries[key] = (value, size, time.time())
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def __contains__(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and not self._expired(entry[2])
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def pop(self, key, default=None):
+        """
+        Remove an entry
+
+        Args:
+            key (hashable): Cache key
+            default: Returned when the key is missing
+
+        Returns:
+            Removed value or default
+        """
+        with self._lock:
+            if key not in self._entries:
+                return default
+            value = self._entries[key][0]
+            self._remove(key)
+            return value
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached value, computing and storing it on a miss
+
+        Args:
+            key (hashable): Cache key
+            compute (callable): Zero-argument function producing the value
+
+        Returns:
+            Cached or freshly computed value (None results are not cached)
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        if value is not None:
+            self[key] = value
+        return value
+
+    def clear(self):
+        """
+        Drop every entry
+        """
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """
+        Current size and hit counters
+
+        Returns:
+            dict: {'entries', 'bytes', 'max_bytes', 'hits', 'misses', 'evictions'}
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,92 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one execution
+
+    The first caller for a key runs the function; callers arriving while
+    it is in flight wait for it and get the same result (or exception).
+    Results with a copy() method, such as DataFrames, are copied for each
+    waiting caller, so one session mutating its history cannot change
+    another's. Nothing is cached once the call finishes, so the next
+    caller after that runs the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """
+        Run fn once for all concurrent callers with the same key
+
+        Args:
+            key (hashable): Identifies equivalent calls, e.g. (symbol, period, interval)
+            fn (callable): Zero-argument function doing the actual work
+
+        Returns:
+            Whatever fn returned for the caller that executed it, or a copy
+            of it for callers that waited
+        """
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = fn()
+            except Exception as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        if not leader and hasattr(call.result, 'copy'):
+            return call.result.copy()
+        return call.result
+
+    def in_flight(self):
+        """
+        Number of keys currently being executed
+        """
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self):
+        """
+        Coalescing counters since start-up
+
+        Returns:
+            dict: {'calls', 'executions', 'coalesced', 'in_flight'}
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
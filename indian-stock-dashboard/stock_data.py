@@ -1,17 +1,136 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import streamlit as st
+import time
+from concurrent.futures import ThreadPoolExecutor
+from data_providers import get_default_provider
+from data_store import OHLCVStore, default_store_path
+from exchange_resolver import ExchangeResolver
+from quote_service import QuoteService
+from fundamentals_store import FundamentalsStore, INFO_FIELDS
+from indian_stocks import get_search_index
+from stock_search import StockSearchIndex
+from market_calendar import period_start, slice_period, is_market_open, last_session_close
+from single_flight import SingleFlight
+
+# Shared by every session in the process so identical downloads run once
+HISTORY_FLIGHTS = SingleFlight()
+
+# Failure reasons for symbols without data, as opposed to errors worth retrying
+NO_DATA = "No data found on NSE or BSE"
+UNLISTED = "Not listed on NSE or BSE"
 
 class StockDataFetcher:
     """
-    Class to fetch and process Indian stock market data using yfinance
+    Class to fetch and process Indian stock market data
+    
+    Raw data comes from a MarketDataProvider: yfinance by default, or the
+    offline replay provider selected with STOCK_DATA_PROVIDER=replay.
     """
     
-    def __init__(self):
+    def __init__(self, store=None, use_store=True, refresh_interval=900, resolver=None, use_resolver=True,
+                 provider=None):
         self.nse_suffix = ".NS"
         self.bse_suffix = ".BO"
+        self.provider = provider or get_default_provider()
+        
+        # Offline providers get their own store so replayed bars never mix with live ones
+        store_path = default_store_path(None if self.provider.name == "yfinance" else self.provider.name)
+        
+        # Local OHLCV history so repeat loads only download the newest bars
+        self.store = store
+        if self.store is None and use_store:
+            try:
+                self.store = OHLCVStore(store_path)
+            except Exception:
+                self.store = None
+        self.refresh_interval = refresh_interval
+        
+        # Remembered NSE/BSE listing per symbol so fallbacks are not re-probed
+        self.resolver = resolver
+        if self.resolver is None and use_resolver:
+            try:
+                self.resolver = ExchangeResolver(store_path)
+            except Exception:
+                self.resolver = None
+        
+        # Last prices shared by everyone using this fetcher
+        self.quotes = QuoteService(self)
+        
+        # Search index for the last universe not covered by the prebuilt one
+        self._custom_search_index = None
+        
+        # Company info snapshots, since ticker.info is the slowest endpoint
+        self.fundamentals = None
+        if use_store:
+            try:
+                self.fundamentals = FundamentalsStore(store_path)
+            except Exception:
+                self.fundamentals = None
+    
+    def start_background_refresh(self, interval=3600):
+        """
+        Re-check stale exchange resolutions on a background thread
+        
+        Args:
+            interval (int): Seconds between refresh passes
+        """
+        if self.resolver is not None:
+            self.resolver.start_background_refresh(self._probe_exchange, interval=interval)
+    
+    def _probe_exchange(self, symbol):
+        """
+        Find which exchange currently lists a symbol
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            str: Exchange suffix with data, or None if neither exchange has any
+        """
+        for suffix in [self.nse_suffix, self.bse_suffix]:
+            if not self._fetch_ticker_history(f"{symbol}{suffix}", period="5d").empty:
+                return suffix
+        return None
+    
+    def _candidate_suffixes(self, symbol):
+        """
+        Exchange suffixes to try for a symbol, most likely first
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            list: Suffixes in try order, empty for symbols confirmed unlisted
+                within the resolver's negative TTL
+        """
+        if self.resolver is None:
+            return [self.nse_suffix, self.bse_suffix]
+        if self.resolver.is_unlisted(symbol):
+            return []
+        suffix = self.resolver.lookup(symbol)
+        if suffix == self.bse_suffix:
+            return [self.bse_suffix, self.nse_suffix]
+        return [self.nse_suffix, self.bse_suffix]
+    
+    def _record_exchange(self, symbol, suffix):
+        if self.resolver is not None and self.resolver.lookup(symbol) != suffix:
+            self.resolver.record(symbol, suffix)
+    
+    def _report_missing(self, symbol):
+        # Empty responses may be an outage; let the background probe confirm them
+        if self.resolver is not None:
+            self.resolver.report_missing(symbol)
+    
+    def get_fetch_stats(self):
+        """
+        Counters for history downloads shared between concurrent sessions
+        
+        Returns:
+            dict: {'calls', 'executions', 'coalesced', 'in_flight'}
+        """
+        return HISTORY_FLIGHTS.stats()
     
     def get_stock_data(self, symbol, period="1y", add_suffix=True):
         """
@@ -26,46 +145,279 @@ class StockDataFetcher:
             pandas.DataFrame: Stock data with OHLCV columns
         """
         try:
-            # Try NSE first, then BSE if NSE fails
-            stock_symbol = f"{symbol}{self.nse_suffix}" if add_suffix else symbol
-            
-            # Create yfinance ticker object
-            ticker = yf.Ticker(stock_symbol)
-            
-            # Fetch historical data
-            stock_data = ticker.history(period=period)
-            
-            # If NSE data is empty or fails, try BSE
-            if stock_data.empty and add_suffix:
-                stock_symbol = f"{symbol}{self.bse_suffix}"
-                ticker = yf.Ticker(stock_symbol)
-                stock_data = ticker.history(period=period)
-            
-            # Clean and validate data
-            if not stock_data.empty:
-                # Remove timezone info for consistency
-                stock_data.index = stock_data.index.tz_localize(None)
-                
-                # Ensure all required columns are present
-                required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
-                for col in required_columns:
-                    if col not in stock_data.columns:
-                        stock_data[col] = np.nan
-                
-                # Remove rows with all NaN values
-                stock_data = stock_data.dropna(how='all')
-                
-                # Forward fill missing values
-                stock_data = stock_data.ffill()
-                
-                return stock_data
-            else:
-                return None
-                
+            return self._get_history(symbol, period, add_suffix)
+            
         except Exception as e:
             st.error(f"Error fetching data for {symbol}: {str(e)}")
             return None
     
+    def _get_history(self, symbol, period="1y", add_suffix=True):
+        """
+        Load history from the local store or download it, raising on errors
+        
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period
+            add_suffix (bool): Whether to add NSE suffix
+            
+        Returns:
+            pandas.DataFrame: Stock data, or None if no exchange has any
+        """
+        def load():
+            stock_data = self._load_from_store(symbol, period, add_suffix)
+            if stock_data is not None:
+                return stock_data
+            
+            stock_data, stock_symbol = self._download_history(symbol, period, add_suffix)
+            self._save_to_store(stock_symbol, stock_data, period)
+            return stock_data
+        
+        # Concurrent sessions asking for the same history share one store top-up or download
+        store_path = self.store.path if self.store is not None else None
+        key = (self.provider.name, store_path, symbol, period, "1d", add_suffix)
+        return HISTORY_FLIGHTS.do(key, load)
+    
+    def _download_history(self, symbol, period, add_suffix=True):
+        """
+        Download and clean history for one symbol without any UI side effects
+        
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period
+            add_suffix (bool): Whether to add NSE suffix
+            
+        Returns:
+            tuple: (cleaned DataFrame or None, yfinance ticker symbol used)
+        """
+        if not add_suffix:
+            return self._clean_stock_data(self._fetch_ticker_history(symbol, period=period)), symbol
+        
+        return self._download_candidates(symbol, self._candidate_suffixes(symbol), period)
+    
+    def _download_candidates(self, symbol, suffixes, period):
+        """
+        Try each exchange in turn and remember which one had data
+        
+        Args:
+            symbol (str): Stock symbol
+            suffixes (list): Exchange suffixes to try, in order
+            period (str): Time period
+            
+        Returns:
+            tuple: (cleaned DataFrame or None, yfinance ticker symbol used)
+        """
+        if not suffixes:
+            return None, None
+        
+        # Usually NSE first, then BSE if NSE is empty
+        for suffix in suffixes:
+            stock_symbol = f"{symbol}{suffix}"
+            stock_data = self._clean_stock_data(self._fetch_ticker_history(stock_symbol, period=period))
+            if stock_data is not None:
+                self._record_exchange(symbol, suffix)
+                return stock_data, stock_symbol
+        
+        if len(suffixes) == 2:
+            self._report_missing(symbol)
+        return None, None
+    
+    def _fetch_ticker_history(self, stock_symbol, period=None, start=None):
+        """
+        Fetch raw history for an exact yfinance ticker
+        
+        Args:
+            stock_symbol (str): yfinance ticker symbol (with exchange suffix)
+            period (str): Time period, used when start is not given
+            start (pandas.Timestamp): First date to fetch
+            
+        Returns:
+            pandas.DataFrame: Raw provider history (may be empty)
+        """
+        return self.provider.history(stock_symbol, period=period, start=start)
+    
+    def _load_from_store(self, symbol, period, add_suffix=True):
+        """
+        Serve history from the local store, downloading only newer bars
+        
+        Args:
+            symbol (str): Stock symbol
+            period (str): Time period
+            add_suffix (bool): Whether symbol needs an exchange suffix
+            
+        Returns:
+            pandas.DataFrame: Stock data, or None if the symbol is not stored
+        """
+        if self.store is None:
+            return None
+        
+        if add_suffix:
+            candidates = [f"{symbol}{suffix}" for suffix in self._candidate_suffixes(symbol)]
+        else:
+            candidates = [symbol]
+        try:
+            for stock_symbol in candidates:
+                meta = self.store.get_meta(stock_symbol)
+                if meta is not None:
+                    return self._top_up(stock_symbol, meta, period)
+        except Exception:
+            # A broken or locked store should never block a live fetch
+            return None
+        return None
+    
+    def _top_up(self, stock_symbol, meta, period):
+        """
+        Bring a stored ticker up to date and return the requested period
+        
+        Args:
+            stock_symbol (str): yfinance ticker symbol
+            meta (dict): Store metadata for the ticker
+            period (str): Time period
+            
+        Returns:
+            pandas.DataFrame: Stock data for the period, or None if unavailable
+        """
+        start = period_start(period, self.provider.as_of())
+        covered_from = meta['covered_from']
+        
+        if covered_from is not None and (start is None or start < covered_from):
+            # Stored history does not reach back far enough for this period
+            stock_data = self._clean_stock_data(self._fetch_ticker_history(stock_symbol, period=period))
+            if stock_data is not None:
+                self.store.write(stock_symbol, stock_data, covered_from=start, replace=True)
+            return stock_data
+        
+        if self._needs_top_up(meta):
+            new_bars = self._clean_stock_data(
+                self._fetch_ticker_history(stock_symbol, start=meta['last_date'])
+            )
+            self._merge_new_bars(stock_symbol, meta, new_bars)
+        
+        return self._read_stored(stock_symbol, period)
+    
+    def _merge_new_bars(self, stock_symbol, meta, new_bars):
+        """
+        Add bars downloaded since the last stored date to a stored ticker
+        
+        Args:
+            stock_symbol (str): yfinance ticker symbol
+            meta (dict): Store metadata for the ticker
+            new_bars (pandas.DataFrame): Cleaned bars from meta['last_date'] on, or None
+        """
+        covered_from = meta['covered_from']
+        if new_bars is None:
+            self.store.touch(stock_symbol)
+        elif self._has_corporate_action(new_bars, meta['last_date']):
+            # Dividends and splits re-adjust earlier prices, so reload everything stored
+            if covered_from is not None:
+                raw = self._fetch_ticker_history(stock_symbol, start=covered_from)
+            else:
+                raw = self._fetch_ticker_history(stock_symbol, period="max")
+            stock_data = self._clean_stock_data(raw)
+            if stock_data is not None:
+                self.store.write(stock_symbol, stock_data, covered_from=covered_from, replace=True)
+        else:
+            self.store.write(stock_symbol, new_bars, covered_from=covered_from)
+    
+    def _read_stored(self, stock_symbol, period):
+        stock_data = slice_period(
+            self.store.read(stock_symbol, period_start(period, self.provider.as_of())), period, self.provider.as_of()
+        )
+        return stock_data if stock_data is not None and not stock_data.empty else None
+    
+    def _needs_top_up(self, meta):
+        """
+        Decide whether stored bars may be stale
+        
+        Args:
+            meta (dict): Store metadata for a ticker
+            
+        Returns:
+            bool: True if newer bars may exist upstream
+        """
+        updated_at = meta['updated_at'] or 0
+        if time.time() - updated_at < self.refresh_interval:
+            return False
+        
+        # Outside market hours the bars stop changing after the last close
+        if not is_market_open() and updated_at >= last_session_close().timestamp():
+            return False
+        
+        return True
+    
+    def _has_corporate_action(self, new_bars, last_date):
+        """
+        Check newly downloaded bars for dividends or splits
+        
+        Args:
+            new_bars (pandas.DataFrame): Bars fetched since the last stored date
+            last_date (pandas.Timestamp): Last stored bar date
+            
+        Returns:
+            bool: True if any bar after last_date carries a corporate action
+        """
+        fresh = new_bars[new_bars.index > last_date]
+        for col in ['Dividends', 'Stock Splits']:
+            if col in fresh.columns and (fresh[col].fillna(0) != 0).any():
+                return True
+        return False
+    
+    def _save_to_store(self, stock_symbol, stock_data, period):
+        """
+        Write freshly downloaded history through to the local store
+        
+        Args:
+            stock_symbol (str): yfinance ticker symbol
+            stock_data (pandas.DataFrame): Cleaned stock data
+            period (str): Time period the data covers
+        """
+        if self.store is None or stock_data is None:
+            return
+        
+        try:
+            start = period_start(period, self.provider.as_of())
+            meta = self.store.get_meta(stock_symbol)
+            keeps_coverage = meta is not None and (
+                meta['covered_from'] is None or (start is not None and meta['covered_from'] <= start)
+            )
+            if keeps_coverage and stock_data.index[0] <= meta['last_date']:
+                # New bars overlap a longer stored history, so extend it in place
+                self.store.write(stock_symbol, stock_data, covered_from=meta['covered_from'])
+            else:
+                self.store.write(stock_symbol, stock_data, covered_from=start, replace=True)
+        except Exception:
+            pass
+    
+    def _clean_stock_data(self, stock_data):
+        """
+        Clean and validate raw OHLCV data
+        
+        Args:
+            stock_data (pandas.DataFrame): Raw yfinance history
+            
+        Returns:
+            pandas.DataFrame: Cleaned data or None if empty
+        """
+        if stock_data is None or stock_data.empty:
+            return None
+        
+        # Remove timezone info for consistency
+        if stock_data.index.tz is not None:
+            stock_data.index = stock_data.index.tz_localize(None)
+        
+        # Ensure all required columns are present
+        required_columns = ['Open', 'High', 'Low', 'Close', 'Volume']
+        for col in required_columns:
+            if col not in stock_data.columns:
+                stock_data[col] = np.nan
+        
+        # Remove rows with all NaN values
+        stock_data = stock_data.dropna(how='all')
+        
+        # Forward fill missing values
+        stock_data = stock_data.ffill()
+        
+        return stock_data if not stock_data.empty else None
+    
     def get_current_price(self, symbol):
         """
         Get current price for a stock
@@ -77,38 +429,83 @@ class StockDataFetcher:
             float: Current price or None if failed
         """
         try:
-            stock_data = self.get_stock_data(symbol, period="1d")
-            if stock_data is not None and not stock_data.empty:
-                return float(stock_data['Close'].iloc[-1])
-            return None
+            return self.quotes.get_quotes([symbol]).get(symbol)
         except:
             return None
     
-    def get_stock_info(self, symbol):
+    def get_quotes(self, symbols):
+        """
+        Get current prices for many stocks in one request
+        
+        Args:
+            symbols (list): List of stock symbols
+            
+        Returns:
+            dict: Symbol to current price for every symbol with data
+        """
+        try:
+            return self.quotes.get_quotes(symbols)
+        except Exception:
+            return {}
+    
+    def get_stock_info(self, symbol, fields=None):
         """
         Get additional stock information
         
         Args:
             symbol (str): Stock symbol
+            fields (list): Fields that must be up to date (INFO_FIELDS if None;
+                add valuation fields such as 'marketCap' to keep those fresh too)
             
         Returns:
             dict: Stock information or empty dict if failed
         """
         try:
-            stock_symbol = f"{symbol}{self.nse_suffix}"
-            ticker = yf.Ticker(stock_symbol)
-            info = ticker.info
-            
-            # If NSE info is empty, try BSE
-            if not info or len(info) <= 1:
-                stock_symbol = f"{symbol}{self.bse_suffix}"
-                ticker = yf.Ticker(stock_symbol)
-                info = ticker.info
-            
-            return info
+            if not self._candidate_suffixes(symbol):
+                return {}
+            if self.fundamentals is not None:
+                return self.fundamentals.get(
+                    symbol, self._fetch_stock_info, fields if fields is not None else INFO_FIELDS
+                )
+            return self._fetch_stock_info(symbol)
         except:
             return {}
     
+    def _fetch_stock_info(self, symbol):
+        """
+        Download company info from the symbol's exchange
+        
+        Args:
+            symbol (str): Stock symbol
+            
+        Returns:
+            dict: Stock information or empty dict if neither exchange has any
+        """
+        for suffix in self._candidate_suffixes(symbol):
+            info = self.provider.info(f"{symbol}{suffix}")
+            
+            # If this exchange has no info, try the other one
+            if info and len(info) > 1:
+                self._record_exchange(symbol, suffix)
+                return info
+        
+        return {}
+    
+    def warm_up_fundamentals(self, symbols, max_workers=8):
+        """
+        Refresh stored company info for many stocks, e.g. the whole universe
+        
+        Args:
+            symbols (list): List of stock symbols
+            max_workers (int): Maximum parallel info requests
+            
+        Returns:
+            dict: {'refreshed': count, 'failures': {symbol: reason}}
+        """
+        if self.fundamentals is None:
+            return {'refreshed': 0, 'failures': {}}
+        return self.fundamentals.warm_up(symbols, self._fetch_stock_info, max_workers=max_workers)
+    
     def validate_symbol(self, symbol):
         """
         Validate if a stock symbol exists and has data
@@ -136,18 +533,187 @@ class StockDataFetcher:
         Returns:
             dict: Dictionary with symbol as key and DataFrame as value
         """
-        stocks_data = {}
+        return self.fetch_stocks_batch(symbols, period)['data']
+    
+    def _stored_tickers(self, symbols, period):
+        """
+        Find symbols whose stored history already covers a period
         
-        for symbol in symbols:
-            try:
-                data = self.get_stock_data(symbol, period)
-                if data is not None and not data.empty:
-                    stocks_data[symbol] = data
-            except Exception as e:
-                st.warning(f"Failed to fetch data for {symbol}: {str(e)}")
+        Args:
+            symbols (list): Stock symbols
+            period (str): Time period
+            
+        Returns:
+            dict: Symbol to (yfinance ticker symbol, store metadata)
+        """
+        if self.store is None:
+            return {}
+        
+        start = period_start(period, self.provider.as_of())
+        stored = {}
+        try:
+            for symbol in symbols:
+                for suffix in self._candidate_suffixes(symbol):
+                    meta = self.store.get_meta(f"{symbol}{suffix}")
+                    if meta is None:
+                        continue
+                    if meta['covered_from'] is None or (start is not None and start >= meta['covered_from']):
+                        stored[symbol] = (f"{symbol}{suffix}", meta)
+                    break
+        except Exception:
+            # A broken or locked store should never block a live fetch
+            return {}
+        return stored
+    
+    def _top_up_batch(self, stored):
+        """
+        Bring many stored tickers up to date with one grouped download
+        
+        The download asks for the shortest period reaching back to the
+        oldest last stored date among the tickers due for a top-up.
+        
+        Args:
+            stored (dict): Symbol to (ticker, metadata), from _stored_tickers
+            
+        Returns:
+            list: Symbols that still need an individual top-up (no overlap with
+                the grouped response, or more than a year behind)
+        """
+        due = {symbol: entry for symbol, entry in stored.items() if self._needs_top_up(entry[1])}
+        if not due:
+            return []
+        
+        since = min(meta['last_date'] for _, meta in due.values())
+        end = self.provider.as_of()
+        period = next((p for p in ["1mo", "3mo", "6mo", "1y"] if period_start(p, end) <= since), None)
+        if period is None:
+            return list(due)
+        
+        grouped = self._download_grouped([ticker for ticker, _ in due.values()], period)
+        individual = []
+        for symbol, (ticker, meta) in due.items():
+            stock_data = grouped.get(ticker)
+            if stock_data is not None and stock_data.index[0] > meta['last_date']:
+                # No overlap with the stored bars, so the response cannot be merged safely
+                individual.append(symbol)
                 continue
+            new_bars = stock_data[stock_data.index >= meta['last_date']] if stock_data is not None else None
+            self._merge_new_bars(ticker, meta, new_bars)
+        return individual
+    
+    def fetch_stocks_batch(self, symbols, period="1y", max_workers=8):
+        """
+        Fetch data for many stocks, from the local store where possible
+        
+        Stored stocks are topped up together with one grouped download of
+        their newest bars. The rest are requested from their most likely
+        exchange in a single grouped yfinance download, and symbols missing
+        from that response are retried individually (NSE, then BSE) on a
+        bounded thread pool.
+        
+        Args:
+            symbols (list): List of stock symbols
+            period (str): Time period
+            max_workers (int): Maximum parallel fallback requests
+            
+        Returns:
+            dict: {'data': {symbol: DataFrame}, 'failures': {symbol: reason}}
+        """
+        result = {'data': {}, 'failures': {}}
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return result
         
-        return stocks_data
+        stored = self._stored_tickers(symbols, period)
+        if stored:
+            try:
+                individual = self._top_up_batch(stored)
+            except Exception:
+                # Grouped top-up failed outright, serve what is stored
+                individual = []
+            for symbol in individual:
+                del stored[symbol]
+            for symbol, (ticker, _) in stored.items():
+                try:
+                    stock_data = self._read_stored(ticker, period)
+                except Exception:
+                    stock_data = None
+                if stock_data is not None:
+                    result['data'][symbol] = stock_data
+        
+        # Everything else is downloaded in full, except symbols known to be unlisted
+        candidates = {
+            symbol: self._candidate_suffixes(symbol) for symbol in symbols if symbol not in result['data']
+        }
+        for symbol, suffixes in list(candidates.items()):
+            if not suffixes:
+                result['failures'][symbol] = UNLISTED
+                del candidates[symbol]
+        pending = list(candidates)
+        remaining = dict(candidates)
+        try:
+            grouped = self._download_grouped(
+                [f"{symbol}{candidates[symbol][0]}" for symbol in pending], period
+            ) if pending else {}
+            for symbol in pending:
+                stock_symbol = f"{symbol}{candidates[symbol][0]}"
+                stock_data = grouped.get(stock_symbol)
+                if stock_data is not None:
+                    result['data'][symbol] = stock_data
+                    self._record_exchange(symbol, candidates[symbol][0])
+                    self._save_to_store(stock_symbol, stock_data, period)
+                    del remaining[symbol]
+                else:
+                    # The grouped download already missed the first exchange
+                    remaining[symbol] = candidates[symbol][1:]
+        except Exception:
+            # Grouped download failed outright, fetch everything individually
+            pass
+        
+        if remaining:
+            workers = max(1, min(max_workers, len(remaining)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    symbol: executor.submit(self._download_candidates, symbol, suffixes, period)
+                    for symbol, suffixes in remaining.items()
+                }
+                for symbol, future in futures.items():
+                    try:
+                        stock_data, stock_symbol = future.result()
+                        if stock_data is not None:
+                            result['data'][symbol] = stock_data
+                            self._save_to_store(stock_symbol, stock_data, period)
+                        else:
+                            if len(remaining[symbol]) < len(candidates[symbol]):
+                                self._report_missing(symbol)
+                            result['failures'][symbol] = NO_DATA
+                    except Exception as e:
+                        result['failures'][symbol] = str(e)
+        
+        # Keep the caller's symbol order
+        result['data'] = {
+            symbol: result['data'][symbol] for symbol in symbols if symbol in result['data']
+        }
+        return result
+    
+    def _download_grouped(self, stock_symbols, period):
+        """
+        Download several yfinance tickers in one grouped request
+        
+        Args:
+            stock_symbols (list): yfinance ticker symbols (with exchange suffix)
+            period (str): Time period
+            
+        Returns:
+            dict: Cleaned DataFrame for every ticker that returned data
+        """
+        frames = {}
+        for stock_symbol, stock_data in self.provider.download(stock_symbols, period=period).items():
+            stock_data = self._clean_stock_data(stock_data)
+            if stock_data is not None:
+                frames[stock_symbol] = stock_data
+        
+        return frames
     
     def calculate_basic_metrics(self, stock_data):
         """
@@ -200,6 +766,92 @@ class StockDataFetcher:
             st.error(f"Error calculating metrics: {str(e)}")
             return {}
     
+    def calculate_universe_metrics(self, panel):
+        """
+        Calculate basic metrics for every symbol of an OHLCVPanel at once
+        
+        Gives the same numbers as calculate_basic_metrics on each symbol's own
+        history (up to float32 price precision) in one vectorized pass.
+        
+        Args:
+            panel (OHLCVPanel): Aligned multi-symbol OHLCV data
+            
+        Returns:
+            pandas.DataFrame: One row per symbol, one column per metric
+        """
+        columns = ['current_price', 'daily_change', 'daily_change_pct', 'high_52w', 'low_52w',
+                   'avg_volume', 'current_volume', 'volatility', 'total_return']
+        if panel is None or len(panel) == 0 or not panel.symbols:
+            return pd.DataFrame(columns=columns)
+        
+        try:
+            valid = panel.valid
+            close = panel.close.astype(np.float64)
+            volume = panel.volume.astype(np.float64)
+            n_dates, n_symbols = close.shape
+            symbol_index = np.arange(n_symbols)
+            counts = valid.sum(axis=0)
+            
+            # Row of the most recent bar before (and including) each date, per symbol
+            rows = np.where(valid, np.arange(n_dates)[:, None], -1)
+            last_seen = np.maximum.accumulate(rows, axis=0)
+            prev_seen = np.vstack([np.full((1, n_symbols), -1), last_seen[:-1]])
+            
+            first_row = valid.argmax(axis=0)
+            last_row = last_seen[-1].clip(min=0)
+            prev_row = prev_seen[last_row, symbol_index]
+            
+            current_price = close[last_row, symbol_index]
+            first_price = close[first_row, symbol_index]
+            
+            # Price changes
+            has_prev = prev_row >= 0
+            prev_price = np.where(has_prev, close[prev_row.clip(min=0), symbol_index], np.nan)
+            daily_change = np.where(has_prev, current_price - prev_price, 0.0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                daily_change_pct = np.where(has_prev & (prev_price != 0), daily_change / prev_price * 100, 0.0)
+            
+            # High/Low over traded dates only
+            high_52w = np.nanmax(np.where(valid, panel.field('High'), np.nan), axis=0)
+            low_52w = np.nanmin(np.where(valid, panel.field('Low'), np.nan), axis=0)
+            
+            # Volume
+            avg_volume = np.where(valid, volume, 0).sum(axis=0) / counts.clip(min=1)
+            current_volume = volume[last_row, symbol_index]
+            
+            # Volatility (annualized) from returns between consecutive traded dates
+            with np.errstate(divide='ignore', invalid='ignore'):
+                prev_close = np.take_along_axis(close, prev_seen.clip(min=0), axis=0)
+                returns = np.where(valid & (prev_seen >= 0), close / prev_close - 1, np.nan)
+            return_counts = (~np.isnan(returns)).sum(axis=0)
+            return_mean = np.nansum(returns, axis=0) / return_counts.clip(min=1)
+            squared = np.nansum((returns - return_mean) ** 2, axis=0)
+            volatility = np.where(
+                return_counts > 1, np.sqrt(squared / (return_counts - 1).clip(min=1)), np.nan
+            ) * np.sqrt(252) * 100
+            
+            # Returns
+            with np.errstate(divide='ignore', invalid='ignore'):
+                total_return = np.where(first_price != 0, (current_price / first_price - 1) * 100, 0.0)
+            
+            metrics = pd.DataFrame({
+                'current_price': current_price,
+                'daily_change': daily_change,
+                'daily_change_pct': daily_change_pct,
+                'high_52w': high_52w.astype(np.float64),
+                'low_52w': low_52w.astype(np.float64),
+                'avg_volume': avg_volume,
+                'current_volume': current_volume,
+                'volatility': volatility,
+                'total_return': total_return
+            }, index=pd.Index(panel.symbols, name='symbol'))
+            
+            return metrics[counts > 0]
+            
+        except Exception as e:
+            st.error(f"Error calculating metrics: {str(e)}")
+            return pd.DataFrame(columns=columns)
+    
     def get_sector_stocks(self, sector=None):
         """
         Get stocks from a specific sector (placeholder for future enhancement)
@@ -214,13 +866,14 @@ class StockDataFetcher:
         # For now, return empty list
         return []
     
-    def search_stocks(self, query, indian_stocks_dict):
+    def search_stocks(self, query, indian_stocks_dict, limit=None):
         """
-        Search for stocks based on query
+        Search for stocks based on query, best matches first
         
         Args:
             query (str): Search query
             indian_stocks_dict (dict): Dictionary of Indian stocks
+            limit (int): Maximum number of results (None for all)
             
         Returns:
             list: List of matching stock symbols and names
@@ -228,12 +881,15 @@ class StockDataFetcher:
         if not query:
             return []
         
-        query = query.lower()
-        matches = []
-        
-        for symbol, name in indian_stocks_dict.items():
-            if (query in symbol.lower() or 
-                query in name.lower()):
-                matches.append((symbol, name))
+        index = get_search_index()
+        if all(symbol in index for symbol in indian_stocks_dict):
+            return index.search(query, limit=limit, allowed=indian_stocks_dict)
         
-        return matches[:20]  # Limit to top 20 matches
+        # Custom universes outside the prebuilt index get their own index, kept
+        # until a different universe is searched
+        key = tuple(indian_stocks_dict.items())
+        cached = self._custom_search_index
+        if cached is None or cached[0] != key:
+            cached = (key, StockSearchIndex(indian_stocks_dict))
+            self._custom_search_index = cached
+        return cached[1].search(query, limit=limit)
@@ -0,0 +1,251 @@
+import re
+from bisect import bisect_left
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Result tiers, best first
+EXACT_SYMBOL, SYMBOL_PREFIX, NAME_PREFIX, SUBSTRING, FUZZY = range(5)
+
+
+def _tokens(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _grams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Optimal string alignment distance with an early cutoff
+
+    Counts insertions, deletions, substitutions and adjacent
+    transpositions, so "relaince" is one edit away from "reliance".
+
+    Args:
+        a (str): First string
+        b (str): Second string
+        limit (int): Stop once the distance is known to exceed this
+
+    Returns:
+        int: Edit distance, or limit + 1 if it is larger than limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+
+    return previous[-1]
+
+
+class StockSearchIndex:
+    """
+    Prebuilt ranked search over stock symbols and company names
+
+    Symbols and name words are kept in sorted lists for prefix lookups by
+    bisection, and name words are also indexed by trigram to find typo
+    candidates without scanning the universe. Substring matches come from
+    an index of every 1-3 character piece of the symbols and names, so a
+    query only checks the entries that contain all of its trigrams.
+    Results are ranked exact symbol, symbol prefix, name word prefix,
+    substring, then fuzzy match.
+    """
+
+    def __init__(self, stocks):
+        self.entries = list(stocks.items())
+        self._symbols_lower = [symbol.lower() for symbol, _ in self.entries]
+        self._names_lower = [name.lower() for _, name in self.entries]
+        self._symbol_lookup = {symbol: i for i, symbol in enumerate(self._symbols_lower)}
+
+        # Sorted (key, entry) pairs for prefix range scans
+        self._symbol_keys = sorted((symbol, i) for i, symbol in enumerate(self._symbols_lower))
+        words = set()
+        for i, (symbol, name) in enumerate(self.entries):
+            for word in set(_tokens(name)) | set(_tokens(symbol)):
+                words.add((word, i))
+        self._word_keys = sorted(words)
+
+        # Compact symbols ("bajajauto", "mm") so queries can ignore punctuation
+        self._symbols_compact = [re.sub(r"[^a-z0-9]", "", symbol) for symbol in self._symbols_lower]
+        self._compact_keys = sorted((symbol, i) for i, symbol in enumerate(self._symbols_compact))
+
+        # Trigram -> distinct words containing it, for fuzzy candidates
+        self._word_entries = {}
+        for word, i in self._word_keys:
+            self._word_entries.setdefault(word, set()).add(i)
+        self._words = sorted(self._word_entries)
+        self._trigram_index = {}
+        for word_id, word in enumerate(self._words):
+            for trigram in _trigrams(word):
+                self._trigram_index.setdefault(trigram, []).append(word_id)
+
+        # Substring piece -> entries whose symbol or name contains it
+        self._gram_index = {}
+        for i, texts in enumerate(zip(self._symbols_lower, self._names_lower)):
+            for text in texts:
+                for size in (1, 2, 3):
+                    for gram in _grams(text, size):
+                        self._gram_index.setdefault(gram, set()).add(i)
+
+    def _substring_matches(self, query):
+        """
+        Entries whose symbol or name contains the query
+        """
+        if len(query) <= 3:
+            return self._gram_index.get(query, set())
+
+        # Every entry containing the query contains all of its trigrams
+        postings = sorted((self._gram_index.get(gram, set()) for gram in _grams(query, 3)), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return {
+            i for i in candidates
+            if query in self._symbols_lower[i] or query in self._names_lower[i]
+        }
+
+    def _prefix_scan(self, keys, prefix):
+        matches = set()
+        position = bisect_left(keys, (prefix, -1))
+        while position < len(keys) and keys[position][0].startswith(prefix):
+            matches.add(keys[position][1])
+            position += 1
+        return matches
+
+    def _fuzzy_word_matches(self, word):
+        """
+        Distinct indexed words a small edit away from a query word
+
+        Returns:
+            dict: Matching word to its edit distance
+        """
+        limit = 1 if len(word) <= 7 else 2
+        query_trigrams = _trigrams(word)
+        counts = {}
+        for trigram in query_trigrams:
+            for word_id in self._trigram_index.get(trigram, ()):
+                counts[word_id] = counts.get(word_id, 0) + 1
+
+        # One edit changes at most four padded trigrams (a transposition)
+        needed = max(2, len(query_trigrams) - 4 * limit)
+        matches = {}
+        for word_id, count in counts.items():
+            if count < needed:
+                continue
+            candidate = self._words[word_id]
+            if len(candidate) < len(word) - limit:
+                continue
+            # The query word may also be a typo of a longer word's prefix
+            distance = min(
+                edit_distance(word, candidate, limit),
+                edit_distance(word, candidate[:len(word)], limit)
+            )
+            if distance <= limit:
+                matches[candidate] = distance
+        return matches
+
+    def _fuzzy_matches(self, words, exclude):
+        """
+        Entries where every query word is a small edit away from one of their words
+
+        Returns:
+            dict: Entry to total edit distance
+        """
+        scores = None
+        for word in words:
+            word_scores = {}
+            for candidate, distance in self._fuzzy_word_matches(word).items():
+                for i in self._word_entries[candidate]:
+                    if i not in word_scores or distance < word_scores[i]:
+                        word_scores[i] = distance
+            if scores is None:
+                scores = word_scores
+            else:
+                scores = {i: scores[i] + distance for i, distance in word_scores.items() if i in scores}
+        return {i: distance for i, distance in (scores or {}).items() if i not in exclude}
+
+    def search(self, query, limit=20, allowed=None):
+        """
+        Ranked search over symbols and company names
+
+        Args:
+            query (str): Search text, may contain typos
+            limit (int): Maximum number of results (None for all)
+            allowed (collection): Only return these symbols (all if None)
+
+        Returns:
+            list: List of tuples (symbol, company_name), best match first
+        """
+        query = " ".join(query.lower().split()) if query else ""
+        if not query:
+            return []
+
+        ranked = {}
+
+        def add(i, tier, tiebreak=0):
+            key = (tier, tiebreak, len(self._names_lower[i]), self._symbols_lower[i])
+            if i not in ranked or key < ranked[i]:
+                ranked[i] = key
+
+        def enough():
+            # Weaker tiers can only rank below results we already have
+            if limit is None:
+                return False
+            if allowed is None:
+                return len(ranked) >= limit
+            return sum(1 for i in ranked if self.entries[i][0] in allowed) >= limit
+
+        compact = re.sub(r"[^a-z0-9]", "", query)
+        exact = self._symbol_lookup.get(query)
+        if exact is not None:
+            add(exact, EXACT_SYMBOL)
+        for i in self._prefix_scan(self._compact_keys, compact) if compact else ():
+            if compact == self._symbols_compact[i]:
+                add(i, EXACT_SYMBOL, 1)
+            else:
+                add(i, SYMBOL_PREFIX)
+        for i in self._prefix_scan(self._symbol_keys, query):
+            add(i, SYMBOL_PREFIX)
+
+        words = _tokens(query)
+        if words:
+            word_matches = None
+            for word in words:
+                matches = self._prefix_scan(self._word_keys, word)
+                word_matches = matches if word_matches is None else word_matches & matches
+            for i in word_matches:
+                # Names that start with the query beat ones that only contain its words
+                add(i, NAME_PREFIX, 0 if self._names_lower[i].startswith(query) else 1)
+
+        if not enough():
+            for i in self._substring_matches(query):
+                add(i, SUBSTRING)
+
+        if words and len(compact) >= 3 and not enough():
+            for i, distance in self._fuzzy_matches(words, set(ranked)).items():
+                add(i, FUZZY, distance)
+
+        results = sorted(ranked, key=ranked.get)
+        if allowed is not None:
+            results = [i for i in results if self.entries[i][0] in allowed]
+        if limit is not None:
+            results = results[:limit]
+        return [self.entries[i] for i in results]
+
+    def __contains__(self, symbol):
+        return symbol.lower() in self._symbol_lookup
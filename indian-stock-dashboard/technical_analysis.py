@@ -1,133 +1,171 @@
+import math
 import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple
 import streamlit as st
+import indicator_kernels
+from indicator_engine import IndicatorEngine
+from indicator_graph import DEFAULT_GRAPH, INDICATOR_OUTPUTS
+import parallel_analysis
+from shared_cache import SharedCache
 
 class TechnicalAnalyzer:
     """
     Class for technical analysis and investment recommendations
     """
     
-    def __init__(self):
+    def __init__(self, cache=None, graph=None):
         self.indicators = {}
+        # Declarative indicator definitions; consumers request only the outputs they use
+        self.graph = graph if graph is not None else DEFAULT_GRAPH
+        # Results keyed by a fingerprint of the input frame, reused by every caller
+        self.cache = cache if cache is not None else SharedCache(max_bytes=64 * 1024 * 1024)
     
-    def calculate_rsi(self, prices, period=14):
+    def _fingerprint(self, stock_data, symbol=None):
         """
-        Calculate Relative Strength Index (RSI) - Manual implementation
+        Cheap identity of a price history: same fingerprint, same analysis
+        
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data
+            symbol (str): Stock symbol, if known
+            
+        Returns:
+            tuple: Hashable key, or None if the data cannot be fingerprinted
         """
         try:
-            delta = prices.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-            return rsi.values
+            if stock_data is None or stock_data.empty:
+                return None
+            return (
+                symbol, len(stock_data), stock_data.index[0], stock_data.index[-1],
+                float(stock_data['Close'].iloc[-1]), float(stock_data['Volume'].iloc[-1])
+            )
+        except Exception:
+            return None
+    
+    def _memoize(self, kind, stock_data, compute, symbol=None, *args):
+        fingerprint = self._fingerprint(stock_data, symbol)
+        if fingerprint is None:
+            return compute()
+        return self.cache.get_or_compute((kind, fingerprint) + args, compute)
+    
+    def get_indicator_series(self, stock_data, outputs, symbol=None):
+        """
+        Full indicator series for the requested outputs only
+        
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data
+            outputs (list): Indicator graph output names, e.g. ['sma_20', 'rsi']
+            symbol (str): Stock symbol, if known (used for caching)
+        
+        Returns:
+            pandas.DataFrame: One column per output, indexed like stock_data
+        """
+        def compute():
+            evaluation = self.graph.evaluate(stock_data)
+            return pd.DataFrame({name: evaluation[name] for name in outputs}, index=stock_data.index)
+        
+        return self._memoize('indicator_series', stock_data, compute, symbol, tuple(outputs))
+    
+    def get_moving_average(self, stock_data, period=20, symbol=None):
+        """
+        Simple moving average series of the close, shared between charts
+        """
+        return self.get_indicator_series(stock_data, [f'sma_{period}'], symbol)[f'sma_{period}']
+    
+    def calculate_rsi(self, prices, period=14, method='sma', delta=None):
+        """
+        Calculate Relative Strength Index (RSI)
+        
+        method='sma' averages gains and losses over a plain rolling window (the
+        dashboard's long-standing definition); 'wilder' uses Wilder's smoothing.
+        """
+        try:
+            return indicator_kernels.rsi(np.asarray(prices, dtype=np.float64), period, method, delta)
         except Exception as e:
             # Return neutral RSI if calculation fails
             return np.full(len(prices), 50.0)
     
     def calculate_macd(self, prices, fast=12, slow=26, signal=9):
         """
-        Calculate MACD - Manual implementation
+        Calculate MACD
         """
         try:
-            ema_fast = prices.ewm(span=fast).mean()
-            ema_slow = prices.ewm(span=slow).mean()
-            macd = ema_fast - ema_slow
-            macd_signal = macd.ewm(span=signal).mean()
+            prices = np.asarray(prices, dtype=np.float64)
+            macd = indicator_kernels.ewm_mean(prices, fast) - indicator_kernels.ewm_mean(prices, slow)
+            macd_signal = indicator_kernels.ewm_mean(macd, signal)
             macd_histogram = macd - macd_signal
-            return macd.values, macd_signal.values, macd_histogram.values
+            return macd, macd_signal, macd_histogram
         except Exception as e:
             # Return zeros if calculation fails
             zeros = np.zeros(len(prices))
             return zeros, zeros, zeros
     
-    def calculate_bollinger_bands(self, prices, period=20, std_dev=2):
+    def calculate_bollinger_bands(self, prices, period=20, std_dev=2, sums=None):
         """
-        Calculate Bollinger Bands - Manual implementation
+        Calculate Bollinger Bands
+        
+        `sums` can be a WindowSums of the prices already built for the moving averages.
         """
         try:
-            middle = prices.rolling(window=period).mean()
-            std = prices.rolling(window=period).std()
+            sums = sums if sums is not None else indicator_kernels.WindowSums(prices)
+            middle = sums.mean(period)
+            std = sums.std(period)
             upper = middle + (std * std_dev)
             lower = middle - (std * std_dev)
-            return upper.values, middle.values, lower.values
+            return upper, middle, lower
         except Exception as e:
             # Return price levels if calculation fails
-            price_array = prices.values
+            price_array = np.asarray(prices, dtype=np.float64)
             return price_array, price_array, price_array
     
-    def calculate_moving_averages(self, prices, periods=[20, 50, 200]):
+    def calculate_moving_averages(self, prices, periods=[20, 50, 200], sums=None):
         """
-        Calculate Simple Moving Averages
+        Calculate Simple Moving Averages, all from one running sum
         """
         mas = {}
+        try:
+            sums = sums if sums is not None else indicator_kernels.WindowSums(prices)
+        except Exception:
+            sums = None
         for period in periods:
             try:
-                mas[f'SMA_{period}'] = prices.rolling(window=period).mean().values
+                mas[f'SMA_{period}'] = sums.mean(period)
             except:
-                mas[f'SMA_{period}'] = prices.values
+                mas[f'SMA_{period}'] = np.asarray(prices, dtype=np.float64)
         return mas
     
     def calculate_stochastic(self, high, low, close, k_period=14, d_period=3):
         """
-        Calculate Stochastic Oscillator - Manual implementation
+        Calculate Stochastic Oscillator
         """
         try:
-            lowest_low = low.rolling(window=k_period).min()
-            highest_high = high.rolling(window=k_period).max()
-            k_percent = 100 * ((close - lowest_low) / (highest_high - lowest_low))
-            d_percent = k_percent.rolling(window=d_period).mean()
-            return k_percent.values, d_percent.values
+            lowest_low = indicator_kernels.rolling_min(low, k_period)
+            highest_high = indicator_kernels.rolling_max(high, k_period)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                k_percent = 100 * ((np.asarray(close, dtype=np.float64) - lowest_low) / (highest_high - lowest_low))
+            d_percent = indicator_kernels.rolling_mean(k_percent, d_period)
+            return k_percent, d_percent
         except Exception as e:
             # Return neutral values if calculation fails
             neutral = np.full(len(close), 50.0)
             return neutral, neutral
     
-    def calculate_indicators(self, stock_data):
+    def calculate_indicators(self, stock_data, outputs=None):
         """
-        Calculate all technical indicators for a stock
+        Calculate technical indicators for a stock
+        
+        Only the requested outputs (default: all of INDICATOR_OUTPUTS) and
+        the intermediates they depend on are computed, each once: one
+        close-price running sum serves every SMA and the Bollinger bands.
+        
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data
+            outputs (list): Indicator graph output names
         """
         indicators = {}
         
         try:
-            close_prices = stock_data['Close']
-            high_prices = stock_data['High']
-            low_prices = stock_data['Low']
-            
-            # RSI
-            rsi = self.calculate_rsi(close_prices)
-            indicators['rsi'] = rsi[-1] if len(rsi) > 0 and not np.isnan(rsi[-1]) else 50
-            
-            # MACD
-            macd, macd_signal, macd_hist = self.calculate_macd(close_prices)
-            indicators['macd'] = macd[-1] if len(macd) > 0 and not np.isnan(macd[-1]) else 0
-            indicators['macd_signal'] = macd_signal[-1] if len(macd_signal) > 0 and not np.isnan(macd_signal[-1]) else 0
-            indicators['macd_histogram'] = macd_hist[-1] if len(macd_hist) > 0 and not np.isnan(macd_hist[-1]) else 0
-            
-            # Moving Averages
-            mas = self.calculate_moving_averages(close_prices, [20, 50, 200])
-            indicators['sma_20'] = mas['SMA_20'][-1] if len(mas['SMA_20']) > 0 and not np.isnan(mas['SMA_20'][-1]) else close_prices.iloc[-1]
-            indicators['sma_50'] = mas['SMA_50'][-1] if len(mas['SMA_50']) > 0 and not np.isnan(mas['SMA_50'][-1]) else close_prices.iloc[-1]
-            indicators['sma_200'] = mas['SMA_200'][-1] if len(mas['SMA_200']) > 0 and not np.isnan(mas['SMA_200'][-1]) else close_prices.iloc[-1]
-            
-            # Bollinger Bands
-            bb_upper, bb_middle, bb_lower = self.calculate_bollinger_bands(close_prices)
-            indicators['bb_upper'] = bb_upper[-1] if len(bb_upper) > 0 and not np.isnan(bb_upper[-1]) else close_prices.iloc[-1]
-            indicators['bb_middle'] = bb_middle[-1] if len(bb_middle) > 0 and not np.isnan(bb_middle[-1]) else close_prices.iloc[-1]
-            indicators['bb_lower'] = bb_lower[-1] if len(bb_lower) > 0 and not np.isnan(bb_lower[-1]) else close_prices.iloc[-1]
-            
-            # Stochastic
-            stoch_k, stoch_d = self.calculate_stochastic(high_prices, low_prices, close_prices)
-            indicators['stoch_k'] = stoch_k[-1] if len(stoch_k) > 0 and not np.isnan(stoch_k[-1]) else 50
-            indicators['stoch_d'] = stoch_d[-1] if len(stoch_d) > 0 and not np.isnan(stoch_d[-1]) else 50
-            
-            # Current price
-            indicators['current_price'] = close_prices.iloc[-1]
-            
-            # Volume indicators
-            indicators['volume_sma'] = stock_data['Volume'].rolling(window=20).mean().iloc[-1]
-            indicators['current_volume'] = stock_data['Volume'].iloc[-1]
+            indicators = self.graph.latest(stock_data, outputs or INDICATOR_OUTPUTS)
             
         except Exception as e:
             # Return default values if any error occurs
@@ -144,13 +182,107 @@ class TechnicalAnalyzer:
         
         return indicators
     
-    def get_recommendation(self, stock_data):
+    def get_signal_series(self, stock_data, symbol=None):
+        """
+        Recommendation scores and labels for every bar of a history
+        
+        One vectorized pass over the whole history applies get_recommendation's
+        rules at each bar, as if the data had ended there.
+        
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data
+            symbol (str): Stock symbol, if known (used for caching)
+        
+        Returns:
+            pandas.DataFrame: Columns buy_signals, sell_signals, signal
+                (BUY/SELL/HOLD) and confidence, indexed like stock_data
+        """
+        def compute():
+            scores = IndicatorEngine({symbol: stock_data}).signal_scores()
+            signal = scores['signal'][:, 0]
+            return pd.DataFrame({
+                'buy_signals': scores['buy'][:, 0],
+                'sell_signals': scores['sell'][:, 0],
+                'signal': np.where(signal > 0, 'BUY', np.where(signal < 0, 'SELL', 'HOLD')),
+                'confidence': scores['confidence'][:, 0]
+            }, index=stock_data.index)
+        
+        return self._memoize('signal_series', stock_data, compute, symbol)
+    
+    def latest_window(self, tolerance=1e-6, fast=12, slow=26, signal=9, longest_sma=200):
+        """
+        Number of trailing bars calculate_latest_indicators looks at
+        
+        The longest rolling window (SMA 200) needs its own length. An EMA
+        with decay b = 1 - 2 / (span + 1) gives the bars older than w a total
+        weight of at most b ** w, so w = ceil(ln(tolerance) / ln(b)) bars make
+        it converge to within `tolerance` times the price range. The MACD
+        signal line needs that warm-up for the slow EMA plus its own.
+        
+        Returns:
+            int: Window length (242 bars for the defaults)
+        """
+        def warmup(span):
+            return math.ceil(math.log(tolerance) / math.log(1 - 2.0 / (span + 1)))
+        
+        return max(longest_sma, warmup(slow) + warmup(signal))
+    
+    def calculate_latest_indicators(self, stock_data, tolerance=1e-6):
+        """
+        Latest indicator values from only the trailing bars they depend on
+        
+        Cost stays constant however long the history is. Accuracy against
+        calculate_indicators on the full history, with R the full history's
+        close price range (max - min):
+        
+        - RSI, SMAs, Bollinger bands, stochastic and volume fields are the
+          same up to floating point rounding, since their windows fit in
+          the tail.
+        - MACD is within 2 * tolerance * R, and the MACD signal and histogram
+          are within 8 * tolerance * R.
+        
+        Histories no longer than the window give identical results.
+        
+        Args:
+            stock_data (pandas.DataFrame): OHLCV data
+            tolerance (float): Relative EMA truncation error allowed
+        
+        Returns:
+            dict: Same keys as calculate_indicators
+        """
+        return self.calculate_indicators(stock_data.iloc[-self.latest_window(tolerance):])
+    
+    def get_recommendation(self, stock_data, symbol=None):
         """
         Generate investment recommendation based on technical indicators
+        
+        Each data version is analyzed once; repeat calls return the stored result.
         """
+        return self._memoize('recommendation', stock_data, lambda: self._compute_recommendation(stock_data), symbol)
+    
+    def _compute_recommendation(self, stock_data):
         try:
-            indicators = self.calculate_indicators(stock_data)
+            indicators = self.calculate_latest_indicators(stock_data)
             
+            # Price Momentum
+            recent_trend = None
+            if len(stock_data) >= 5:
+                recent_trend = stock_data['Close'].iloc[-5:].pct_change().mean()
+            
+            return self._recommend_from_indicators(indicators, recent_trend)
+            
+        except Exception as e:
+            return self._default_recommendation()
+    
+    def _recommend_from_indicators(self, indicators, recent_trend=None):
+        """
+        Score precomputed indicators into a BUY/SELL/HOLD recommendation
+        
+        Args:
+            indicators (dict): Output of calculate_indicators
+            recent_trend (float): Mean daily return over the last 5 closes (None if unknown)
+        """
+        try:
             buy_signals = 0
             sell_signals = 0
             reasons = []
@@ -202,8 +334,7 @@ class TechnicalAnalyzer:
                     reasons.append("High trading volume supports the selling signal")
             
             # Price Momentum
-            if len(stock_data) >= 5:
-                recent_trend = stock_data['Close'].iloc[-5:].pct_change().mean()
+            if recent_trend is not None:
                 if recent_trend > 0.01:
                     buy_signals += 0.5
                     reasons.append("Recent price movement shows positive momentum")
@@ -235,14 +366,17 @@ class TechnicalAnalyzer:
             }
             
         except Exception as e:
-            return {
-                'signal': 'HOLD',
-                'confidence': 50,
-                'buy_signals': 0,
-                'sell_signals': 0,
-                'reasons': ['Analysis not available - Please try again'],
-                'indicators': {}
-            }
+            return self._default_recommendation()
+    
+    def _default_recommendation(self):
+        return {
+            'signal': 'HOLD',
+            'confidence': 50,
+            'buy_signals': 0,
+            'sell_signals': 0,
+            'reasons': ['Analysis not available - Please try again'],
+            'indicators': {}
+        }
     
     def get_simple_explanation(self, recommendation):
         """
@@ -274,9 +408,69 @@ class TechnicalAnalyzer:
         
         return explanations.get(signal, explanations['HOLD'])
 
-    def get_portfolio_suggestions(self, stocks_data):
+    def get_recommendations(self, stocks_data, parallel=False, workers=None):
+        """
+        Recommendations for many stocks, computing only those not analyzed yet
+        
+        Args:
+            stocks_data (dict): Symbol to OHLCV DataFrame
+            parallel (bool): Shard large watchlists across worker processes
+            workers (int): Worker processes when parallel (default: CPU count)
+            
+        Returns:
+            dict: Symbol to recommendation, as returned by get_recommendation
+        """
+        recommendations = {}
+        missing = {}
+        for stock, data in stocks_data.items():
+            fingerprint = self._fingerprint(data, stock)
+            cached = self.cache.get(('recommendation', fingerprint)) if fingerprint is not None else None
+            if cached is not None:
+                recommendations[stock] = cached
+            else:
+                missing[stock] = data
+        
+        if missing and parallel and parallel_analysis.should_parallelize(len(missing), workers):
+            try:
+                computed = parallel_analysis.parallel_recommendations(missing, self.latest_window(), workers)
+                for stock, recommendation in computed.items():
+                    fingerprint = self._fingerprint(missing[stock], stock)
+                    if fingerprint is not None:
+                        self.cache[('recommendation', fingerprint)] = recommendation
+                    recommendations[stock] = recommendation
+                missing = {stock: data for stock, data in missing.items() if stock not in computed}
+            except Exception as e:
+                # Fall back to the in-process pass below
+                pass
+        
+        if missing:
+            # Indicators for every remaining stock in one vectorized pass over the same
+            # trailing window get_recommendation uses
+            window = self.latest_window()
+            engine = IndicatorEngine({stock: data.iloc[-window:] for stock, data in missing.items()})
+            all_indicators = engine.latest_indicators()
+            trends = dict(zip(engine.symbols, engine.recent_trend()))
+            for stock, data in missing.items():
+                if stock in all_indicators:
+                    trend = trends[stock]
+                    recommendation = self._recommend_from_indicators(
+                        all_indicators[stock], None if np.isnan(trend) else trend
+                    )
+                    fingerprint = self._fingerprint(data, stock)
+                    if fingerprint is not None:
+                        self.cache[('recommendation', fingerprint)] = recommendation
+                else:
+                    recommendation = self.get_recommendation(data, stock)
+                recommendations[stock] = recommendation
+        
+        return recommendations
+    
+    def get_portfolio_suggestions(self, stocks_data, parallel=False, workers=None):
         """
         Provide AI-powered portfolio suggestions based on current market conditions
+        
+        With parallel=True, large watchlists are analyzed in worker processes
+        (see get_recommendations); the result has the same structure.
         """
         suggestions = {
             'strong_buys': [],
@@ -287,8 +481,10 @@ class TechnicalAnalyzer:
         }
         
         try:
+            recommendations = self.get_recommendations(stocks_data, parallel, workers)
+            
             for stock, data in stocks_data.items():
-                recommendation = self.get_recommendation(data)
+                recommendation = recommendations[stock]
                 signal = recommendation['signal']
                 confidence = recommendation['confidence']
                 
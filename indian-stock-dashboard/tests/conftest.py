@@ -0,0 +1,26 @@
+import os
+import sys
+
+# The dashboard is a flat set of modules; make them importable from the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data_providers import ReplayProvider  # noqa: E402
+
+
+class CountingProvider(ReplayProvider):
+    # Records every upstream request
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = []
+
+    def history(self, ticker, period=None, start=None, interval="1d"):
+        self.calls.append(('history', ticker))
+        return super().history(ticker, period=period, start=start, interval=interval)
+
+    def download(self, tickers, period=None, interval="1d"):
+        self.calls.append(('download', tuple(tickers)))
+        return super().download(tickers, period=period, interval=interval)
+
+    def info(self, ticker):
+        self.calls.append(('info', ticker))
+        return super().info(ticker)
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+import time
+import pandas as pd
+import pytest
+import async_stock_data
+from async_stock_data import AsyncStockDataFetcher, CircuitBreaker, TokenBucket, is_transient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # The breaker reads time.monotonic; the tests using this never start an event loop
+    clock = Clock()
+    monkeypatch.setattr(async_stock_data.time, 'monotonic', clock)
+    return clock
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.allow()
+
+
+def test_half_open_allows_a_single_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock.now += 31
+
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_probe_success_closes(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_probe_failure_reopens_for_another_cooldown(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now += 31
+    assert breaker.allow()
+
+
+def test_released_probe_lets_the_next_one_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock.now += 31
+    assert breaker.allow()
+
+    breaker.release()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_token_bucket_paces_after_the_burst():
+    async def take(bucket, count):
+        started = asyncio.get_running_loop().time()
+        for _ in range(count):
+            await bucket.acquire()
+        return asyncio.get_running_loop().time() - started
+
+    assert asyncio.run(take(TokenBucket(rate=50, capacity=5), 5)) < 0.02
+    # Five more tokens at 50 per second take about 0.1s
+    assert asyncio.run(take(TokenBucket(rate=50, capacity=5), 10)) >= 0.09
+
+
+class RateLimitError(Exception):
+    pass
+
+
+def test_is_transient():
+    assert is_transient(TimeoutError())
+    assert is_transient(ConnectionError())
+    assert is_transient(OSError())
+    assert is_transient(RateLimitError())
+    assert not is_transient(ValueError())
+    assert not is_transient(KeyError('Close'))
+
+
+class ScriptedFetcher:
+    # Raises the scripted errors in turn, then returns a frame
+    def __init__(self, errors=(), delay=0.0):
+        self.errors = list(errors)
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _get_history(self, symbol, period):
+        with self._lock:
+            self.calls += 1
+            error = self.errors.pop(0) if self.errors else None
+        if self.delay:
+            threading.Event().wait(self.delay)
+        if error is not None:
+            raise error
+        return pd.DataFrame({'Close': [1.0]})
+
+
+def fetcher_for(scripted, **kwargs):
+    options = dict(rate=1000, burst=1000, base_delay=0, max_delay=0, max_retries=2)
+    options.update(kwargs)
+    return AsyncStockDataFetcher(fetcher=scripted, **options)
+
+
+def test_transient_errors_are_retried():
+    scripted = ScriptedFetcher([ConnectionError("reset"), RateLimitError()])
+    result = fetcher_for(scripted).fetch_stocks(["A"])
+    assert list(result['data']) == ["A"]
+    assert scripted.calls == 3
+
+
+def test_non_transient_errors_are_not_retried():
+    scripted = ScriptedFetcher([ValueError("bad data")])
+    async_fetcher = fetcher_for(scripted)
+    result = async_fetcher.fetch_stocks(["A"])
+    assert result['failures'] == {"A": "bad data"}
+    assert scripted.calls == 1
+    assert async_fetcher.breaker.consecutive_failures == 0
+
+
+def test_retries_give_up_with_the_last_error():
+    scripted = ScriptedFetcher([ConnectionError("one"), ConnectionError("two"), ConnectionError("three")])
+    result = fetcher_for(scripted).fetch_stocks(["A"])
+    assert result['failures'] == {"A": "three"}
+    assert scripted.calls == 3
+
+
+def test_timeout_does_not_wait_for_the_stuck_call():
+    scripted = ScriptedFetcher(delay=1.0)
+    async_fetcher = fetcher_for(scripted, timeout=0.05, max_retries=0)
+    started = time.perf_counter()
+    result = async_fetcher.fetch_stocks(["A"])
+    assert time.perf_counter() - started < 0.5
+    assert result['failures'] == {"A": "Timed out after 0.05s"}
+
+
+def test_open_breaker_fails_fast():
+    scripted = ScriptedFetcher([ConnectionError()] * 10)
+    async_fetcher = fetcher_for(scripted, max_retries=0, failure_threshold=2, max_concurrency=1)
+    result = async_fetcher.fetch_stocks(["A", "B", "C", "D"])
+    assert scripted.calls == 2
+    assert result['failures']["D"] == "Upstream is failing, requests paused"
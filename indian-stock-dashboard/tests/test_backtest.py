@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtest import SignalBacktester
+from indicator_engine import IndicatorEngine
+
+# +10%, +10%, -10%, +10%
+CLOSE = [100.0, 110.0, 121.0, 108.9, 119.79]
+# HOLD, BUY, HOLD, SELL, BUY
+SIGNAL = [0, 1, 0, -1, 1]
+
+
+def history(close):
+    close = np.asarray(close, dtype=np.float64)
+    return pd.DataFrame({
+        'Open': close, 'High': close, 'Low': close, 'Close': close, 'Volume': np.full(len(close), 1000.0)
+    }, index=pd.bdate_range('2024-01-01', periods=len(close)))
+
+
+@pytest.fixture
+def fixed_signals(monkeypatch):
+    # Replace the scoring rules with a known signal path
+    def signal_scores(engine):
+        return {'signal': np.tile(np.array(SIGNAL, dtype=np.float64)[:, None], (1, len(engine.symbols)))}
+    monkeypatch.setattr(IndicatorEngine, 'signal_scores', signal_scores)
+
+
+def test_enters_on_buy_and_exits_on_sell(fixed_signals):
+    result = SignalBacktester(horizon=1).run({'TEST': history(CLOSE)})
+    row = result['summary'].loc['TEST']
+
+    # Long after bars 1-2 and 4, so it earns +10% then -10%, and bar 4 has no next bar
+    assert row['total_return'] == pytest.approx(1.1 * 0.9 - 1)
+    assert row['trades'] == 3
+    assert row['time_in_market'] == pytest.approx(3 / 5)
+    assert row['buy_signals'] == 2 and row['sell_signals'] == 1
+    assert row['buy_and_hold_return'] == pytest.approx(0.1979)
+    # BUY at bar 1 was followed by a rise, SELL at bar 3 was not, bar 4 is not judged yet
+    assert row['hit_rate'] == pytest.approx(0.5)
+
+
+def test_equity_curve_drawdown(fixed_signals):
+    result = SignalBacktester(horizon=1).run({'TEST': history(CLOSE)})
+
+    # Equity 1, 1.1, 0.99, 0.99, 0.99: the worst point is 10% below the 1.1 peak
+    assert result['summary'].loc['TEST', 'max_drawdown'] == pytest.approx(0.99 / 1.1 - 1)
+    assert result['overall']['portfolio_return'] == pytest.approx(1.1 * 0.9 - 1)
+    assert result['overall']['portfolio_max_drawdown'] == pytest.approx(0.99 / 1.1 - 1)
+
+
+def test_cost_is_charged_on_every_position_change(fixed_signals):
+    # Commission and slippage together, 10 bps per unit traded
+    cost = 0.001
+    result = SignalBacktester(horizon=1, cost=cost).run({'TEST': history(CLOSE)})
+
+    # Entries at bars 1 and 4 and the exit at bar 3 each pay the cost on that bar
+    expected = (1 + 0.1 - cost) * (1 - 0.1) * (1 - cost) * (1 - cost) - 1
+    assert result['summary'].loc['TEST', 'total_return'] == pytest.approx(expected)
+
+    free = SignalBacktester(horizon=1).run({'TEST': history(CLOSE)})
+    assert result['summary'].loc['TEST', 'total_return'] < free['summary'].loc['TEST', 'total_return']
+
+
+def test_portfolio_averages_symbols_equally(fixed_signals):
+    flat = history(np.full(len(CLOSE), 50.0))
+    result = SignalBacktester(horizon=1).run({'TEST': history(CLOSE), 'FLAT': flat})
+
+    assert result['summary'].loc['FLAT', 'total_return'] == 0
+    # Each bar's return is half the moving symbol's
+    assert result['overall']['portfolio_return'] == pytest.approx(1.05 * 0.95 - 1)
+
+
+def test_empty_input():
+    result = SignalBacktester().run({})
+    assert result['summary'].empty and result['overall'] == {}
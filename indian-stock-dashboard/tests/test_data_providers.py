@@ -0,0 +1,37 @@
+import pandas as pd
+import pytest
+from data_providers import MarketDataProvider, ReplayProvider
+
+
+def test_provider_missing_a_method_fails_when_built():
+    class HistoryOnly(MarketDataProvider):
+        def history(self, ticker, period=None, start=None, interval="1d"):
+            return pd.DataFrame()
+
+    with pytest.raises(TypeError, match="info"):
+        HistoryOnly()
+    with pytest.raises(TypeError):
+        MarketDataProvider()
+
+
+def test_default_download_calls_history_per_ticker():
+    class OneTicker(MarketDataProvider):
+        def history(self, ticker, period=None, start=None, interval="1d"):
+            if ticker != "TCS.NS":
+                return pd.DataFrame()
+            return pd.DataFrame({'Close': [1.0]}, index=pd.DatetimeIndex(["2024-03-15"]))
+
+        def info(self, ticker):
+            return {}
+
+    assert list(OneTicker().download(["TCS.NS", "TCS.BO"], period="5d")) == ["TCS.NS"]
+
+
+def test_replay_is_deterministic_and_nse_only():
+    provider = ReplayProvider(end="2024-03-15", symbols=["TCS"])
+    first = provider.history("TCS.NS", period="1mo")
+    pd.testing.assert_frame_equal(first, ReplayProvider(end="2024-03-15").history("TCS.NS", period="1mo"))
+    assert first.index[-1] == pd.Timestamp("2024-03-15")
+    assert provider.history("TCS.BO", period="1mo").empty
+    assert provider.history("INFY.NS", period="1mo").empty
+    assert provider.info("TCS.NS")['symbol'] == "TCS.NS"
@@ -0,0 +1,85 @@
+import sqlite3
+import pytest
+import fundamentals_store
+from fundamentals_store import FundamentalsStore, INFO_FIELDS
+from stock_data import StockDataFetcher
+from conftest import CountingProvider
+
+MINUTE = 60
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(fundamentals_store.time, 'time', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def fetcher(tmp_path):
+    provider = CountingProvider(end="2024-03-15", symbols=["TCS"])
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+    fetcher.fundamentals = FundamentalsStore(str(tmp_path / "fundamentals.sqlite"))
+    return fetcher
+
+
+def info_calls(fetcher):
+    return len([call for call in fetcher.provider.calls if call[0] == 'info'])
+
+
+def test_descriptive_fields_outlive_the_valuation_ttl(clock, fetcher):
+    first = fetcher.get_stock_info("TCS")
+    assert first['sector'] and first['marketCap']
+    assert info_calls(fetcher) == 1
+
+    # Past the valuation TTL the descriptive fields are still served, without stale prices
+    clock[0] += 20 * MINUTE
+    cached = fetcher.get_stock_info("TCS")
+    assert info_calls(fetcher) == 1
+    assert cached['sector'] == first['sector'] and cached['sharesOutstanding'] == first['sharesOutstanding']
+    assert 'marketCap' not in cached
+
+    # Asking for a valuation field refetches
+    assert fetcher.get_stock_info("TCS", fields=['marketCap'])['marketCap']
+    assert info_calls(fetcher) == 2
+
+    clock[0] += 8 * DAY
+    fetcher.get_stock_info("TCS")
+    assert info_calls(fetcher) == 3
+
+
+def test_fields_the_provider_does_not_return_do_not_force_refetches(clock, fetcher):
+    fetcher.get_stock_info("TCS")
+    assert 'industry' in INFO_FIELDS and 'industry' not in fetcher.fundamentals.read("TCS")
+
+    clock[0] += DAY
+    fetcher.get_stock_info("TCS")
+    assert info_calls(fetcher) == 1
+
+
+def test_failed_refetch_serves_the_stale_snapshot(clock, tmp_path):
+    store = FundamentalsStore(str(tmp_path / "fundamentals.sqlite"))
+    store.get("TCS", lambda symbol: {'sector': 'Technology', 'marketCap': 1.0})
+
+    clock[0] += 20 * MINUTE
+    assert store.get("TCS", lambda symbol: {}, fields=['marketCap']) == {'sector': 'Technology', 'marketCap': 1.0}
+
+
+def test_store_write_errors_still_return_the_fetched_info(clock, tmp_path, monkeypatch):
+    store = FundamentalsStore(str(tmp_path / "fundamentals.sqlite"))
+
+    def broken_write(symbol, info):
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(store, 'write', broken_write)
+
+    assert store.get("TCS", lambda symbol: {'sector': 'Technology'}) == {'sector': 'Technology'}
+
+
+def test_snapshots_persist_across_instances(clock, tmp_path):
+    path = str(tmp_path / "fundamentals.sqlite")
+    FundamentalsStore(path).write("TCS", {'sector': 'Technology', 'trailingPE': 30.5})
+
+    reopened = FundamentalsStore(path)
+    assert reopened.is_fresh("TCS", ['sector', 'trailingPE'])
+    assert reopened.screen({'trailingPE': (None, 40)}).index.tolist() == ["TCS"]
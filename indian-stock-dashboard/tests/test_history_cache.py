@@ -0,0 +1,106 @@
+import pandas as pd
+from async_stock_data import AsyncStockDataFetcher
+from history_cache import HistoryCache
+from market_calendar import slice_period
+from shared_cache import SharedCache
+from stock_data import StockDataFetcher, NO_DATA
+from conftest import CountingProvider
+
+END = pd.Timestamp("2024-03-15")
+
+
+def cache_with_provider(storage=None):
+    provider = CountingProvider(end=END, symbols=["TCS", "INFY"])
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+    return HistoryCache(fetcher, storage=storage), provider
+
+
+def test_shorter_periods_are_sliced_without_fetching():
+    cache, provider = cache_with_provider()
+    year = cache.get("TCS", "1y")
+    assert len(provider.calls) == 1
+
+    full = cache.longest("TCS")
+    assert full.index[0] <= END - pd.DateOffset(years=2)
+    pd.testing.assert_frame_equal(year, slice_period(full, "1y", END))
+
+    provider.calls.clear()
+    for period in ["6mo", "1mo", "5d", "1y", "2y"]:
+        pd.testing.assert_frame_equal(cache.get("TCS", period), slice_period(full, period, END))
+    assert provider.calls == []
+
+
+def test_longer_period_fetches_once_and_then_covers_shorter_ones():
+    cache, provider = cache_with_provider()
+    cache.get("TCS", "6mo")
+    provider.calls.clear()
+
+    cache.get("TCS", "5y")
+    assert len(provider.calls) == 1
+    provider.calls.clear()
+    cache.get("TCS", "2y")
+    cache.get("TCS", "1mo")
+    assert provider.calls == []
+
+
+def test_get_many_fetches_only_uncovered_symbols():
+    cache, provider = cache_with_provider(SharedCache())
+    cache.get("TCS", "1y")
+    provider.calls.clear()
+
+    result = cache.get_many(["TCS", "INFY", "NOPE"], "6mo")
+    assert list(result['data']) == ["TCS", "INFY"]
+    assert "NOPE" in result['failures']
+    assert all("TCS" not in str(call) for call in provider.calls)
+
+    provider.calls.clear()
+    again = cache.get_many(["TCS", "INFY"], "1mo")
+    assert provider.calls == []
+    for symbol, stock_data in again['data'].items():
+        pd.testing.assert_frame_equal(stock_data, slice_period(cache.longest(symbol), "1mo", END))
+
+
+def test_get_many_uses_one_grouped_download():
+    cache, provider = cache_with_provider()
+    result = cache.get_many(["TCS", "INFY"], "1y", async_fetcher=FailingAsyncFetcher())
+    assert list(result['data']) == ["TCS", "INFY"]
+    assert [call for call in provider.calls if call[0] == 'download'] == [('download', ("TCS.NS", "INFY.NS"))]
+
+
+class FailingAsyncFetcher:
+    # Only used if the batch path leaves errors behind
+    def fetch_stocks(self, symbols, period="1y"):
+        raise AssertionError("async fallback should not run")
+
+
+class FlakyProvider(CountingProvider):
+    # The grouped and the individual request for INFY fail like dropped connections
+    failures = 2
+
+    def history(self, ticker, period=None, start=None, interval="1d"):
+        if ticker == "INFY.NS" and self.failures:
+            self.failures -= 1
+            raise ConnectionError("connection reset")
+        return super().history(ticker, period=period, start=start, interval=interval)
+
+
+def test_get_many_retries_errors_through_the_async_fetcher():
+    provider = FlakyProvider(end=END, symbols=["TCS", "INFY"])
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+    cache = HistoryCache(fetcher)
+    async_fetcher = AsyncStockDataFetcher(fetcher, base_delay=0, max_delay=0)
+
+    result = cache.get_many(["TCS", "INFY", "NOPE"], "1y", async_fetcher)
+    assert list(result['data']) == ["TCS", "INFY"]
+    # A symbol with no data is a failure, not an error to retry
+    assert result['failures'] == {"NOPE": NO_DATA}
+    assert cache.covers("INFY", "1y")
+
+
+def test_get_many_reports_errors_without_an_async_fetcher():
+    provider = FlakyProvider(end=END, symbols=["TCS", "INFY"])
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+
+    result = HistoryCache(fetcher).get_many(["TCS", "INFY"], "1y")
+    assert list(result['data']) == ["TCS"]
+    assert result['failures'] == {"INFY": "connection reset"}
@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+from indicator_engine import IndicatorEngine
+from indicator_state import IndicatorState
+
+
+def flat_history(bars, price=100.0):
+    index = pd.bdate_range('2023-01-02', periods=bars)
+    return pd.DataFrame(
+        {'Open': price, 'High': price, 'Low': price, 'Close': price, 'Volume': 1000.0},
+        index=index
+    )
+
+
+def test_flat_prices_give_zero_macd_and_hold():
+    engine = IndicatorEngine({'LONG': flat_history(300), 'SHORT': flat_history(40, 250.0)})
+    macd, macd_signal, histogram = engine.macd()
+    for matrix in (macd, macd_signal, histogram):
+        assert np.all(matrix[~np.isnan(matrix)] == 0)
+
+    scores = engine.signal_scores()
+    assert np.all(scores['signal'][-1] == 0)
+    assert np.all(scores['confidence'][-1] == 50)
+
+
+def test_incremental_state_keeps_flat_macd_exact():
+    state = IndicatorState.from_history(flat_history(300))
+    indicators = state.indicators()
+    assert indicators['macd'] == 0
+    assert indicators['macd_signal'] == 0
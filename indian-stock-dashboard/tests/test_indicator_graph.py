@@ -0,0 +1,82 @@
+from collections import Counter
+import pytest
+from data_providers import ReplayProvider
+from indicator_graph import DEFAULT_GRAPH, INDICATOR_OUTPUTS, _default_graph
+from technical_analysis import TechnicalAnalyzer
+
+
+@pytest.fixture
+def stock_data():
+    return ReplayProvider(end="2024-03-15").history("TEST.NS", period="2y")
+
+
+def counting_graph():
+    # A fresh default graph whose nodes count how often they are computed
+    graph = _default_graph()
+    counts = Counter()
+    find = graph.node
+
+    def node(name):
+        found = find(name)
+        if not getattr(found, 'counted', False):
+            compute = found.compute
+
+            def counted(*values):
+                counts[name] += 1
+                return compute(*values)
+            found.compute, found.counted = counted, True
+        return found
+
+    graph.node = node
+    return graph, counts
+
+
+def test_rsi_computes_only_what_it_depends_on(stock_data):
+    graph, counts = counting_graph()
+    graph.latest(stock_data, ['rsi'])
+    assert counts == Counter({'rsi': 1, 'rsi_14': 1, 'close_diff': 1})
+
+
+def test_shared_intermediates_are_computed_once(stock_data):
+    graph, counts = counting_graph()
+    graph.latest(stock_data, INDICATOR_OUTPUTS + ['sma_100'])
+    assert set(counts.values()) == {1}
+    # One running close sum serves every SMA and the Bollinger bands
+    assert {'close_sums', 'sma_20', 'sma_50', 'sma_100', 'sma_200', 'std_20'} <= set(counts)
+    assert 'volume_sums' in counts
+
+
+def test_evaluation_is_lazy_and_reused(stock_data):
+    evaluation = DEFAULT_GRAPH.evaluate(stock_data)
+    assert evaluation.computed() == []
+    first = evaluation['sma_20']
+    assert evaluation['sma_20'] is first
+    assert set(evaluation.computed()) == {'close', 'close_sums', 'sma_20'}
+
+
+def test_latest_values_match_technical_analyzer(stock_data):
+    analyzer = TechnicalAnalyzer()
+    latest = DEFAULT_GRAPH.latest(stock_data)
+    expected = analyzer.calculate_latest_indicators(stock_data)
+
+    price_range = stock_data['Close'].max() - stock_data['Close'].min()
+    for name in INDICATOR_OUTPUTS:
+        # MACD comes from a truncated tail there, within 8 * 1e-6 of the price range
+        tolerance = 8e-6 * price_range if name.startswith('macd') else 1e-8 * max(1.0, abs(expected[name]))
+        assert latest[name] == pytest.approx(expected[name], abs=tolerance), name
+
+    rsi = analyzer.calculate_rsi(stock_data['Close'])
+    assert latest['rsi'] == pytest.approx(rsi[-1])
+    macd, _, _ = analyzer.calculate_macd(stock_data['Close'])
+    assert latest['macd'] == pytest.approx(macd[-1])
+
+
+def test_families_create_nodes_on_demand(stock_data):
+    graph = _default_graph()
+    assert 'ema_7' not in graph.nodes
+    ema = graph.evaluate(stock_data)['ema_7']
+    assert graph.node('ema_7').inputs == ['close']
+    assert ema[-1] == pytest.approx(stock_data['Close'].ewm(span=7, adjust=False).mean().iloc[-1])
+
+    with pytest.raises(KeyError):
+        graph.node('not_an_indicator')
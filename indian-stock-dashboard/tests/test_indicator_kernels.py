@@ -0,0 +1,138 @@
+import numpy as np
+import pandas as pd
+import pytest
+import indicator_kernels as kernels
+
+
+def random_walks(rows=400, columns=4, seed=0):
+    """
+    Price-like columns with a NaN-leading column and a short-history column
+    """
+    rng = np.random.default_rng(seed)
+    prices = 1000 + rng.normal(size=(rows, columns)).cumsum(axis=0)
+    prices[:37, 1] = np.nan
+    prices[:rows - 10, 2] = np.nan
+    return prices
+
+
+def assert_matches(result, expected, rtol=1e-9, atol=1e-9):
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(expected))
+    np.testing.assert_allclose(result, expected, rtol=rtol, atol=atol, equal_nan=True)
+
+
+@pytest.mark.parametrize('span', [9, 12, 26])
+def test_ewm_mean_matches_pandas(span):
+    prices = random_walks()
+    expected = pd.DataFrame(prices).ewm(span=span).mean().to_numpy()
+    assert_matches(kernels.ewm_mean(prices, span), expected)
+
+
+def test_ewm_mean_vector_input():
+    prices = random_walks()[:, 0]
+    assert_matches(kernels.ewm_mean(prices, 12), pd.Series(prices).ewm(span=12).mean().to_numpy())
+
+
+def test_ewm_mean_keeps_flat_series_exact():
+    flat = np.full((300, 3), 1234.56)
+    flat[:50, 1] = np.nan
+    result = kernels.ewm_mean(flat, 26)
+    assert np.all(np.isnan(result[:50, 1]))
+    assert np.all(result[~np.isnan(result)] == 1234.56)
+
+    macd = kernels.ewm_mean(flat, 12) - kernels.ewm_mean(flat, 26)
+    assert np.all(macd[~np.isnan(macd)] == 0)
+    assert np.all(kernels.ewm_mean(macd, 9)[~np.isnan(macd)] == 0)
+
+
+@pytest.mark.parametrize('rows', [1, 63, 64, 65, 1000])
+def test_decay_sum_matches_recursion(rows):
+    values = np.random.default_rng(rows).normal(size=(rows, 2))
+    decay = 1 - 2.0 / 27
+    expected = np.empty_like(values)
+    total = np.zeros(2)
+    for row in range(rows):
+        total = total * decay + values[row]
+        expected[row] = total
+    assert_matches(kernels.decay_sum(values, decay), expected)
+
+
+def test_decay_sum_empty():
+    assert kernels.decay_sum(np.empty((0, 3)), 0.5).shape == (0, 3)
+
+
+@pytest.mark.parametrize('block', [16, 256])
+@pytest.mark.parametrize('window', [3, 14, 20, 50, 200])
+def test_window_sums_match_pandas(block, window):
+    prices = random_walks()
+    sums = kernels.WindowSums(prices, block=block)
+    rolling = pd.DataFrame(prices).rolling(window)
+    assert_matches(sums.mean(window), rolling.mean().to_numpy())
+    assert_matches(sums.std(window), rolling.std().to_numpy(), rtol=1e-7, atol=1e-7)
+
+
+def test_window_sums_keep_flat_series_exact():
+    flat = np.full((300, 2), 987.65)
+    flat[:30, 1] = np.nan
+    sums = kernels.WindowSums(flat, block=64)
+    mean, std = sums.mean(20), sums.std(20)
+    assert np.all(mean[~np.isnan(mean)] == 987.65)
+    assert np.all(std[~np.isnan(std)] == 0)
+    assert np.isnan(mean[30 + 18, 1]) and mean[30 + 19, 1] == 987.65
+
+
+@pytest.mark.parametrize('long_rows', [100, 10_000])
+def test_window_sums_long_and_short_paths_agree(long_rows):
+    prices = random_walks()
+    prices[50:60, 1] = np.nan
+    sums = kernels.WindowSums(prices, long_rows=long_rows)
+    assert sums.long == (long_rows == 100)
+    rolling = pd.DataFrame(prices).rolling(20)
+    assert_matches(sums.mean(20), rolling.mean().to_numpy())
+    assert_matches(sums.var(20), rolling.var().to_numpy(), rtol=1e-7, atol=1e-7)
+    assert_matches(kernels.WindowSums(prices[:, 0], long_rows=long_rows).mean(20), rolling.mean().to_numpy()[:, 0])
+
+
+def test_window_sums_shorter_than_window():
+    prices = random_walks(rows=10)
+    assert np.all(np.isnan(kernels.WindowSums(prices).mean(20)))
+    assert np.all(np.isnan(kernels.rolling_std(prices, 20)))
+
+
+@pytest.mark.parametrize('window', [1, 3, 14, 52, 400, 401])
+def test_rolling_extremes_match_pandas(window):
+    prices = random_walks()
+    rolling = pd.DataFrame(prices).rolling(window)
+    assert_matches(kernels.rolling_min(prices, window), rolling.min().to_numpy(), rtol=0, atol=0)
+    assert_matches(kernels.rolling_max(prices, window), rolling.max().to_numpy(), rtol=0, atol=0)
+
+
+def test_rolling_extremes_flat_series():
+    flat = np.full(50, 42.0)
+    assert np.all(kernels.rolling_min(flat, 14)[13:] == 42.0)
+    assert np.all(kernels.rolling_max(flat, 14)[13:] == 42.0)
+
+
+def test_rsi_matches_dashboard_definition():
+    prices = random_walks()
+    frame = pd.DataFrame(prices)
+    delta = frame.diff()
+    gain = delta.where(delta > 0, 0).rolling(14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(14).mean()
+    expected = (100 - 100 / (1 + gain / loss)).to_numpy()
+    assert_matches(kernels.rsi(prices, 14), expected, rtol=1e-7, atol=1e-7)
+    assert_matches(kernels.rsi(prices[:, 0], 14, delta=kernels.diff(prices[:, 0])), expected[:, 0], rtol=1e-7, atol=1e-7)
+
+
+def test_rsi_wilder_matches_recursion():
+    close = random_walks()[:, 0]
+    delta = np.diff(close)
+    gains, losses = np.maximum(delta, 0), np.maximum(-delta, 0)
+    average_gain, average_loss = gains[:14].mean(), losses[:14].mean()
+    expected = [100 - 100 / (1 + average_gain / average_loss)]
+    for gain, loss in zip(gains[14:], losses[14:]):
+        average_gain = (average_gain * 13 + gain) / 14
+        average_loss = (average_loss * 13 + loss) / 14
+        expected.append(100 - 100 / (1 + average_gain / average_loss))
+    result = kernels.rsi(close, 14, method='wilder')
+    assert np.all(np.isnan(result[:14]))
+    np.testing.assert_allclose(result[14:], expected, rtol=1e-9)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+from data_providers import ReplayProvider
+from intraday import BarRingBuffer, IntradayFeed
+from market_calendar import IST
+from stock_data import StockDataFetcher
+
+
+def bars(minutes, close=None):
+    times = pd.Timestamp("2024-03-15 09:15") + pd.to_timedelta(minutes, unit='min')
+    close = np.asarray(close if close is not None else np.arange(len(times)) + 100.0, dtype=np.float64)
+    return pd.DataFrame({
+        'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': np.full(len(times), 10.0)
+    }, index=times)
+
+
+def closes(buffer):
+    return list(buffer.to_frame()['Close'])
+
+
+def test_ring_buffer_wraps_around_keeping_the_newest_bars():
+    buffer = BarRingBuffer(capacity=3)
+    assert buffer.last_timestamp is None
+    assert buffer.append(bars([0, 5], [1, 2])) == 2
+    assert buffer.append(bars([10, 15, 20], [3, 4, 5])) == 3
+
+    assert len(buffer) == 3
+    assert closes(buffer) == [3, 4, 5]
+    assert buffer.last_timestamp == pd.Timestamp("2024-03-15 09:35")
+
+    # Wrapping again keeps time order
+    buffer.append(bars([25, 30], [6, 7]))
+    assert closes(buffer) == [5, 6, 7]
+    assert list(buffer.to_frame(after=pd.Timestamp("2024-03-15 09:35"))['Close']) == [6, 7]
+
+
+def test_more_bars_than_capacity_keeps_the_last_ones():
+    buffer = BarRingBuffer(capacity=3)
+    assert buffer.append(bars([0, 5, 10, 15, 20], [1, 2, 3, 4, 5])) == 5
+    assert closes(buffer) == [3, 4, 5]
+
+
+def test_newest_bar_is_updated_in_place():
+    buffer = BarRingBuffer(capacity=5)
+    buffer.append(bars([0, 5], [1, 2]))
+
+    # The still-forming 09:20 bar comes back with a new close
+    assert buffer.append(bars([5], [2.5])) == 0
+    assert closes(buffer) == [1, 2.5]
+    assert buffer.append(bars([5, 10], [3, 4])) == 1
+    assert closes(buffer) == [1, 3, 4]
+
+
+def test_late_and_duplicate_bars_are_dropped():
+    buffer = BarRingBuffer(capacity=5)
+    buffer.append(bars([0, 5, 10], [1, 2, 3]))
+
+    # Bars older than the newest stored one arrived late
+    assert buffer.append(bars([0, 5], [9, 9])) == 0
+    assert closes(buffer) == [1, 2, 3]
+
+    # Repeated timestamps in one response keep their last copy
+    assert buffer.append(bars([15, 15, 20, 20], [4, 4.5, 5, 5.5])) == 2
+    assert closes(buffer) == [1, 2, 3, 4.5, 5.5]
+
+
+def test_out_of_order_response_into_an_empty_buffer():
+    buffer = BarRingBuffer(capacity=5)
+    assert buffer.append(bars([10, 0, 5, 0], [3, 1, 2, 1.5])) == 3
+    assert closes(buffer) == [1.5, 2, 3]
+
+
+class RecordingProvider(ReplayProvider):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.requests = []
+
+    def history(self, ticker, period=None, start=None, interval="1d"):
+        self.requests.append({'ticker': ticker, 'period': period, 'start': start, 'interval': interval})
+        return super().history(ticker, period=period, start=start, interval=interval)
+
+
+def test_poll_asks_only_for_bars_from_the_newest_one():
+    provider = RecordingProvider(end="2024-03-15", symbols=["TCS"])
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+    feed = IntradayFeed(fetcher, interval="5m", min_poll_interval=0)
+
+    assert feed.poll(["TCS"]) == {"TCS": 75}
+    first = provider.requests[-1]
+    assert (first['ticker'], first['period'], first['start'], first['interval']) == ("TCS.NS", "1d", None, "5m")
+
+    last_bar = feed.get_bars("TCS").index[-1]
+    assert feed.poll(["TCS"]) == {"TCS": 0}
+    assert provider.requests[-1]['start'] == last_bar.tz_localize(IST)
+    assert len(feed.get_bars("TCS")) == 75
+
+
+def test_polls_closer_than_the_interval_are_skipped():
+    provider = RecordingProvider(end="2024-03-15", symbols=["TCS"])
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+    feed = IntradayFeed(fetcher, interval="5m", min_poll_interval=60)
+
+    feed.poll(["TCS"])
+    assert feed.poll(["TCS"]) == {}
+    assert len(provider.requests) == 1
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+from ohlcv_panel import OHLCVPanel
+
+
+def make_panel():
+    index = pd.bdate_range('2024-01-01', periods=10)
+    frame = pd.DataFrame({
+        'Open': np.arange(10.0), 'High': np.arange(10.0) + 1, 'Low': np.arange(10.0) - 1,
+        'Close': np.arange(10.0), 'Volume': np.full(10, 100.0)
+    }, index=index)
+    return OHLCVPanel.from_frames({'A': frame, 'B': frame.iloc[5:]})
+
+
+def test_tail():
+    panel = make_panel()
+    assert len(panel.tail(3)) == 3
+    np.testing.assert_array_equal(panel.tail(3).field('Close')[:, 0], [7, 8, 9])
+    assert len(panel.tail(50)) == 10
+    for n in (0, -1):
+        empty = panel.tail(n)
+        assert len(empty) == 0 and empty.symbols == panel.symbols
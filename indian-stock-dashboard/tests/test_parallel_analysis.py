@@ -0,0 +1,78 @@
+from concurrent.futures import Future
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+import parallel_analysis
+from data_providers import ReplayProvider
+from parallel_analysis import SharedPricePanel, parallel_recommendations
+from technical_analysis import TechnicalAnalyzer
+
+PERIODS = ["1mo", "3mo", "6mo", "1y", "2y", "5y", "1y", "2y"]
+
+
+@pytest.fixture
+def stocks_data():
+    # Histories shorter and longer than the analysis window
+    provider = ReplayProvider(end="2024-03-15")
+    return {f"S{i}": provider.history(f"S{i}.NS", period=period) for i, period in enumerate(PERIODS)}
+
+
+def assert_indicators_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for name, value in expected.items():
+        if isinstance(value, (float, np.floating)):
+            assert actual[name] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), name
+        else:
+            assert actual[name] == value, name
+
+
+def test_matches_the_serial_path(stocks_data, monkeypatch):
+    # Several shards even for a small universe
+    monkeypatch.setattr(parallel_analysis, 'MIN_SYMBOLS_PER_WORKER', 2)
+    analyzer = TechnicalAnalyzer()
+    parallel = parallel_recommendations(stocks_data, analyzer.latest_window(), workers=3)
+
+    assert list(parallel) == list(stocks_data)
+    for symbol, stock_data in stocks_data.items():
+        serial = TechnicalAnalyzer().get_recommendation(stock_data, symbol)
+        for key in ['signal', 'confidence', 'buy_signals', 'sell_signals', 'reasons']:
+            assert parallel[symbol][key] == serial[key], (symbol, key)
+        assert_indicators_close(parallel[symbol]['indicators'], analyzer.calculate_latest_indicators(stock_data))
+
+
+class FailingPool:
+    def submit(self, function, *args):
+        future = Future()
+        future.set_exception(RuntimeError("worker died"))
+        return future
+
+
+def test_shared_block_is_unlinked_when_a_worker_fails(stocks_data, monkeypatch):
+    names = []
+    create = SharedPricePanel.__init__
+
+    def recording_init(panel, *args, **kwargs):
+        create(panel, *args, **kwargs)
+        names.append(panel.memory.name)
+
+    monkeypatch.setattr(SharedPricePanel, '__init__', recording_init)
+    monkeypatch.setattr(parallel_analysis, '_get_pool', lambda workers: FailingPool())
+
+    with pytest.raises(RuntimeError, match="worker died"):
+        parallel_recommendations(stocks_data, TechnicalAnalyzer().latest_window(), workers=2)
+    assert len(names) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=names[0])
+
+
+def test_shared_block_is_unlinked_after_success(stocks_data):
+    with SharedPricePanel(stocks_data, window=50) as panel:
+        name = panel.memory.name
+        assert panel.shape == (4, 50, len(stocks_data))
+        assert panel.shards(3) == [(0, 2), (2, 5), (5, 8)]
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_empty_universe():
+    assert parallel_recommendations({}, 242, workers=2) == {}
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+import quote_service
+from stock_data import StockDataFetcher
+from conftest import CountingProvider
+
+NOW = pd.Timestamp("2024-03-15 11:00", tz="Asia/Kolkata")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(quote_service.time, 'time', lambda: now[0])
+    monkeypatch.setattr(quote_service, 'now_ist', lambda: NOW)
+    return now
+
+
+def service_with_provider(monkeypatch, market_open=True):
+    monkeypatch.setattr(quote_service, 'is_market_open', lambda now=None: market_open)
+    monkeypatch.setattr(quote_service, 'next_session_open', lambda now=None: NOW + pd.Timedelta(hours=2))
+    provider = CountingProvider(end="2024-03-15", symbols=["TCS", "INFY", "ITC"])
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+    return quote_service.QuoteService(fetcher, open_ttl=60), provider
+
+
+def downloads(provider):
+    return [call for call in provider.calls if call[0] == 'download']
+
+
+def test_quotes_are_cached_for_the_ttl_while_open(clock, monkeypatch):
+    service, provider = service_with_provider(monkeypatch)
+    first = service.get_quotes(["TCS", "INFY"])
+    assert set(first) == {"TCS", "INFY"}
+    assert downloads(provider) == [('download', ("TCS.NS", "INFY.NS"))]
+
+    provider.calls.clear()
+    clock[0] += 59
+    assert service.get_quotes(["INFY", "TCS"]) == {"INFY": first["INFY"], "TCS": first["TCS"]}
+    assert provider.calls == []
+
+    clock[0] += 2
+    service.get_quotes(["TCS", "INFY"])
+    assert downloads(provider) == [('download', ("TCS.NS", "INFY.NS"))]
+
+
+def test_only_missing_symbols_are_fetched_in_one_request(clock, monkeypatch):
+    service, provider = service_with_provider(monkeypatch)
+    service.get_quotes(["TCS"])
+    provider.calls.clear()
+
+    quotes = service.get_quotes(["TCS", "INFY", "ITC"])
+    assert list(quotes) == ["TCS", "INFY", "ITC"]
+    assert downloads(provider) == [('download', ("INFY.NS", "ITC.NS"))]
+
+
+def test_misses_fall_back_to_bse_in_one_more_request(clock, monkeypatch):
+    service, provider = service_with_provider(monkeypatch)
+    # The replay provider has no BSE data, so unknown symbols miss on both exchanges
+    assert list(service.get_quotes(["TCS", "NOPE1", "NOPE2"])) == ["TCS"]
+    assert downloads(provider) == [
+        ('download', ("TCS.NS", "NOPE1.NS", "NOPE2.NS")),
+        ('download', ("NOPE1.BO", "NOPE2.BO"))
+    ]
+
+
+def test_closed_market_quotes_live_until_the_next_open(clock, monkeypatch):
+    service, provider = service_with_provider(monkeypatch, market_open=False)
+    service.get_quotes(["TCS"])
+    provider.calls.clear()
+
+    clock[0] += 2 * 3600 - 1
+    service.get_quotes(["TCS"])
+    assert provider.calls == []
+
+    clock[0] += 2
+    service.get_quotes(["TCS"])
+    assert len(downloads(provider)) == 1
+
+
+def test_invalidate_forces_a_refetch(clock, monkeypatch):
+    service, provider = service_with_provider(monkeypatch)
+    service.get_quotes(["TCS", "INFY"])
+    provider.calls.clear()
+
+    service.invalidate(["TCS"])
+    service.get_quotes(["TCS", "INFY"])
+    assert downloads(provider) == [('download', ("TCS.NS",))]
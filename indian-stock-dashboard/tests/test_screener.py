@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+from data_providers import ReplayProvider
+from screener import MarketScreener, ScreenerError, apply_filter, compile_filter
+from stock_data import StockDataFetcher
+from technical_analysis import TechnicalAnalyzer
+
+TABLE = pd.DataFrame({
+    'close': [100.0, 250.0, 80.0, 40.0],
+    'sma_200': [90.0, 260.0, 70.0, np.nan],
+    'rsi': [25.0, 55.0, 75.0, 28.0],
+    'volume': [3000.0, 1000.0, 2000.0, 500.0],
+    'avg_volume': [1000.0, 1000.0, 1000.0, 1000.0],
+    'change_pct': [-2.0, 0.5, 3.0, -0.5],
+    'signal': ['BUY', 'HOLD', 'SELL', 'BUY'],
+    'confidence': [80.0, 50.0, 70.0, 60.0]
+}, index=pd.Index(['A', 'B', 'C', 'D'], name='symbol'))
+
+
+def matches(expression):
+    return list(TABLE.index[apply_filter(compile_filter(expression), TABLE)])
+
+
+@pytest.mark.parametrize('expression, expected', [
+    ("RSI < 30 and close > SMA_200", ['A']),
+    ("rsi < 30 AND close > sma_200 AND volume > 1.5× avg", ['A']),
+    ("volume > 1.5x avg", ['A', 'C']),
+    ("signal = 'buy'", ['A', 'D']),
+    ("signal != 'BUY'", ['B', 'C']),
+    ("rsi < 30 or rsi > 70", ['A', 'C', 'D']),
+    ("30 < rsi < 70", ['B']),
+    ("not rsi > 50", ['A', 'D']),
+    ("change > -1 and close / sma_200 > 1", ['C']),
+    ("close - sma_200 >= 10", ['A', 'C']),
+    # NaN never matches
+    ("close < sma_200 or sma_200 > 0", ['A', 'B', 'C']),
+])
+def test_allowed_expressions(expression, expected):
+    assert matches(expression) == expected
+
+
+@pytest.mark.parametrize('expression', [
+    "close.real > 1",
+    "__import__('os').system('true')",
+    "rsi.__class__ == 1",
+    "__builtins__ > 0",
+    "abs(rsi) > 1",
+    "[x for x in rsi]",
+    "any(x > 1 for x in rsi)",
+    "{x: 1 for x in rsi}",
+    "lambda: rsi",
+    "rsi[0] > 1",
+    "rsi if close else volume",
+    "rsi < True",
+    "price > pe",
+    "rsi <",
+])
+def test_unsafe_or_malformed_expressions_are_rejected(expression):
+    with pytest.raises(ScreenerError):
+        compile_filter(expression)
+
+
+@pytest.mark.parametrize('expression', ["'BUY'", "rsi", "rsi + 1", "not rsi", "rsi < 30 and 'BUY'", "30"])
+def test_non_boolean_filters_are_rejected(expression):
+    # Cast to bool, these would silently select every row
+    with pytest.raises(ScreenerError):
+        compile_filter(expression)
+
+
+def test_arithmetic_on_text_is_rejected():
+    with pytest.raises(ScreenerError):
+        matches("signal + 1 > 2")
+
+
+def screener_with(table):
+    screener = MarketScreener(fetcher=None, analyzer=None)
+    screener.table = table
+    return screener
+
+
+def test_scan_sorts_and_pages():
+    screener = screener_with(TABLE)
+    first = screener.scan("rsi < 60", sort_by="RSI", ascending=True, page=1, page_size=2)
+    assert list(first['results'].index) == ['A', 'D']
+    assert (first['total'], first['pages'], first['scanned']) == (3, 2, 4)
+
+    # Pages past the end show the last one
+    last = screener.scan("rsi < 60", sort_by="RSI", ascending=True, page=9, page_size=2)
+    assert last['page'] == 2 and list(last['results'].index) == ['B']
+
+    assert screener.scan("", sort_by="confidence")['results'].index[0] == 'A'
+    with pytest.raises(ScreenerError):
+        screener.scan("", sort_by="market_cap")
+
+
+def test_refresh_matches_technical_analyzer():
+    symbols = ['RELIANCE', 'TCS', 'INFY', 'HDFCBANK', 'ITC']
+    provider = ReplayProvider(end="2024-03-15", symbols=symbols)
+    fetcher = StockDataFetcher(use_store=False, use_resolver=False, provider=provider)
+    analyzer = TechnicalAnalyzer()
+    screener = MarketScreener(fetcher, analyzer, period="2y")
+
+    assert screener.refresh(symbols) == {'symbols': 5, 'failures': {}}
+    data = fetcher.fetch_stocks_batch(symbols, "2y")['data']
+    expected = analyzer.get_recommendations(data)
+    for symbol in symbols:
+        row = screener.table.loc[symbol]
+        assert row['signal'] == expected[symbol]['signal'], symbol
+        assert row['high_52w'] == pytest.approx(data[symbol]['High'].iloc[-252:].max(), rel=1e-6)
+        assert row['low_52w'] == pytest.approx(data[symbol]['Low'].iloc[-252:].min(), rel=1e-6)
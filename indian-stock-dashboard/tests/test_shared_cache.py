@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import shared_cache
+from shared_cache import SharedCache, estimate_size
+
+
+def block(kilobytes):
+    # An array of exactly `kilobytes` * 1000 bytes
+    return np.zeros(kilobytes * 125)
+
+
+def test_evicts_least_recently_used_past_the_budget():
+    cache = SharedCache(max_bytes=3000)
+    cache['a'] = block(1)
+    cache['b'] = block(1)
+    cache['c'] = block(1)
+    assert cache.bytes == 3000
+
+    # Reading 'a' makes 'b' the least recently used
+    assert cache.get('a') is not None
+    cache['d'] = block(1)
+    assert 'b' not in cache
+    assert all(key in cache for key in 'acd')
+    assert cache.bytes == 3000 and cache.stats()['evictions'] == 1
+
+    # A larger value evicts as many entries as it needs
+    cache['e'] = block(2)
+    assert list(key for key in 'acde' if key in cache) == ['d', 'e']
+    assert cache.bytes == 3000 and cache.stats()['evictions'] == 3
+
+
+def test_replacing_a_key_counts_its_size_once():
+    cache = SharedCache(max_bytes=10_000)
+    cache['a'] = block(2)
+    cache['a'] = block(3)
+    assert cache.bytes == 3000 and len(cache) == 1
+
+    cache['a'] = block(1)
+    assert cache.bytes == 1000
+
+    assert cache.pop('a') is not None
+    assert cache.bytes == 0 and len(cache) == 0
+    assert cache.pop('a', 'gone') == 'gone'
+
+
+def test_oversized_value_is_not_stored():
+    cache = SharedCache(max_bytes=3000)
+    cache['a'] = block(1)
+    cache['b'] = block(1)
+
+    cache['huge'] = block(4)
+    assert 'huge' not in cache
+    assert 'a' in cache and 'b' in cache
+    assert cache.bytes == 2000
+
+    # Replacing a key with an oversized value drops the old value too
+    cache['a'] = block(4)
+    assert 'a' not in cache and cache.bytes == 1000
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(shared_cache.time, 'time', lambda: now[0])
+    cache = SharedCache(max_bytes=10_000, ttl=60)
+    cache['a'] = block(1)
+
+    now[0] += 59
+    assert cache.get('a') is not None
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.bytes == 0
+
+
+def test_get_or_compute_caches_results_but_not_none():
+    cache = SharedCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return block(1)
+
+    first = cache.get_or_compute('a', compute)
+    assert cache.get_or_compute('a', compute) is first
+    assert len(calls) == 1
+
+    assert cache.get_or_compute('none', lambda: None) is None
+    assert 'none' not in cache
+
+
+def test_estimate_size_of_frames_and_containers():
+    frame = pd.DataFrame({'Close': np.zeros(100)}, index=pd.RangeIndex(100))
+    assert estimate_size(frame) == frame.memory_usage(index=True, deep=True).sum()
+    assert estimate_size({'a': block(1)}) > 1000
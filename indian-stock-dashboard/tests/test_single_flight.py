@@ -0,0 +1,86 @@
+import threading
+import time
+import pandas as pd
+import stock_data
+from data_store import OHLCVStore
+from single_flight import SingleFlight
+from stock_data import StockDataFetcher
+from conftest import CountingProvider
+
+
+def run_coalesced(flights, fn, followers=2):
+    # The leader blocks in fn until every follower is waiting on its call
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(flights.do("key", fn))
+        except Exception as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    while flights.in_flight() == 0:
+        time.sleep(0.001)
+    threads = [threading.Thread(target=call) for _ in range(followers)]
+    for thread in threads:
+        thread.start()
+    while flights.stats()['coalesced'] < followers:
+        time.sleep(0.001)
+    return leader, threads, results, errors
+
+
+def test_waiting_callers_get_their_own_copy():
+    flights, release = SingleFlight(), threading.Event()
+    frame = pd.DataFrame({'Close': [1.0, 2.0, 3.0]})
+
+    def load():
+        release.wait()
+        return frame
+
+    leader, threads, results, errors = run_coalesced(flights, load)
+    release.set()
+    for thread in [leader] + threads:
+        thread.join()
+
+    assert errors == [] and flights.stats()['executions'] == 1
+    assert sum(result is frame for result in results) == 1
+    for result in results:
+        pd.testing.assert_frame_equal(result, frame)
+
+    # One session editing its history leaves the others untouched
+    copies = [result for result in results if result is not frame]
+    copies[0].loc[0, 'Close'] = -1.0
+    assert frame.loc[0, 'Close'] == 1.0 and copies[1].loc[0, 'Close'] == 1.0
+
+
+def test_waiting_callers_share_the_error():
+    flights, release = SingleFlight(), threading.Event()
+
+    def load():
+        release.wait()
+        raise ConnectionError("connection reset")
+
+    leader, threads, results, errors = run_coalesced(flights, load)
+    release.set()
+    for thread in [leader] + threads:
+        thread.join()
+    assert results == [] and len(errors) == 3
+    assert flights.in_flight() == 0
+
+
+def test_fetchers_with_different_stores_do_not_share_a_flight(tmp_path, monkeypatch):
+    monkeypatch.setenv('STOCK_DATA_STORE', str(tmp_path / "store.sqlite"))
+    keys = []
+    flights = SingleFlight()
+
+    def recording_do(key, fn):
+        keys.append(key)
+        return flights.do(key, fn)
+
+    monkeypatch.setattr(stock_data.HISTORY_FLIGHTS, 'do', recording_do)
+    for name in ["a.sqlite", "b.sqlite"]:
+        provider = CountingProvider(end="2024-03-15", symbols=["TCS"])
+        fetcher = StockDataFetcher(store=OHLCVStore(str(tmp_path / name)), use_resolver=False, provider=provider)
+        assert not fetcher.get_stock_data("TCS", "1mo").empty
+    assert len(set(keys)) == 2
@@ -0,0 +1,77 @@
+import sqlite3
+import pandas as pd
+from data_providers import ReplayProvider
+from data_store import OHLCVStore
+from exchange_resolver import ExchangeResolver, NOT_LISTED
+from stock_data import StockDataFetcher
+from conftest import CountingProvider
+
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def test_top_up_merges_new_bars_into_stored_history(tmp_path):
+    # One fixed CSV history, replayed as of two different days
+    history = ReplayProvider(end="2024-03-15").history("TEST.NS", period="2y")
+    history.to_csv(tmp_path / "TEST.NS.csv")
+    provider = ReplayProvider(data_dir=str(tmp_path), end="2024-03-01", synthetic=False)
+
+    path = str(tmp_path / "store.sqlite")
+    fetcher = StockDataFetcher(store=OHLCVStore(path), use_store=False, use_resolver=False, provider=provider)
+    first = fetcher.get_stock_data("TEST", "1y")
+    assert first.index[-1] == pd.Timestamp("2024-03-01")
+
+    # Two weeks later, with the stored bars last checked long ago
+    provider.end = pd.Timestamp("2024-03-15")
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE ohlcv_meta SET updated_at = 0")
+    topped_up = fetcher.get_stock_data("TEST", "1y")
+
+    expected = StockDataFetcher(use_store=False, use_resolver=False, provider=provider).get_stock_data("TEST", "1y")
+    assert topped_up.index[-1] == pd.Timestamp("2024-03-15")
+    pd.testing.assert_frame_equal(
+        topped_up[COLUMNS], expected[COLUMNS],
+        check_freq=False, check_dtype=False, check_index_type=False
+    )
+
+
+def test_confirmed_unlisted_symbol_makes_no_provider_calls(tmp_path):
+    resolver = ExchangeResolver(str(tmp_path / "resolver.sqlite"), confirmations=3)
+    provider = CountingProvider(end="2024-03-15", symbols=["LISTED"])
+    fetcher = StockDataFetcher(use_store=False, resolver=resolver, provider=provider)
+
+    # A miss on the request path is only reported, so the next call still asks upstream
+    assert fetcher.get_stock_data("GONE", "1mo") is None
+    assert len(provider.calls) == 2
+    assert resolver.lookup("GONE") is None
+
+    # Three empty background passes confirm it
+    for _ in range(3):
+        resolver.refresh_stale(fetcher._probe_exchange)
+    assert resolver.lookup("GONE") == NOT_LISTED
+
+    provider.calls.clear()
+    assert fetcher.get_stock_data("GONE", "1mo") is None
+    assert fetcher.get_stock_info("GONE") == {}
+    assert fetcher.get_quotes(["GONE"]) == {}
+    batch = fetcher.fetch_stocks_batch(["GONE", "LISTED"], "1mo")
+    assert list(batch['data']) == ["LISTED"]
+    assert "GONE" in batch['failures']
+    assert all("GONE" not in str(call) for call in provider.calls)
+
+    # Once the negative entry expires the symbol is tried again
+    resolver.negative_ttl = -1
+    provider.calls.clear()
+    fetcher.get_stock_data("GONE", "1mo")
+    assert ('history', "GONE.NS") in provider.calls
+
+
+def test_offline_provider_stores_follow_stock_data_store(tmp_path, monkeypatch):
+    monkeypatch.setenv('STOCK_DATA_STORE', str(tmp_path / "scratch.sqlite"))
+    fetcher = StockDataFetcher(provider=ReplayProvider(end="2024-03-15", symbols=["TCS"]))
+
+    replay_path = str(tmp_path / "scratch_replay.sqlite")
+    assert fetcher.store.path == replay_path
+    assert fetcher.resolver.path == replay_path
+    assert fetcher.fundamentals.path == replay_path
+    assert not fetcher.get_stock_data("TCS", "1mo").empty
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["scratch_replay.sqlite"]
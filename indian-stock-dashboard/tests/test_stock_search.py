@@ -0,0 +1,19 @@
+from indian_stocks import get_indian_stocks
+from stock_search import StockSearchIndex
+
+
+def test_substring_tier_finds_every_containing_entry():
+    stocks = get_indian_stocks()
+    index = StockSearchIndex(stocks)
+    for query in ['a', 'ba', 'ban', 'bank', 'pharma', 'tata mo', 'ltd', '&', 'xyzq']:
+        expected = {
+            symbol for symbol, name in stocks.items()
+            if query in symbol.lower() or query in name.lower()
+        }
+        found = {symbol for symbol, _ in index.search(query, limit=None)}
+        assert expected <= found, query
+
+
+def test_results_are_not_capped_by_default():
+    stocks = {f"BANK{i}": f"Bank Number {i}" for i in range(40)}
+    assert len(StockSearchIndex(stocks).search("bank", limit=None)) == 40
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from technical_analysis import TechnicalAnalyzer
+
+
+def history(close, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.asarray(close, dtype=np.float64)
+    spread = np.abs(rng.normal(scale=0.01, size=len(close))) * close
+    return pd.DataFrame({
+        'Open': close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(10_000, 50_000, size=len(close)).astype(np.float64)
+    }, index=pd.bdate_range('2022-01-03', periods=len(close)))
+
+
+def flat_history(bars, price=100.0):
+    data = history(np.full(bars, price))
+    data[['Open', 'High', 'Low']] = price
+    data['Volume'] = 1000.0
+    return data
+
+
+def test_flat_prices_hold():
+    analyzer = TechnicalAnalyzer()
+    for bars in (30, 300):
+        recommendation = analyzer.get_recommendation(flat_history(bars), f"FLAT{bars}")
+        assert recommendation['signal'] == 'HOLD'
+        assert recommendation['confidence'] == 50
+
+
+def test_flat_prices_give_zero_macd():
+    macd, macd_signal, histogram = TechnicalAnalyzer().calculate_macd(np.full(300, 2500.0))
+    assert np.all(macd == 0) and np.all(macd_signal == 0) and np.all(histogram == 0)
+
+
+def test_batch_recommendations_match_per_stock():
+    rng = np.random.default_rng(7)
+    stocks_data = {
+        f"S{i}": history(500 * np.exp(rng.normal(scale=0.02, size=bars).cumsum()), seed=i)
+        for i, bars in enumerate([30, 120, 260, 500, 500, 500])
+    }
+    stocks_data['FLAT'] = flat_history(300)
+
+    analyzer = TechnicalAnalyzer()
+    batch = analyzer.get_recommendations(stocks_data)
+    for symbol, data in stocks_data.items():
+        single = TechnicalAnalyzer().get_recommendation(data, symbol)
+        assert batch[symbol]['signal'] == single['signal'], symbol
+        assert batch[symbol]['confidence'] == single['confidence'], symbol
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+from timeframes import IncrementalResampler, resample_ohlcv
+
+
+def daily_history(bars, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(rng.normal(scale=0.01, size=bars).cumsum())
+    return pd.DataFrame({
+        'Open': close * (1 + rng.normal(scale=0.002, size=bars)),
+        'High': close * 1.01,
+        'Low': close * 0.99,
+        'Close': close,
+        'Volume': rng.integers(1_000, 5_000, size=bars).astype(np.float64)
+    }, index=pd.bdate_range('2020-01-01', periods=bars))
+
+
+def assert_same_bars(result, expected):
+    assert result.index.equals(expected.index)
+    np.testing.assert_allclose(result.to_numpy(), expected.to_numpy())
+
+
+def test_sliding_window_does_not_rebuild():
+    history = daily_history(900)
+    for freq in ('W-FRI', 'M'):
+        resampler = IncrementalResampler(freq)
+        for end in range(500, 900):
+            window = history.iloc[end - 500:end]
+            assert_same_bars(resampler.update(window), resample_ohlcv(window, freq))
+        assert resampler.rebuilds == 1
+
+
+def test_revised_or_longer_history_rebuilds():
+    history = daily_history(600)
+    resampler = IncrementalResampler('W-FRI')
+    resampler.update(history.iloc[100:])
+
+    revised = history.iloc[100:].copy()
+    revised['Close'] *= 0.5
+    assert_same_bars(resampler.update(revised), resample_ohlcv(revised, 'W-FRI'))
+    assert resampler.rebuilds == 2
+
+    assert_same_bars(resampler.update(history), resample_ohlcv(history, 'W-FRI'))
+    assert resampler.rebuilds == 3
@@ -0,0 +1,255 @@
+import threading
+import numpy as np
+import pandas as pd
+
+# Timeframe name to pandas period frequency (weeks end on Friday, NSE's last session)
+TIMEFRAMES = {'weekly': 'W-FRI', 'monthly': 'M'}
+
+AGGREGATIONS = {'Open': 'first', 'High': 'max', 'Low': 'min', 'Close': 'last', 'Volume': 'sum'}
+
+
+def _aggregate(stock_data, freq):
+    """
+    Period bars of a daily history as arrays
+
+    Returns:
+        tuple: (DatetimeIndex of bar labels, dict of column arrays, row where the last period starts)
+    """
+    # Rows are in date order, so each period is one contiguous run of rows
+    periods = stock_data.index.to_period(freq).asi8
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    ends = np.r_[starts[1:], len(periods)] - 1
+
+    bars = {}
+    for column, how in AGGREGATIONS.items():
+        if column not in stock_data.columns:
+            continue
+        values = stock_data[column].to_numpy(dtype=np.float64)
+        if how == 'first':
+            bars[column] = values[starts]
+        elif how == 'last':
+            bars[column] = values[ends]
+        elif how == 'max':
+            bars[column] = np.fmax.reduceat(values, starts)
+        elif how == 'min':
+            bars[column] = np.fmin.reduceat(values, starts)
+        else:
+            bars[column] = np.add.reduceat(np.nan_to_num(values), starts)
+    return stock_data.index[ends], bars, starts[-1]
+
+
+def resample_ohlcv(stock_data, freq):
+    """
+    Aggregate daily OHLCV bars into weekly or monthly bars
+
+    Each bar is labelled with the last trading day it contains, so the
+    still-forming current week or month ends on the latest daily bar.
+
+    Args:
+        stock_data (pandas.DataFrame): Daily OHLCV data, oldest first
+        freq (str): Pandas period frequency, e.g. 'W-FRI' or 'M'
+
+    Returns:
+        pandas.DataFrame: One row per period with Open, High, Low, Close, Volume
+    """
+    if stock_data is None or stock_data.empty:
+        return pd.DataFrame(columns=list(AGGREGATIONS))
+
+    labels, bars, _ = _aggregate(stock_data, freq)
+    return pd.DataFrame(bars, index=labels)
+
+
+class IncrementalResampler:
+    """
+    Weekly or monthly bars kept up to date as daily bars arrive
+
+    Completed periods are stored once, as arrays. Each update only
+    re-aggregates the daily bars of the current period plus any newer
+    ones, so a new day costs a handful of rows rather than the whole
+    history. A history window that slides forward just drops the bars
+    that fell out of it. If the daily bars behind a completed period
+    change (a revised close, e.g. after a split adjustment) or the
+    history reaches further back, the bars are rebuilt from scratch.
+    """
+
+    def __init__(self, freq):
+        """
+        Args:
+            freq (str): Pandas period frequency, e.g. 'W-FRI' or 'M'
+        """
+        self.freq = freq
+        self.labels = None
+        self.completed = None
+        self.bars = None
+        self.first_date = None
+        self.current_start = None
+        self.seen = None
+        self.rebuilds = 0
+
+    def _consistent(self, stock_data):
+        # Every completed bar still inside the history must end on the same
+        # date with the same close (adjustments rewrite earlier closes)
+        index = stock_data.index
+        if self.bars is None or index[0] < self.first_date or index[-1] < self.current_start:
+            return False
+        if not len(self.labels) or 'Close' not in self.completed:
+            return True
+        dates, labels = index.asi8, self.labels.asi8
+        overlap = labels >= dates[0]
+        positions = np.minimum(np.searchsorted(dates, labels[overlap]), len(dates) - 1)
+        if not np.array_equal(dates[positions], labels[overlap]):
+            return False
+        return np.array_equal(
+            stock_data['Close'].to_numpy(dtype=np.float64)[positions],
+            self.completed['Close'][overlap],
+            equal_nan=True
+        )
+
+    def _trim(self, stock_data):
+        # The history now starts later: drop periods that ended before it and
+        # re-aggregate the period it starts in from the bars that remain
+        self.first_date = stock_data.index[0]
+        keep = self.labels >= self.first_date
+        self.labels = self.labels[keep]
+        self.completed = {column: values[keep] for column, values in self.completed.items()}
+        if len(self.labels) and self.labels[0].to_period(self.freq) == self.first_date.to_period(self.freq):
+            head = stock_data.iloc[:stock_data.index.searchsorted(self.labels[0], side='right')]
+            _, bars, _ = _aggregate(head, self.freq)
+            for column, values in bars.items():
+                self.completed[column][0] = values[0]
+
+    def update(self, stock_data):
+        """
+        Bring the bars in line with a daily history
+
+        Args:
+            stock_data (pandas.DataFrame): Daily OHLCV data, oldest first
+
+        Returns:
+            pandas.DataFrame: Resampled bars for the whole history
+        """
+        if stock_data is None or stock_data.empty:
+            return resample_ohlcv(stock_data, self.freq)
+
+        # Reruns usually pass the same history again
+        seen = (
+            len(stock_data), stock_data.index[0], stock_data.index[-1],
+            stock_data['Close'].iloc[-1], stock_data['Volume'].iloc[-1]
+        )
+        if self.bars is not None and seen == self.seen:
+            return self.bars
+        self.seen = seen
+
+        if self._consistent(stock_data):
+            if stock_data.index[0] != self.first_date:
+                self._trim(stock_data)
+            recent = stock_data.iloc[stock_data.index.searchsorted(self.current_start):]
+        else:
+            self.rebuilds += 1
+            self.first_date = stock_data.index[0]
+            self.labels = stock_data.index[:0]
+            self.completed = None
+            recent = stock_data
+        labels, bars, newest = _aggregate(recent, self.freq)
+
+        # Everything but the newest period is complete and will not change again
+        if self.completed is None:
+            self.completed = {column: values[:-1] for column, values in bars.items()}
+        else:
+            self.completed = {
+                column: np.concatenate([self.completed[column], values[:-1]]) for column, values in bars.items()
+            }
+        self.labels = self.labels.append(labels[:-1])
+        self.current_start = recent.index[newest]
+
+        self.bars = pd.DataFrame(
+            {column: np.append(self.completed[column], values[-1]) for column, values in bars.items()},
+            index=self.labels.append(labels[-1:])
+        )
+        return self.bars
+
+
+class MultiTimeframeAnalyzer:
+    """
+    Daily, weekly and monthly recommendations from one daily history
+
+    Weekly and monthly bars are resampled locally from the cached daily
+    data, so no extra downloads are needed. Resamplers are kept per symbol
+    and updated incrementally, and recommendations go through the
+    analyzer's memoized get_recommendation.
+    """
+
+    def __init__(self, analyzer, timeframes=TIMEFRAMES):
+        """
+        Args:
+            analyzer (TechnicalAnalyzer): Scores each timeframe's bars
+            timeframes (dict): Timeframe name to pandas period frequency
+        """
+        self.analyzer = analyzer
+        self.timeframes = dict(timeframes)
+        self._resamplers = {}
+        self._lock = threading.Lock()
+
+    def get_bars(self, symbol, stock_data):
+        """
+        Bars for every timeframe
+
+        Args:
+            symbol (str): Stock symbol
+            stock_data (pandas.DataFrame): Daily OHLCV data
+
+        Returns:
+            dict: {'daily': stock_data, 'weekly': DataFrame, 'monthly': DataFrame}
+        """
+        bars = {'daily': stock_data}
+        for name, freq in self.timeframes.items():
+            with self._lock:
+                resampler = self._resamplers.setdefault((symbol, freq), IncrementalResampler(freq))
+                bars[name] = resampler.update(stock_data)
+        return bars
+
+    def get_recommendations(self, symbol, stock_data):
+        """
+        Recommendation for each timeframe plus how far they agree
+
+        Args:
+            symbol (str): Stock symbol
+            stock_data (pandas.DataFrame): Daily OHLCV data
+
+        Returns:
+            dict: {'timeframes': {name: {'recommendation', 'bars'}},
+                   'agreement': output of signal_agreement}
+        """
+        results = {}
+        for name, bars in self.get_bars(symbol, stock_data).items():
+            key = symbol if name == 'daily' else f"{symbol}@{name}"
+            results[name] = {
+                'recommendation': self.analyzer.get_recommendation(bars, key),
+                'bars': len(bars)
+            }
+        return {
+            'timeframes': results,
+            'agreement': signal_agreement({name: result['recommendation']['signal'] for name, result in results.items()})
+        }
+
+
+def signal_agreement(signals):
+    """
+    Summarize whether the timeframes point the same way
+
+    Args:
+        signals (dict): Timeframe name to 'BUY', 'SELL' or 'HOLD'
+
+    Returns:
+        dict: {'signal': the shared signal or 'MIXED', 'aligned': timeframes
+               agreeing with the most common signal, 'total': timeframes}
+    """
+    if not signals:
+        return {'signal': 'HOLD', 'aligned': 0, 'total': 0}
+    values, counts = np.unique(list(signals.values()), return_counts=True)
+    aligned = int(counts.max())
+    return {
+        'signal': str(values[counts.argmax()]) if aligned == len(signals) else 'MIXED',
+        'aligned': aligned,
+        'total': len(signals)
+    }